@@ -0,0 +1,96 @@
+'''
+Run the same workload on every registered engine backend: replaying random
+game records move by move, scoring the final positions, and random playouts.
+
+    python benchmarks/bench_backends.py [--board-size 19] [--games 20]
+'''
+import os
+import sys
+import time
+import random
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game import Game
+from src.backends import available_backends
+from src.playout import random_playout
+from src.utils import Stone
+from src.exceptions import SelfDestructException, KoException
+
+
+def make_records(config, games, seed):
+    '''
+    Return `games` records of random moves on empty points, as lists of (stone, (y, x)).
+    Illegal moves stay in the records, so that replaying them times the rejection path on every backend
+    '''
+    rng = random.Random(seed)
+    size = config['board_size']
+    records = []
+    for _ in range(games):
+        game = Game(config)
+        record = []
+        for _ in range(size * size):
+            empty = np.flatnonzero(np.asarray(game.board) == Stone.EMPTY).tolist()
+            y, x = divmod(rng.choice(empty), size)
+            record.append((game.turn, (y, x)))
+            play(game, game.turn, y, x)
+        records.append(record)
+    return records
+
+
+def play(game, stone, y, x):
+    try:
+        game._place_stone(stone, y, x)
+    except (SelfDestructException, KoException):
+        pass
+
+
+def replay(config, records):
+    scores = []
+    for record in records:
+        game = Game(config)
+        for stone, (y, x) in record:
+            play(game, stone, y, x)
+        scores.append(game.get_scores())
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--board-size', type=int, default=19)
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--playouts', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    config = {'black_stone': 'b', 'white_stone': 'w',
+              'board_size': args.board_size, 'enable_self_destruct': False}
+    records = make_records(config, args.games, args.seed)
+    num_moves = sum(len(record) for record in records)
+
+    print(f'{args.games} games of {num_moves / args.games:.0f} moves, '
+          f'{args.playouts} playouts on {args.board_size}x{args.board_size}')
+    expected = None
+    for name in available_backends():
+        backend_config = dict(config, engine_backend=name)
+        start = time.perf_counter()
+        scores = replay(backend_config, records)
+        replay_seconds = time.perf_counter() - start
+        expected = expected or scores
+        assert scores == expected, f'{name} scores differ'
+
+        rng = random.Random(args.seed)
+        start = time.perf_counter()
+        for _ in range(args.playouts):
+            random_playout(Game(backend_config), rng, use_benson=False, copy_game=False)
+        playout_seconds = (time.perf_counter() - start) / args.playouts
+
+        print(f'  {name:8s}  replay {num_moves / replay_seconds:9.0f} moves/s  '
+              f'playout {playout_seconds * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
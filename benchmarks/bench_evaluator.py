@@ -0,0 +1,62 @@
+'''
+Measure evaluation throughput and latency of the batched evaluation service
+with the reference evaluator, for several batch sizes.
+
+    python benchmarks/bench_evaluator.py [--board-size 19] [--threads 32] [--positions 100]
+'''
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game import Game
+from src.playout import random_playout
+from src.evaluator import EvaluationService, ReferenceEvaluator, feature_planes
+
+
+def run(planes, batch_size, max_wait, threads, positions):
+    with EvaluationService(ReferenceEvaluator(), batch_size, max_wait) as service:
+        def search():
+            for _ in range(positions):
+                service.evaluate(planes)
+
+        workers = [threading.Thread(target=search) for _ in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        stats = service.stats()
+    return threads * positions / elapsed, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--board-size', type=int, default=19)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--positions', type=int, default=100)
+    parser.add_argument('--max-wait', type=float, default=0.002)
+    args = parser.parse_args()
+
+    config = {'black_stone': 'b', 'white_stone': 'w',
+              'board_size': args.board_size, 'enable_self_destruct': False}
+    game = Game(config)
+    random_playout(game, random.Random(0), max_moves=args.board_size ** 2 // 2,
+                   use_benson=False, copy_game=False)
+    planes = feature_planes(game.board, game.turn)
+
+    print(f'{args.threads} threads x {args.positions} positions on {args.board_size}x{args.board_size}')
+    for batch_size in (1, 8, 32):
+        throughput, stats = run(planes, batch_size, args.max_wait, args.threads, args.positions)
+        print(f'  batch {batch_size:3d}  {throughput:9.0f} positions/s  '
+              f'mean batch {stats["mean_batch_size"]:5.1f}  '
+              f'mean latency {stats["mean_latency"] * 1000:6.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
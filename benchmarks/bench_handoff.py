@@ -0,0 +1,106 @@
+'''
+Time handing positions to pool workers: pickling whole Game objects, pickling
+snapshots (see src.journal), and sending only an index into a SharedPositions
+block (see src.positions). Each task rebuilds a Game from its position, or for
+the shared block also reads the board in place, and counts the stones.
+
+    python benchmarks/bench_handoff.py [--board-size 19] [--positions 200] [--workers 2]
+'''
+import os
+import sys
+import time
+import random
+import pickle
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game import Game
+from src.journal import take_snapshot, restore_snapshot
+from src.playout import random_playout
+from src.positions import SharedPositions
+from src.utils import Stone
+
+_positions = None
+
+
+def init_worker(positions):
+    global _positions
+    _positions = positions
+
+
+def count_stones(game):
+    return int(np.count_nonzero(np.asarray(game.board) != Stone.EMPTY))
+
+
+def from_game(game):
+    return count_stones(game)
+
+
+def from_snapshot(config, snapshot):
+    return count_stones(restore_snapshot(config, snapshot))
+
+
+def from_shared(config, i):
+    return count_stones(restore_snapshot(config, _positions[i]))
+
+
+def from_shared_view(i):
+    return int(np.count_nonzero(_positions[i]['board']))
+
+
+def make_games(config, count, seed):
+    rng = random.Random(seed)
+    size = config['board_size']
+    games = []
+    for _ in range(count):
+        game = Game(config)
+        random_playout(game, rng, max_moves=rng.randrange(size * size), use_benson=False,
+                       copy_game=False)
+        games.append(game)
+    return games
+
+
+def timed(executor, fn, args):
+    start = time.perf_counter()
+    results = list(executor.map(fn, *zip(*args), chunksize=1))
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--board-size', type=int, default=19)
+    parser.add_argument('--positions', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    config = {'black_stone': 'b', 'white_stone': 'w',
+              'board_size': args.board_size, 'enable_self_destruct': False}
+    games = make_games(config, args.positions, args.seed)
+    snapshots = [take_snapshot(game) for game in games]
+    expected = [count_stones(game) for game in games]
+
+    print(f'{args.positions} positions on {args.board_size}x{args.board_size}, {args.workers} workers')
+    print(f'  payload per task: Game {np.mean([len(pickle.dumps(g)) for g in games]):.0f} B, '
+          f'snapshot {np.mean([len(pickle.dumps(s)) for s in snapshots]):.0f} B')
+    with SharedPositions.from_snapshots(snapshots, args.board_size) as positions, \
+            ProcessPoolExecutor(args.workers, initializer=init_worker, initargs=(positions,)) as executor:
+        # start the workers
+        list(executor.map(from_shared_view, range(args.workers)))
+        indices = list(range(args.positions))
+        for name, fn, task_args in (('Game', from_game, [(g,) for g in games]),
+                                    ('snapshot', from_snapshot, [(config, s) for s in snapshots]),
+                                    ('shared', from_shared, [(config, i) for i in indices]),
+                                    ('shared view', from_shared_view, [(i,) for i in indices])):
+            results, seconds = timed(executor, fn, task_args)
+            assert results == expected, f'{name} differs'
+            print(f'  {name:12s} {args.positions / seconds:8.0f} positions/s  '
+                  f'{seconds / args.positions * 1e6:7.0f} us/position')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+'''
+Measure the startup cost of importing the headless engine modules.
+
+Each sample runs in a fresh interpreter, as a spawned worker process would.
+
+    python benchmarks/bench_import.py [--runs N] [--module src.game]
+'''
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# time only the import itself, and report whether pygame came along with it
+SNIPPET = '''
+import sys, time
+t = time.perf_counter()
+import {module}
+t = time.perf_counter() - t
+print(t, 'pygame' in sys.modules)
+'''
+
+
+def time_import(module):
+    '''
+    Import `module` in a fresh interpreter and return (seconds, loaded_pygame)
+    '''
+    out = subprocess.run([sys.executable, '-c', SNIPPET.format(module=module)],
+                         cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    seconds, loaded_pygame = out.splitlines()[-1].split()
+    return float(seconds), loaded_pygame == 'True'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--module', default='src.game')
+    args = parser.parse_args()
+
+    samples = []
+    loaded_pygame = False
+    for _ in range(args.runs):
+        seconds, loaded = time_import(args.module)
+        samples.append(seconds * 1000)
+        loaded_pygame |= loaded
+
+    print(f'import {args.module}: {args.runs} runs')
+    print(f'  median {statistics.median(samples):.2f} ms')
+    print(f'  min    {min(samples):.2f} ms')
+    print(f'  max    {max(samples):.2f} ms')
+    print(f'  pygame imported: {loaded_pygame}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+'''
+Time the ladder reader on a ladder running across the whole board.
+
+    python benchmarks/bench_ladder.py [--board-size 19] [--repeat 200]
+'''
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game import Game
+from src.ladder import read_ladder
+from src.tactics import TacticalState
+
+
+def make_ladder(board_size, breaker):
+    config = {'black_stone': 'b', 'white_stone': 'w',
+              'board_size': board_size, 'enable_self_destruct': False}
+    game = Game(config)
+    for y, x in [(2, 2), (3, 2)]:
+        game.place_black(y, x)
+    for y, x in [(1, 2), (2, 1), (2, 3), (3, 1), (4, 2)]:
+        game.place_white(y, x)
+    if breaker:
+        game.place_black(board_size - 4, board_size - 3)
+    return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--board-size', type=int, default=19)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f'ladder reading on {args.board_size}x{args.board_size}')
+    for breaker in (False, True):
+        game = make_ladder(args.board_size, breaker)
+        state = TacticalState.from_game(game)
+        result = read_ladder(state, 2, 2)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            read_ladder(state, 2, 2)
+        seconds = (time.perf_counter() - start) / args.repeat
+        label = 'with breaker' if breaker else 'no breaker  '
+        print(f'  {label}  escapes {result.escapes!s:5}  {result.nodes:4d} nodes  '
+              f'{seconds * 1e6:8.1f} us/read')
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        TacticalState.from_game(game)
+    seconds = (time.perf_counter() - start) / args.repeat
+    print(f'  TacticalState.from_game  {seconds * 1e6:8.1f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+'''
+Compare random playouts with and without early termination by unconditional life,
+and cut off after a number of moves and scored by influence.
+
+    python benchmarks/bench_playout.py [--board-size 19] [--playouts 20] [--cutoff 60]
+'''
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game import Game
+from src.playout import random_playout
+
+
+def run(board_size, playouts, use_benson, seed, cutoff=None):
+    config = {'black_stone': 'b', 'white_stone': 'w',
+              'board_size': board_size, 'enable_self_destruct': False}
+    rng = random.Random(seed)
+    moves, stopped_early = 0, 0
+    start = time.perf_counter()
+    for _ in range(playouts):
+        result = random_playout(Game(config), rng, use_benson=use_benson, copy_game=False,
+                               cutoff=cutoff)
+        moves += result.num_moves
+        stopped_early += result.stopped_early
+    elapsed = time.perf_counter() - start
+    return moves / playouts, stopped_early, elapsed / playouts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--board-size', type=int, default=19)
+    parser.add_argument('--playouts', type=int, default=20)
+    parser.add_argument('--cutoff', type=int, default=60)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f'{args.playouts} random playouts on {args.board_size}x{args.board_size}')
+    for label, use_benson, cutoff in (('plain ', False, None), ('benson', True, None),
+                                      ('cutoff', False, args.cutoff)):
+        length, stopped_early, seconds = run(args.board_size, args.playouts, use_benson, args.seed,
+                                             cutoff)
+        print(f'  {label}  mean length {length:6.1f} moves  '
+              f'stopped early {stopped_early:3d}  {seconds * 1000:8.1f} ms/playout')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+'''
+Time headless rendering of positions to PNG thumbnails (see src.thumbnails):
+drawing alone, drawing plus PNG encoding in this process, and whole batches
+rendered by pools of worker processes, in images per second.
+
+    python benchmarks/bench_render.py [--board-size 19] [--image-size 200] [--positions 400] [--workers 1 2 4]
+'''
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game import Game
+from src.playout import random_playout
+from src.thumbnails import get_ui, render_board, render_boards
+
+
+def make_boards(config, count, seed):
+    rng = random.Random(seed)
+    size = config['board_size']
+    boards = []
+    for _ in range(count):
+        game = Game(config)
+        random_playout(game, rng, max_moves=rng.randrange(size * size), use_benson=False,
+                       copy_game=False)
+        boards.append(game.board.copy())
+    return boards
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--board-size', type=int, default=19)
+    parser.add_argument('--image-size', type=int, default=200)
+    parser.add_argument('--positions', type=int, default=400)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    config = {'black_stone': 'b', 'white_stone': 'w',
+              'board_size': args.board_size, 'enable_self_destruct': False}
+    boards = make_boards(config, args.positions, args.seed)
+    directory = tempfile.mkdtemp()
+    paths = [os.path.join(directory, f'{i}.png') for i in range(len(boards))]
+
+    print(f'{args.positions} positions on {args.board_size}x{args.board_size}, '
+          f'{args.image_size}x{args.image_size} images')
+    try:
+        ui = get_ui(args.board_size, args.image_size)
+        start = time.perf_counter()
+        for board in boards:
+            ui.draw(board)
+        seconds = time.perf_counter() - start
+        print(f'  draw only      {len(boards) / seconds:8.0f} images/s')
+
+        start = time.perf_counter()
+        for board, path in zip(boards, paths):
+            render_board(board, path, args.image_size)
+        seconds = time.perf_counter() - start
+        print(f'  in process     {len(boards) / seconds:8.0f} images/s')
+
+        for workers in args.workers:
+            # includes starting the pool, as a nightly batch would
+            start = time.perf_counter()
+            render_boards(boards, paths, args.image_size, workers)
+            seconds = time.perf_counter() - start
+            print(f'  {workers} workers      {len(boards) / seconds:8.0f} images/s')
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+'''
+Time scoring a batch of finished games: Game.get_scores on each game, against
+one score_boards call on all the boards (see src.scoring).
+
+    python benchmarks/bench_scoring.py [--board-size 19] [--games 200]
+'''
+import os
+import sys
+import time
+import random
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game import Game
+from src.playout import random_playout
+from src.scoring import score_boards
+from src.utils import Stone
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--board-size', type=int, default=19)
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    config = {'black_stone': 'b', 'white_stone': 'w',
+              'board_size': args.board_size, 'enable_self_destruct': False}
+    rng = random.Random(args.seed)
+    games = []
+    for _ in range(args.games):
+        game = Game(config)
+        random_playout(game, rng, use_benson=False, copy_game=False)
+        games.append(game)
+    boards = np.stack([np.asarray(game.board) for game in games])
+    captured = np.array([(game.num_black_captured, game.num_white_captured) for game in games])
+
+    start = time.perf_counter()
+    expected = [game.get_scores() for game in games]
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores = score_boards(boards, captured)
+    batch = time.perf_counter() - start
+
+    assert scores.tolist() == [[s[Stone.BLACK], s[Stone.WHITE]] for s in expected], 'scores differ'
+    print(f'{args.games} finished games on {args.board_size}x{args.board_size}')
+    print(f'  get_scores    {loop / args.games * 1e6:8.1f} us/game')
+    print(f'  score_boards  {batch / args.games * 1e6:8.1f} us/game  ({loop / batch:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+'''
+Measure the latency of the anytime search against its time budget.
+
+    python benchmarks/bench_search.py [--board-size 19] [--budget 0.05] [--searches 50]
+'''
+import os
+import sys
+import random
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game import Game
+from src.playout import random_playout
+from src.search import AnytimeSearch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--board-size', type=int, default=19)
+    parser.add_argument('--budget', type=float, default=0.05)
+    parser.add_argument('--searches', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    config = {'black_stone': 'b', 'white_stone': 'w',
+              'board_size': args.board_size, 'enable_self_destruct': False}
+    game = Game(config)
+    random_playout(game, random.Random(args.seed), max_moves=args.board_size ** 2 // 3,
+                   use_benson=False, copy_game=False)
+
+    search = AnytimeSearch(time_budget=args.budget, seed=args.seed)
+    results = [search.search(game) for _ in range(args.searches)]
+    latencies = np.array([result.elapsed for result in results]) * 1e3
+    nodes = np.array([result.nodes for result in results])
+    checks = np.array([result.deadline_checks for result in results])
+
+    print(f'anytime search on {args.board_size}x{args.board_size}, budget {args.budget * 1e3:.1f} ms')
+    print(f'  latency  p50 {np.percentile(latencies, 50):7.2f} ms  p99 {np.percentile(latencies, 99):7.2f} ms  '
+          f'max {latencies.max():7.2f} ms')
+    print(f'  playouts {nodes.mean():7.1f} per search')
+    print(f'  deadline {checks.mean():7.1f} checks per search at {search.check_cost * 1e9:.0f} ns, '
+          f'{np.mean([r.check_overhead for r in results]) * 1e6:.1f} us per search')
+
+
+if __name__ == '__main__':
+    main()
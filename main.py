@@ -1,9 +1,19 @@
 import yaml
 from src.board import Board
-from src.game import GameUI
+from src.book import OpeningBook
+from src.game_ui import GameUI
+from src.player import make_player
+from src.trace import configure as configure_tracing
+from src.utils import Stone
 
 def main(config):
-    game = GameUI(config)
+    configure_tracing(config)
+    book = OpeningBook(config['opening_book']) if config.get('opening_book') else None
+    players = {
+        Stone.BLACK: make_player(config.get('black_player'), book=book),
+        Stone.WHITE: make_player(config.get('white_player'), book=book),
+    }
+    game = GameUI(config, players)
     game.play()
 
 if __name__ == '__main__':
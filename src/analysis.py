@@ -0,0 +1,204 @@
+'''
+Whole-game analysis. Every position of a game record is evaluated with random
+playouts in a pool of worker processes, and the results are streamed back in
+move order as soon as each one, and all those before it, are done. The positions
+are handed to the workers in shared memory (see src.positions), so a task only
+sends the number of its position.
+
+    python -m src.analysis <journal directory> <game id> [--workers 4] [--playouts 8]
+'''
+import os
+import sys
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import yaml
+import numpy as np
+
+from src.game import Game
+from src.backends import DEFAULT_BACKEND, available_backends
+from src.evaluator import ReferenceEvaluator, feature_planes
+from src.journal import read_log, take_snapshot, restore_snapshot
+from src.positions import SharedPositions
+from src.playout import random_playout
+from src.utils import Stone
+from src.exceptions import SelfDestructException, KoException
+
+
+class PositionAnalysis(object):
+    '''
+    Analysis of the position before a move of the game
+    '''
+    def __init__(self, move_number, turn, played, score, black_win_rate, best_moves):
+
+        # number of moves played before this position
+        self.move_number = move_number
+
+        # player to move
+        self.turn = turn
+
+        # move played in the game from this position, (y, x) or "pass", or None after the last move
+        self.played = played
+
+        # mean black score minus white score over the playouts
+        self.score = score
+
+        # fraction of the playouts won by black
+        self.black_win_rate = black_win_rate
+
+        # candidate moves as ((y, x), win rate for the player to move), best first
+        self.best_moves = best_moves
+
+
+def get_positions(moves, config):
+    '''
+    Replay a game record, a list of (stone, move) pairs with moves as (y, x) or "pass",
+    and return a snapshot (see src.journal.take_snapshot) of every position,
+    from the empty board to the final position
+    '''
+    game = Game(config)
+    positions = [take_snapshot(game)]
+    for stone, move in moves:
+        if move == 'pass':
+            game.pass_turn()
+        else:
+            if game.board[move[0], move[1]] != Stone.EMPTY:
+                raise ValueError(f'Move {move} in the game record is on an occupied point')
+            try:
+                game._place_stone(stone, *move)
+            except (SelfDestructException, KoException):
+                raise ValueError(f'Illegal move {move} in the game record')
+        positions.append(take_snapshot(game))
+    return positions
+
+
+def _playouts(game, playouts, rng):
+    '''
+    Return (mean black minus white score, fraction won by black) over random playouts
+    '''
+    margins = []
+    for _ in range(playouts):
+        scores = random_playout(game, rng).scores
+        margins.append(scores[Stone.BLACK] - scores[Stone.WHITE])
+    margins = np.array(margins)
+    return float(margins.mean()), float((margins > 0).mean() + 0.5 * (margins == 0).mean())
+
+
+def _get_candidates(game, turn, candidates):
+    '''
+    Return up to `candidates` legal moves ranked by the reference evaluator
+    '''
+    policy, _ = ReferenceEvaluator()(feature_planes(game.board, turn)[None])
+    order = np.argsort(-policy[0, :-1], kind='stable')
+    moves = []
+    for point in order[:candidates * 4].tolist():
+        y, x = divmod(point, game.board_size)
+        if game.board[y, x] == Stone.EMPTY and policy[0, point] > 0:
+            moves.append((y, x))
+            if len(moves) == candidates:
+                break
+    return moves
+
+
+def analyze_position(config, snapshot, move_number, played, playouts=8, candidates=3, seed=0):
+    '''
+    Evaluate one position: the score estimate from `playouts` playouts, and the win rate
+    of each of the top `candidates` moves of the reference evaluator, each from
+    `playouts` playouts after the move. Runs in a worker process
+    '''
+    rng = random.Random(seed)
+    game = restore_snapshot(config, snapshot)
+    turn = game.turn
+    score, black_win_rate = _playouts(game, playouts, rng)
+
+    best_moves = []
+    for y, x in _get_candidates(game, turn, candidates):
+        after = restore_snapshot(config, snapshot)
+        try:
+            after._place_stone(turn, y, x)
+        except (SelfDestructException, KoException):
+            continue
+        _, win_rate = _playouts(after, playouts, rng)
+        best_moves.append(((y, x), win_rate if turn == Stone.BLACK else 1 - win_rate))
+    best_moves.sort(key=lambda move: -move[1])
+
+    return PositionAnalysis(move_number, turn, played, score, black_win_rate, best_moves)
+
+
+# positions of the game being analysed, in a worker process
+_worker_positions = None
+
+
+def _init_worker(positions):
+    global _worker_positions
+    _worker_positions = positions
+
+
+def _analyze_shared(config, move_number, played, playouts, candidates, seed):
+    '''
+    analyze_position on a position of the shared block of this worker
+    '''
+    return analyze_position(config, _worker_positions[move_number], move_number, played,
+                            playouts, candidates, seed)
+
+
+def analyze_game(moves, config, workers=None, playouts=8, candidates=3, seed=0):
+    '''
+    Analyse every position of a game record (see get_positions) in a process pool of
+    `workers` processes. Yield a PositionAnalysis per position, in move order, each as
+    soon as it and all positions before it are done
+    '''
+    played = [move for _, move in moves] + [None]
+    with SharedPositions.from_snapshots(get_positions(moves, config), config['board_size']) as positions, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(positions,)) as executor:
+        futures = [executor.submit(_analyze_shared, config, n, played[n], playouts, candidates, seed + n)
+                   for n in range(len(positions))]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def _format_move(move):
+    if move is None:
+        return '-'
+    return move if move == 'pass' else f'{move[0]},{move[1]}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Analyse every position of a journaled game')
+    parser.add_argument('journal')
+    parser.add_argument('game_id')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--playouts', type=int, default=8)
+    parser.add_argument('--candidates', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--config', help='by default config.yaml, if present')
+    parser.add_argument('--backend', default=None, choices=available_backends(),
+                        help='by default engine_backend of the config')
+    args = parser.parse_args(argv)
+
+    config = {'black_stone': 'b', 'white_stone': 'w', 'enable_self_destruct': False}
+    if args.config or os.path.exists('config.yaml'):
+        with open(args.config or 'config.yaml', 'r') as f:
+            config.update(yaml.safe_load(f) or {})
+    config['engine_backend'] = args.backend or config.get('engine_backend') or DEFAULT_BACKEND
+
+    header, entries, _ = read_log(args.journal, args.game_id)
+    config = dict(config, **header)
+    moves = [(entry['s'], entry['m'] if entry['m'] == 'pass' else tuple(entry['m'])) for entry in entries]
+
+    for analysis in analyze_game(moves, config, args.workers, args.playouts, args.candidates, args.seed):
+        player = 'B' if analysis.turn == Stone.BLACK else 'W'
+        best = '  '.join(f'{_format_move(move)} {win_rate:.2f}' for move, win_rate in analysis.best_moves)
+        print(f'{analysis.move_number:4d} {player} played {_format_move(analysis.played):6s} '
+              f'score {analysis.score:+6.1f}  black {analysis.black_win_rate:.2f}  best {best}',
+              flush=True)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
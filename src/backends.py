@@ -0,0 +1,50 @@
+'''
+Registry of game engine backends.
+
+Game(config) builds the game on the backend named by `engine_backend` in the
+config, so callers switch engines through config.yaml alone. A backend is a
+subclass of Game with the same interface and rules; tests/test_backends.py
+runs the same conformance tests on every registered backend, and
+benchmarks/bench_backends.py times the same workload on each of them.
+'''
+import importlib
+
+DEFAULT_BACKEND = 'groups'
+
+# backend name -> "module:class", imported on first use, or the class itself
+BACKENDS = {
+    'groups': 'src.game:Game',
+    'flat': 'src.flatgame:FlatGame',
+}
+
+# backend classes already imported
+_classes = {}
+
+
+def register_backend(name, backend):
+    '''
+    Register a Game subclass, or its "module:class" path, under `name`
+    '''
+    BACKENDS[name] = backend
+    _classes.pop(name, None)
+
+
+def available_backends():
+    return sorted(BACKENDS)
+
+
+def get_backend(name=None):
+    '''
+    Return the Game class of the backend `name`, by default DEFAULT_BACKEND
+    '''
+    name = name or DEFAULT_BACKEND
+    backend = _classes.get(name)
+    if backend is None:
+        if name not in BACKENDS:
+            raise ValueError(f'Unknown engine backend {name!r}, expected one of {available_backends()}')
+        backend = BACKENDS[name]
+        if isinstance(backend, str):
+            module, _, attr = backend.partition(':')
+            backend = getattr(importlib.import_module(module), attr)
+        _classes[name] = backend
+    return backend
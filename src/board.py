@@ -1,6 +1,56 @@
 import numpy as np
 from src.utils import Stone
 
+# Zobrist keys per board size, shared by every board of that size
+_zobrist_keys = {}
+
+# nearest-point scan orders per board size, see get_scan_order
+_scan_orders = {}
+
+# (y, x) tuples of the flat points per board size, see get_coords
+_coords = {}
+
+def get_zobrist_keys(board_size):
+    '''
+    Return the (3, board_size, board_size) uint64 Zobrist keys, indexed by [stone, y, x].
+    Keys are fixed per board size so hashes agree across processes and runs.
+    Empty points have a key of 0, so the empty board hashes to 0
+    '''
+    keys = _zobrist_keys.get(board_size)
+    if keys is None:
+        rng = np.random.default_rng(board_size)
+        keys = rng.integers(1, 2**64, size=(3, board_size, board_size),
+                            dtype=np.uint64, endpoint=False)
+        keys[Stone.EMPTY] = 0
+        _zobrist_keys[board_size] = keys
+    return keys
+
+def get_coords(board_size):
+    '''
+    Return the list of (y, x) of every flat point y * board_size + x, shared so that
+    the tuples are only made once
+    '''
+    coords = _coords.get(board_size)
+    if coords is None:
+        coords = _coords[board_size] = [divmod(p, board_size) for p in range(board_size * board_size)]
+    return coords
+
+def get_scan_order(board_size):
+    '''
+    Return a (board_size ** 2, board_size ** 2) array whose row y * board_size + x lists
+    all flat points by Manhattan distance from (y, x), then by row, then by column
+    from right to left
+    '''
+    order = _scan_orders.get(board_size)
+    if order is None:
+        n = board_size
+        ys, xs = np.divmod(np.arange(n * n), n)
+        dy = ys[None, :] - ys[:, None]
+        dx = xs[None, :] - xs[:, None]
+        key = (np.abs(dy) + np.abs(dx)) * (4 * n * n) + (dy + n) * (2 * n) + (n - dx)
+        order = _scan_orders[board_size] = np.argsort(key, axis=1).astype(np.int16)
+    return order
+
 class Board(np.ndarray):
     '''
     Instance of a 2D grid board extended from np.ndarray
@@ -12,7 +62,7 @@ class Board(np.ndarray):
         # dimension of the board
         board_size = config['board_size']
         shape = (board_size, board_size)
-        obj = super(Board, cls).__new__(cls, shape, dtype=np.int)
+        obj = super(Board, cls).__new__(cls, shape, dtype=int)
 
         obj.board_size = board_size
 
@@ -25,6 +75,18 @@ class Board(np.ndarray):
         # fill board with empty slots
         obj.fill(Stone.EMPTY)
 
+        # Zobrist keys as nested lists, as indexing python ints is faster than numpy scalars
+        obj._zobrist_keys = get_zobrist_keys(board_size).tolist()
+
+        # hash of the current position, updated incrementally as stones are placed and removed
+        obj.zobrist_hash = 0
+
+        # index of the empty points, also kept up to date by place_stone and remove_stone:
+        # their flat positions y * board_size + x in no particular order, and the slot of
+        # every point in that list, or -1 if occupied. None on copies until first used
+        obj._empty = list(range(board_size * board_size))
+        obj._empty_slots = list(range(board_size * board_size))
+
         return obj
 
     def __array_finalize__(self, obj):
@@ -36,6 +98,31 @@ class Board(np.ndarray):
         self.board_size = getattr(obj, 'board_size')
         self.black_stone_render = getattr(obj, 'black_stone_render')
         self.white_stone_render = getattr(obj, 'white_stone_render')
+        self._zobrist_keys = getattr(obj, '_zobrist_keys', None)
+        self.zobrist_hash = getattr(obj, 'zobrist_hash', 0)
+        self._empty = None
+        self._empty_slots = None
+
+    def __reduce__(self):
+        '''
+        Include the board attributes when pickling, e.g. to send a game to a worker process
+        '''
+        reconstruct, args, state = super(Board, self).__reduce__()
+        attrs = (self.board_size, self.black_stone_render, self.white_stone_render,
+                 self.zobrist_hash)
+        return reconstruct, args, (state, attrs)
+
+    def __setstate__(self, state):
+        '''
+        Restore the board attributes stored by __reduce__
+        '''
+        state, attrs = state
+        super(Board, self).__setstate__(state)
+        self.board_size, self.black_stone_render, self.white_stone_render, \
+            self.zobrist_hash = attrs
+        self._zobrist_keys = get_zobrist_keys(self.board_size).tolist()
+        self._empty = None
+        self._empty_slots = None
 
     def get_liberty_coords(self, y, x):
         '''
@@ -57,13 +144,115 @@ class Board(np.ndarray):
         '''
         Place a stone at the specified coordinate
         '''
-        self[y][x] = stone
+        keys = self._zobrist_keys
+        self.zobrist_hash ^= keys[self[y, x]][y][x] ^ keys[stone][y][x]
+        self[y, x] = stone
+
+        if self._empty is not None:
+            if stone == Stone.EMPTY:
+                self._add_empty(y * self.board_size + x)
+            else:
+                self._discard_empty(y * self.board_size + x)
 
     def remove_stone(self, y, x):
         '''
         Remove the stone at the specified coordinate
         '''
-        self[y][x] = Stone.EMPTY
+        self.zobrist_hash ^= self._zobrist_keys[self[y, x]][y][x]
+        self[y, x] = Stone.EMPTY
+        if self._empty is not None:
+            self._add_empty(y * self.board_size + x)
+
+    def set_position(self, stones):
+        '''
+        Overwrite every point with the array `stones`, and recompute the hash
+        '''
+        self[...] = stones
+        self.zobrist_hash = self.compute_zobrist_hash()
+        self._empty = None
+        self._empty_slots = None
+
+    def _add_empty(self, p):
+        slots = self._empty_slots
+        if slots[p] < 0:
+            slots[p] = len(self._empty)
+            self._empty.append(p)
+
+    def _discard_empty(self, p):
+        '''
+        Take p out of the empty-point index, moving the last entry into its slot
+        '''
+        slots = self._empty_slots
+        i = slots[p]
+        if i >= 0:
+            last = self._empty.pop()
+            if last != p:
+                self._empty[i] = last
+                slots[last] = i
+            slots[p] = -1
+
+    def _get_empty_index(self):
+        '''
+        Return the list of empty flat positions, rebuilding the index from the array
+        after a copy
+        '''
+        if self._empty is None:
+            self._empty = np.flatnonzero(np.asarray(self) == Stone.EMPTY).tolist()
+            self._empty_slots = [-1] * (self.board_size * self.board_size)
+            for i, p in enumerate(self._empty):
+                self._empty_slots[p] = i
+        return self._empty
+
+    def num_empty(self):
+        '''
+        Return the number of empty points
+        '''
+        return len(self._get_empty_index())
+
+    def random_empty(self, rng):
+        '''
+        Return a uniformly random empty point as (y, x), or None if the board is full
+        '''
+        empty = self._get_empty_index()
+        if not empty:
+            return None
+        return divmod(empty[int(rng.random() * len(empty))], self.board_size)
+
+    def iter_random_empty(self, rng):
+        '''
+        Yield the empty points as (y, x) in uniformly random order, each drawn in O(1).
+        The draws depend only on the position and `rng`, not on the order of the index,
+        which follows the history of the board. The board must not change while iterating
+        '''
+        empty = sorted(self._get_empty_index())
+        n = len(empty)
+        while n:
+            i = int(rng.random() * n)
+            n -= 1
+            p = empty[i]
+            empty[i] = empty[n]
+            yield divmod(p, self.board_size)
+
+    def nearest_empty(self, y, x):
+        '''
+        Return the empty point closest to (y, x) in Manhattan distance as [y, x],
+        or None if the board is full. Ties go to the smaller row, then to the larger
+        column, which is the order in which the hover cursor scans rings of points
+        '''
+        self._get_empty_index()
+        slots = self._empty_slots
+        for p in get_scan_order(self.board_size)[y * self.board_size + x].tolist():
+            if slots[p] >= 0:
+                return list(divmod(p, self.board_size))
+        return None
+
+    def compute_zobrist_hash(self):
+        '''
+        Compute the Zobrist hash of the position from scratch
+        '''
+        keys = get_zobrist_keys(self.board_size)
+        ys, xs = np.indices(self.shape)
+        return int(np.bitwise_xor.reduce(keys[np.asarray(self), ys, xs], axis=None))
 
     def is_within_bounds(self, y, x):
         '''
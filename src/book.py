@@ -0,0 +1,310 @@
+'''
+Opening book: move statistics for early positions, looked up by a canonical
+position hash that is the same for all 8 rotations and reflections of the board.
+
+The book is a flat binary file, memory-mapped read-only on open, so lookups
+touch only the few pages visited by the binary search, and any number of
+processes can share one copy of the book through the page cache.
+
+    header        8-byte magic, uint32 board size, uint32 unused, uint64 record count
+    hashes        uint64[count]   canonical hash, sorted ascending
+    counts        uint32[count]   times the move was played from the position
+    win_rates     float32[count]  fraction of those games won by the player to move
+    moves         int16[count]    canonical move as y * board_size + x, or -1 for pass
+
+Records of the same position are stored together, most played move first.
+
+    python -m src.book build <book file> <journal directory> [--max-moves 30]
+'''
+import os
+import sys
+import mmap
+import struct
+import argparse
+
+import yaml
+import numpy as np
+
+from src.board import get_zobrist_keys
+from src.game import Game
+from src.backends import DEFAULT_BACKEND, available_backends
+from src.journal import list_games, read_log
+from src.utils import Stone
+from src.exceptions import SelfDestructException, KoException
+
+MAGIC = b'GOBOOK1\x00'
+HEADER = struct.Struct('<8sIIQ')
+
+# mixed into the hash of positions with white to move
+WHITE_TO_MOVE = 0x9E3779B97F4A7C15
+
+PASS = -1
+
+
+def get_symmetries(board_size):
+    '''
+    Return an (8, board_size ** 2) array mapping every flat point to its image
+    under each rotation and reflection of the board. Row 0 is the identity
+    '''
+    index = np.arange(board_size * board_size).reshape(board_size, board_size)
+    images = []
+    for transposed in (index, index.T):
+        for k in range(4):
+            images.append(np.rot90(transposed, k))
+
+    # images[s][y, x] is the point that moves to (y, x), so invert to get where (y, x) goes
+    symmetries = np.empty((8, board_size * board_size), dtype=np.intp)
+    for s, image in enumerate(images):
+        symmetries[s, image.ravel()] = np.arange(board_size * board_size)
+    return symmetries
+
+
+class Canonicalizer(object):
+    '''
+    Computes canonical position hashes for one board size
+    '''
+    def __init__(self, board_size):
+        self.board_size = board_size
+
+        # (8, points) images of every point, and their inverses
+        self.symmetries = get_symmetries(board_size)
+        self.inverses = np.argsort(self.symmetries, axis=1)
+
+        # Zobrist keys as (3, points), matching Board.zobrist_hash under the identity
+        self._keys = get_zobrist_keys(board_size).reshape(3, -1)
+
+    def hashes(self, board, turn):
+        '''
+        Return the hash of the position under each of the 8 symmetries
+        '''
+        stones = np.asarray(board).reshape(-1)
+        hashes = np.bitwise_xor.reduce(self._keys[stones, self.symmetries], axis=1)
+        if turn == Stone.WHITE:
+            hashes ^= np.uint64(WHITE_TO_MOVE)
+        return hashes
+
+    def canonicalize(self, board, turn):
+        '''
+        Return (canonical hash, indices of the symmetries that map the position onto it)
+        '''
+        hashes = self.hashes(board, turn)
+        key = hashes.min()
+        return int(key), np.flatnonzero(hashes == key)
+
+    def to_canonical(self, move, symmetries):
+        '''
+        Map a move ((y, x) or "pass") to its canonical point. A position that is
+        symmetric in itself maps equivalent moves to the smallest of their images
+        '''
+        if move == 'pass':
+            return PASS
+        y, x = move
+        return int(self.symmetries[symmetries, y * self.board_size + x].min())
+
+    def from_canonical(self, point, symmetry):
+        '''
+        Map a canonical point back to the position's own orientation
+        '''
+        if point == PASS:
+            return 'pass'
+        return divmod(int(self.inverses[symmetry, point]), self.board_size)
+
+
+class BookMove(object):
+    '''
+    A book move for a position
+    '''
+    def __init__(self, move, count, win_rate):
+
+        # [y, x], or "pass"
+        self.move = move
+
+        # number of games in which the move was played from the position
+        self.count = count
+
+        # fraction of those games won by the player who made the move
+        self.win_rate = win_rate
+
+    def __repr__(self):
+        return f'BookMove({self.move}, count={self.count}, win_rate={self.win_rate:.3f})'
+
+
+class OpeningBook(object):
+    '''
+    Read-only, memory-mapped opening book
+    '''
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.board_size, _, count = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not an opening book')
+
+        offset = HEADER.size
+        self.hashes = np.frombuffer(self._mmap, '<u8', count, offset)
+        offset += 8 * count
+        self.counts = np.frombuffer(self._mmap, '<u4', count, offset)
+        offset += 4 * count
+        self.win_rates = np.frombuffer(self._mmap, '<f4', count, offset)
+        offset += 4 * count
+        self.moves = np.frombuffer(self._mmap, '<i2', count, offset)
+
+        self.canonicalizer = Canonicalizer(self.board_size)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def __reduce__(self):
+        # workers map the same file rather than receiving a copy of it
+        return (OpeningBook, (self.path,))
+
+    def find(self, key):
+        '''
+        Return the (start, end) record indices of the canonical hash `key`
+        '''
+        key = np.uint64(key)
+        return (int(np.searchsorted(self.hashes, key, 'left')),
+                int(np.searchsorted(self.hashes, key, 'right')))
+
+    def lookup(self, game, turn=None):
+        '''
+        Return the book moves for the current position of `game`, most played first,
+        oriented like the game's board. `turn` defaults to the game's side to move
+        '''
+        if self.board_size != game.board_size:
+            return []
+        turn = game.turn if turn is None else turn
+        key, symmetries = self.canonicalizer.canonicalize(game.board, turn)
+        start, end = self.find(key)
+        return [BookMove(self.canonicalizer.from_canonical(int(self.moves[i]), symmetries[0]),
+                         int(self.counts[i]), float(self.win_rates[i]))
+                for i in range(start, end)]
+
+    def close(self):
+        # release the array views before the mapping, which refuses to close while exported
+        self.hashes = self.counts = self.win_rates = self.moves = None
+        self._mmap.close()
+
+
+def _winner(game):
+    scores = game.get_scores()
+    if scores[Stone.BLACK] == scores[Stone.WHITE]:
+        return Stone.EMPTY
+    return Stone.BLACK if scores[Stone.BLACK] > scores[Stone.WHITE] else Stone.WHITE
+
+
+def build_book(games, path, config, max_moves=30, min_count=1):
+    '''
+    Build a book file at `path` from game records. Each record is a list of
+    (stone, move) pairs with moves as (y, x) or "pass", played from the empty board
+    with `config`. The first `max_moves` moves of every game are counted, and
+    moves played fewer than `min_count` times are left out.
+    Return the number of records written
+    '''
+    board_size = config['board_size']
+    canonicalizer = Canonicalizer(board_size)
+    stats = {}
+
+    for moves in games:
+        game = Game(config)
+        seen = []
+        for n, (stone, move) in enumerate(moves):
+            if n < max_moves:
+                key, symmetries = canonicalizer.canonicalize(game.board, stone)
+                seen.append((key, canonicalizer.to_canonical(move, symmetries), stone))
+            try:
+                if move == 'pass':
+                    game.pass_turn()
+                else:
+                    game._place_stone(stone, *move)
+            except (SelfDestructException, KoException):
+                break
+
+        winner = _winner(game)
+        for key, point, stone in seen:
+            entry = stats.setdefault((key, point), [0, 0.0])
+            entry[0] += 1
+            entry[1] += 1.0 if winner == stone else 0.5 if winner == Stone.EMPTY else 0.0
+
+    records = sorted(((key, -count, point, wins / count)
+                      for (key, point), (count, wins) in stats.items() if count >= min_count))
+    hashes = np.array([r[0] for r in records], dtype='<u8')
+    counts = np.array([-r[1] for r in records], dtype='<u4')
+    points = np.array([r[2] for r in records], dtype='<i2')
+    win_rates = np.array([r[3] for r in records], dtype='<f4')
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, board_size, 0, len(records)))
+        for array in (hashes, counts, win_rates, points):
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+def journal_games(directory, board_size=None):
+    '''
+    Yield the move records of the finished games in a journal directory (see src.journal)
+    '''
+    for game_id in list_games(directory):
+        header, entries, closed = read_log(directory, game_id)
+        if not closed or (board_size is not None and header.get('board_size') != board_size):
+            continue
+        yield [(entry['s'], entry['m'] if entry['m'] == 'pass' else tuple(entry['m']))
+               for entry in entries]
+
+
+class BookEngine(object):
+    '''
+    Engine that plays the most played book move while the position is in the book,
+    and defers to `select_move` once it is not. Picklable, for engines running in a process.
+    `game` is a private copy, as for every engine, so book moves are checked by playing them
+    '''
+    def __init__(self, book, select_move, min_count=1):
+        self.book = book
+        self.select_move = select_move
+        self.min_count = min_count
+
+    def __call__(self, game, stone, report_progress):
+        for book_move in self.book.lookup(game, stone):
+            if book_move.count < self.min_count:
+                break
+            if book_move.move == 'pass':
+                return 'pass'
+            try:
+                game._place_stone(stone, *book_move.move)
+            except (SelfDestructException, KoException):
+                continue
+            return list(book_move.move)
+        return self.select_move(game, stone, report_progress)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build an opening book from journaled games')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build')
+    build.add_argument('book')
+    build.add_argument('journal')
+    build.add_argument('--config', help='by default config.yaml, if present')
+    build.add_argument('--board-size', type=int, default=None, help='by default board_size of the config')
+    build.add_argument('--max-moves', type=int, default=30)
+    build.add_argument('--min-count', type=int, default=1)
+    build.add_argument('--backend', default=None, choices=available_backends(),
+                       help='by default engine_backend of the config')
+    args = parser.parse_args(argv)
+
+    config = {'black_stone': 'b', 'white_stone': 'w', 'board_size': 9, 'enable_self_destruct': False}
+    if args.config or os.path.exists('config.yaml'):
+        with open(args.config or 'config.yaml', 'r') as f:
+            config.update(yaml.safe_load(f) or {})
+    config['board_size'] = args.board_size or config['board_size']
+    config['engine_backend'] = args.backend or config.get('engine_backend') or DEFAULT_BACKEND
+    num_records = build_book(journal_games(args.journal, config['board_size']), args.book, config,
+                             args.max_moves, args.min_count)
+    print(f'wrote {num_records} records to {args.book}')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
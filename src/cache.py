@@ -0,0 +1,157 @@
+import dbm
+import pickle
+import threading
+from collections import OrderedDict
+
+
+def position_key(game, tag):
+    '''
+    Cache key for an evaluation of the current position of `game`.
+    `tag` names the evaluator, so that several evaluators may share one cache
+    '''
+    return (tag, game.board.zobrist_hash, game.turn)
+
+
+class EvaluationCache(object):
+    '''
+    Bounded cache of position evaluations with least-recently-used eviction.
+    Evicted entries are optionally spilled to an on-disk dbm file, and
+    loaded back into memory when they are requested again.
+    '''
+    def __init__(self, max_size=65536, spill_path=None):
+
+        # maximum number of entries held in memory
+        self.max_size = max_size
+
+        # path of the dbm file evicted entries spill to, if any
+        self.spill_path = spill_path
+
+        # entries in order of use, least recently used first
+        self._entries = OrderedDict()
+
+        self._spill = dbm.open(spill_path, 'c') if spill_path else None
+
+        # copies of a game share the cache, and may be evaluated in worker threads
+        self._lock = threading.Lock()
+
+        # hit/miss statistics
+        self.hits = 0
+        self.spill_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, config):
+        '''
+        Create the cache described by `eval_cache_size` and `eval_cache_spill`
+        in the config, or return None if caching is disabled
+        '''
+        max_size = config.get('eval_cache_size', 0)
+        if not max_size:
+            return None
+        return cls(max_size, spill_path=config.get('eval_cache_spill'))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __deepcopy__(self, memo):
+        # copies of a game, e.g. search branches, share the cache of the original
+        return self
+
+    def __reduce__(self):
+        # a worker process gets its own empty cache; the spill file is not shared
+        return EvaluationCache, (self.max_size,)
+
+    def get(self, key, default=None):
+        '''
+        Return the cached value for `key`, or `default` if it is not cached
+        '''
+        with self._lock:
+            return self._get(key, default)
+
+    def _get(self, key, default):
+        value = self._entries.get(key, self)
+        if value is not self:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+        if self._spill is not None:
+            data = self._spill.get(repr(key))
+            if data is not None:
+                value = pickle.loads(data)
+                self.spill_hits += 1
+                self._insert(key, value)
+                return value
+
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        '''
+        Cache `value` for `key`, evicting the least recently used entry if full
+        '''
+        with self._lock:
+            self._put(key, value)
+
+    def _put(self, key, value):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self._entries[key] = value
+            return
+        self._insert(key, value)
+
+    def get_or_compute(self, key, compute):
+        '''
+        Return the cached value for `key`, calling `compute()` and caching its result on a miss
+        '''
+        value = self.get(key, self)
+        if value is self:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _insert(self, key, value):
+        self._entries[key] = value
+        if len(self._entries) > self.max_size:
+            old_key, old_value = self._entries.popitem(last=False)
+            self.evictions += 1
+            if self._spill is not None:
+                self._spill[repr(old_key)] = pickle.dumps(old_value)
+
+    @property
+    def stats(self):
+        '''
+        Return the hit/miss statistics of the cache
+        '''
+        lookups = self.hits + self.spill_hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'spill_hits': self.spill_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits + self.spill_hits) / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        '''
+        Drop all entries and reset the statistics. The spill file is kept
+        '''
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.spill_hits = self.misses = self.evictions = 0
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+
+def cached(cache, tag, evaluate):
+    '''
+    Wrap an evaluator `evaluate(game)` so its results are cached by position
+    '''
+    def cached_evaluate(game):
+        return cache.get_or_compute(position_key(game, tag), lambda: evaluate(game))
+    return cached_evaluate
@@ -0,0 +1,281 @@
+'''
+Differential testing of game engines. Seeded random games are played in lockstep
+on a reference engine and an alternative one, and after every move the outcome
+of the move (played, ko or self-destruct), the board, the capture counts, the ko,
+the player to move and get_scores are compared. A diverging game is shrunk to a
+minimal move sequence that still diverges.
+
+    python -m src.differential [--games 10000] [--workers 4] [--board-size 7]
+'''
+import sys
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.backends import available_backends, get_backend
+from src.utils import Stone
+from src.exceptions import SelfDestructException, KoException
+
+PLAYED = 'played'
+PASSED = 'passed'
+
+
+class Divergence(object):
+    '''
+    First difference between two engines replaying a move sequence
+    '''
+    def __init__(self, seed, moves, field, expected, actual):
+
+        # seed of the random game
+        self.seed = seed
+
+        # (stone, move) pairs, with moves as (y, x) or "pass", up to and including
+        # the first diverging one
+        self.moves = moves
+
+        # what differs: "outcome", "board", "captures", "ko", "turn" or "scores"
+        self.field = field
+
+        # value of the field for the reference and the alternative engine
+        self.expected = expected
+        self.actual = actual
+
+    def __str__(self):
+        return (f'seed {self.seed}: {self.field} differs after {len(self.moves)} moves '
+                f'{self.moves}: expected {self.expected}, got {self.actual}')
+
+
+class DifferentialReport(object):
+    '''
+    Totals of a differential run
+    '''
+    def __init__(self, games=0, moves=0, reference_time=0.0, alternative_time=0.0,
+                 divergences=None, elapsed=0.0):
+        self.games = games
+        self.moves = moves
+
+        # seconds spent inside each engine, playing moves and scoring
+        self.reference_time = reference_time
+        self.alternative_time = alternative_time
+
+        self.divergences = divergences or []
+
+        # wall-clock seconds of the whole run
+        self.elapsed = elapsed
+
+    @property
+    def reference_games_per_sec(self):
+        return self.games / self.reference_time if self.reference_time else 0.0
+
+    @property
+    def alternative_games_per_sec(self):
+        return self.games / self.alternative_time if self.alternative_time else 0.0
+
+    @property
+    def games_per_sec(self):
+        return self.games / self.elapsed if self.elapsed else 0.0
+
+    def add(self, other):
+        self.games += other.games
+        self.moves += other.moves
+        self.reference_time += other.reference_time
+        self.alternative_time += other.alternative_time
+        self.divergences.extend(other.divergences)
+
+
+def _make_game(engine, config):
+    '''
+    Create a game on `engine`, a backend name (see src.backends) or a Game subclass
+    '''
+    if isinstance(engine, str):
+        engine = get_backend(engine)
+    # the engine is chosen here, not by the engine_backend of the config
+    return engine(dict(config, engine_backend=None))
+
+
+def _play(game, stone, move):
+    '''
+    Play `stone` at `move` and return the outcome
+    '''
+    if move == 'pass':
+        game.pass_turn()
+        return PASSED
+    try:
+        game._place_stone(stone, *move)
+    except (SelfDestructException, KoException) as e:
+        return type(e).__name__
+    return PLAYED
+
+
+def _compare(reference, alternative, outcomes, scores):
+    '''
+    Return (field, expected, actual) for the first difference between the engines, or None
+    '''
+    if outcomes[0] != outcomes[1]:
+        return 'outcome', outcomes[0], outcomes[1]
+    if not np.array_equal(np.asarray(reference.board), np.asarray(alternative.board)):
+        return 'board', np.asarray(reference.board).tolist(), np.asarray(alternative.board).tolist()
+    for field, get in (('captures', lambda g: (g.num_black_captured, g.num_white_captured)),
+                       ('ko', lambda g: g.ko),
+                       ('turn', lambda g: g.turn)):
+        expected, actual = get(reference), get(alternative)
+        if expected != actual:
+            return field, expected, actual
+    if scores[0] != scores[1]:
+        return 'scores', scores[0], scores[1]
+    return None
+
+
+class _Lockstep(object):
+    '''
+    A reference and an alternative game played move by move, timing each engine
+    '''
+    def __init__(self, config, reference, alternative):
+        self.games = (_make_game(reference, config), _make_game(alternative, config))
+        self.times = [0.0, 0.0]
+
+    def play(self, stone, move):
+        '''
+        Play `stone` at `move` on both games and return the first difference
+        (see _compare) or None
+        '''
+        outcomes, scores = [], []
+        for i, game in enumerate(self.games):
+            start = time.perf_counter()
+            outcomes.append(_play(game, stone, move))
+            scores.append(game.get_scores())
+            self.times[i] += time.perf_counter() - start
+        return _compare(self.games[0], self.games[1], outcomes, scores)
+
+
+def replay(moves, config, reference='groups', alternative='flat'):
+    '''
+    Replay a game record, a list of (stone, move) pairs, in lockstep. Moves on points
+    occupied in the reference game are skipped, so any subsequence of a game can be
+    replayed. Return (number of moves replayed up to the first difference, field,
+    expected, actual), or None
+    '''
+    lockstep = _Lockstep(config, reference, alternative)
+    board = lockstep.games[0].board
+    for i, (stone, move) in enumerate(moves):
+        if move != 'pass' and board[move[0], move[1]] != Stone.EMPTY:
+            continue
+        difference = lockstep.play(stone, move)
+        if difference is not None:
+            return (i + 1,) + difference
+    return None
+
+
+def shrink(moves, config, reference='groups', alternative='flat'):
+    '''
+    Return a short subsequence of the game record `moves` on which the engines still
+    diverge, found by removing ever smaller chunks of moves for as long as they diverge
+    '''
+    result = replay(moves, config, reference, alternative)
+    if result is None:
+        return moves
+    moves = moves[:result[0]]
+    chunk = len(moves) // 2
+    while chunk:
+        i = 0
+        while i < len(moves):
+            candidate = moves[:i] + moves[i + chunk:]
+            result = replay(candidate, config, reference, alternative)
+            if result is not None:
+                moves = candidate[:result[0]]
+            else:
+                i += chunk
+        chunk //= 2
+    return moves
+
+
+def play_game(seed, config, reference='groups', alternative='flat', max_moves=None, pass_rate=0.05):
+    '''
+    Play a seeded random game in lockstep: uniformly random empty points of the reference
+    game, including illegal ones, and a pass with probability `pass_rate`, until both
+    players pass or after `max_moves` moves. Return (game record as (stone, move) pairs,
+    lockstep, difference or None)
+    '''
+    rng = random.Random(seed)
+    lockstep = _Lockstep(config, reference, alternative)
+    game = lockstep.games[0]
+    size = config['board_size']
+    max_moves = max_moves or 2 * size * size
+
+    moves = []
+    while len(moves) < max_moves and not game.is_over():
+        empty = np.flatnonzero(np.asarray(game.board) == Stone.EMPTY).tolist()
+        if not empty or rng.random() < pass_rate:
+            move = 'pass'
+        else:
+            move = divmod(rng.choice(empty), size)
+        moves.append((game.turn, move))
+        difference = lockstep.play(game.turn, move)
+        if difference is not None:
+            return moves, lockstep, difference
+    return moves, lockstep, None
+
+
+def run_games(seeds, config, reference='groups', alternative='flat', max_moves=None):
+    '''
+    Play a game per seed and return a DifferentialReport, with every divergence shrunk
+    '''
+    report = DifferentialReport()
+    for seed in seeds:
+        moves, lockstep, difference = play_game(seed, config, reference, alternative, max_moves)
+        report.add(DifferentialReport(1, len(moves), *lockstep.times))
+        if difference is not None:
+            moves = shrink(moves, config, reference, alternative)
+            _, field, expected, actual = replay(moves, config, reference, alternative)
+            report.divergences.append(Divergence(seed, moves, field, expected, actual))
+    return report
+
+
+def run(config, games, seed=0, workers=None, reference='groups', alternative='flat',
+        max_moves=None, batch_size=100):
+    '''
+    Play `games` random games with seeds seed, seed + 1, ... in a pool of `workers`
+    processes, in batches of `batch_size` games, and return the total DifferentialReport
+    '''
+    start = time.perf_counter()
+    report = DifferentialReport()
+    batches = [range(first, min(first + batch_size, seed + games))
+               for first in range(seed, seed + games, batch_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_games, batch, config, reference, alternative, max_moves)
+                   for batch in batches]
+        for future in futures:
+            report.add(future.result())
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Play random games on two engines and compare them move by move')
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--board-size', type=int, default=7)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--self-destruct', action='store_true')
+    parser.add_argument('--reference', default='groups', choices=available_backends())
+    parser.add_argument('--alternative', default='flat', choices=available_backends())
+    args = parser.parse_args(argv)
+
+    config = {'black_stone': 'b', 'white_stone': 'w', 'board_size': args.board_size,
+              'enable_self_destruct': args.self_destruct}
+    report = run(config, args.games, args.seed, args.workers, args.reference, args.alternative)
+
+    print(f'{report.games} games, {report.moves} moves on {args.board_size}x{args.board_size} '
+          f'in {report.elapsed:.1f} s ({report.games_per_sec:.1f} games/s)')
+    print(f'  {args.reference:8s} {report.reference_games_per_sec:8.1f} games/s')
+    print(f'  {args.alternative:8s} {report.alternative_games_per_sec:8.1f} games/s')
+    for divergence in report.divergences:
+        print(f'  {divergence}')
+    return 1 if report.divergences else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,258 @@
+'''
+Batched position evaluation. Search threads submit feature planes and wait on
+futures, while one dispatcher thread groups pending positions into batches and
+evaluates each batch with a single vectorized call.
+
+An evaluator is any callable taking planes of shape (N, NUM_PLANES, size, size)
+and returning (policy, value): move probabilities of shape (N, size * size + 1),
+with the last column for passing, and values of shape (N,) in [-1, 1] from the
+point of view of the player to move.
+'''
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+from src.liberties import DIRECTIONS, shift, chain_liberties
+from src.utils import Stone
+
+# own stones, opposing stones, empty points, own and opposing chains in atari,
+# own and opposing chains with two liberties
+NUM_PLANES = 7
+
+# put on the queue by close() to stop the dispatcher
+_STOP = object()
+
+
+def feature_planes(boards, turns):
+    '''
+    Return float32 feature planes of shape (NUM_PLANES, size, size) for a board and the
+    player to move, or (N, NUM_PLANES, size, size) for N boards and N players to move
+    '''
+    boards = np.asarray(boards)
+    turns = np.asarray(turns)
+    own = turns[..., None, None] if turns.ndim else turns
+    opponent = np.where(own == Stone.BLACK, Stone.WHITE, Stone.BLACK)
+    liberties = chain_liberties(boards)
+
+    is_own = boards == own
+    is_opponent = boards == opponent
+    planes = [is_own, is_opponent, boards == Stone.EMPTY,
+              is_own & (liberties == 1), is_opponent & (liberties == 1),
+              is_own & (liberties == 2), is_opponent & (liberties == 2)]
+    return np.stack(planes, axis=-3).astype(np.float32)
+
+
+class ReferenceEvaluator(object):
+    '''
+    Hand-written evaluator in plain NumPy, standing in for a learned model.
+    Stones spread influence to nearby points. The value is the balance of
+    influence over the board, and moves are preferred where influence is
+    contested, and next to chains in atari
+    '''
+    def __init__(self, spread=3, value_scale=4.0, atari_weight=2.0):
+
+        # number of times influence spreads to neighbouring points
+        self.spread = spread
+
+        # steepness of the value as a function of the influence balance
+        self.value_scale = value_scale
+
+        # preference for moves that capture or save chains in atari
+        self.atari_weight = atari_weight
+
+    def __call__(self, planes):
+        planes = np.asarray(planes, dtype=np.float32)
+        n, _, size, _ = planes.shape
+        empty = planes[:, 2]
+
+        influence = planes[:, 0] - planes[:, 1]
+        for _ in range(self.spread):
+            spread = influence.copy()
+            for dy, dx in DIRECTIONS:
+                spread += 0.5 * shift(influence, dy, dx, 0)
+            influence = np.clip(spread, -1, 1)
+
+        balance = influence.reshape(n, -1).mean(axis=1)
+        value = np.tanh(self.value_scale * balance)
+
+        atari = planes[:, 3] + planes[:, 4]
+        near_atari = np.zeros_like(atari)
+        for dy, dx in DIRECTIONS:
+            near_atari += shift(atari, dy, dx, 0)
+        logits = 1.0 - np.abs(influence) + self.atari_weight * np.minimum(near_atari, 1)
+        logits = np.where(empty > 0, logits, -np.inf).reshape(n, -1)
+        logits = np.concatenate([logits, np.zeros((n, 1), dtype=logits.dtype)], axis=1)
+
+        policy = np.exp(logits - logits.max(axis=1, keepdims=True))
+        policy /= policy.sum(axis=1, keepdims=True)
+        return policy.astype(np.float32), value.astype(np.float32)
+
+
+class EvaluationService(object):
+    '''
+    Collects positions submitted from any thread into batches for `evaluator`.
+    A batch is evaluated once `max_batch_size` positions are pending, or `max_wait`
+    seconds after its first position arrived, whichever comes first
+    '''
+    def __init__(self, evaluator, max_batch_size=32, max_wait=0.002):
+        self.evaluator = evaluator
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        # (planes, future, submit time) waiting for the dispatcher
+        self._queue = queue.Queue()
+        self._thread = None
+        self._closed = False
+
+        # held by submit() and close() together with _closed, so that nothing is queued after the stop
+        self._state_lock = threading.Lock()
+
+        # throughput statistics
+        self._lock = threading.Lock()
+        self._started = None
+        self.requests = 0
+        self.batches = 0
+        self.positions = 0
+        self.evaluation_time = 0.0
+        self.total_latency = 0.0
+
+    @classmethod
+    def from_config(cls, config, evaluator):
+        '''
+        Create a service for `evaluator` tuned by `eval_batch_size` and `eval_max_wait`
+        '''
+        return cls(evaluator, max_batch_size=config.get('eval_batch_size', 32),
+                   max_wait=config.get('eval_max_wait', 0.002))
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        '''
+        Start the dispatcher thread
+        '''
+        if self._thread is None:
+            self._started = time.monotonic()
+            self._thread = threading.Thread(target=self._dispatch, daemon=True)
+            self._thread.start()
+
+    def close(self):
+        '''
+        Evaluate the positions already submitted, then stop the dispatcher
+        '''
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        if self._thread is not None:
+            self._thread.join()
+
+    def submit(self, planes):
+        '''
+        Queue feature planes of one position, of shape (NUM_PLANES, size, size).
+        Return a Future resolving to (policy, value)
+        '''
+        future = Future()
+        with self._state_lock:
+            if self._closed:
+                raise RuntimeError('The evaluation service is closed')
+            self.start()
+            self._queue.put((planes, future, time.monotonic()))
+        with self._lock:
+            self.requests += 1
+        return future
+
+    def evaluate(self, planes):
+        '''
+        Evaluate one position, blocking until its batch is done
+        '''
+        return self.submit(planes).result()
+
+    def evaluate_position(self, board, turn):
+        '''
+        Evaluate a board with `turn` to move, blocking until its batch is done
+        '''
+        return self.evaluate(feature_planes(board, turn))
+
+    def _dispatch(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._run(batch)
+
+        # positions submitted before close() still get their results
+        remaining = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                remaining.append(item)
+        for i in range(0, len(remaining), self.max_batch_size):
+            self._run(remaining[i:i + self.max_batch_size])
+
+    def _run(self, batch):
+        '''
+        Evaluate a batch and resolve its futures. A failure fails the futures of the batch
+        only, and the dispatcher goes on with the next one
+        '''
+        # futures cancelled while queued are dropped, and the others can no longer be cancelled
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        start = time.monotonic()
+        try:
+            policy, value = self.evaluator(np.stack([planes for planes, _, _ in batch]))
+            if np.shape(policy)[:1] != (len(batch),) or np.shape(value)[:1] != (len(batch),):
+                raise ValueError(f'The evaluator returned policies of shape {np.shape(policy)} and values '
+                                 f'of shape {np.shape(value)} for a batch of {len(batch)} positions')
+            end = time.monotonic()
+
+            with self._lock:
+                self.batches += 1
+                self.positions += len(batch)
+                self.evaluation_time += end - start
+                self.total_latency += sum(end - submitted for _, _, submitted in batch)
+
+            for i, (_, future, _) in enumerate(batch):
+                future.set_result((policy[i], value[i]))
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def stats(self):
+        '''
+        Return batching and throughput statistics
+        '''
+        with self._lock:
+            elapsed = time.monotonic() - self._started if self._started is not None else 0.0
+            return {
+                'requests': self.requests,
+                'batches': self.batches,
+                'positions': self.positions,
+                'mean_batch_size': self.positions / self.batches if self.batches else 0.0,
+                'mean_latency': self.total_latency / self.positions if self.positions else 0.0,
+                'evaluation_time': self.evaluation_time,
+                'positions_per_second': self.positions / elapsed if elapsed else 0.0,
+            }
@@ -12,3 +12,7 @@ class InvalidInputException(Exception):
 
 class BoardFullException(Exception):
     pass
+
+
+class ProtocolError(Exception):
+    pass
@@ -0,0 +1,222 @@
+'''
+Flat board for fast random playouts, without undo.
+
+Points are a padded flat list like TacticalState. Every chain is a circular
+linked list of its stones, and its head keeps pseudo-liberty statistics:
+the number of (stone, empty neighbour) pairs, and the sum and sum of squares
+of those empty points. A chain has no liberties when the count is 0, and is
+in atari (all pairs on one point) when count * sum of squares == sum ** 2.
+Captures and suicide are then found without walking chains.
+'''
+from src.tactics import BORDER
+from src.utils import Stone
+
+
+class FastBoard(object):
+    '''
+    Playout board. Build one from a TacticalState with from_state,
+    or copy an existing one with copy()
+    '''
+    def __init__(self, board_size):
+        self.board_size = board_size
+        self.stride = stride = board_size + 2
+        n = stride * stride
+
+        self.points = [BORDER] * n
+        for y in range(board_size):
+            for x in range(board_size):
+                self.points[(y + 1) * stride + x + 1] = Stone.EMPTY
+
+        # chain structure: head of the chain of each stone, next stone in its chain,
+        # and number of stones per chain head
+        self.head = list(range(n))
+        self.next = list(range(n))
+        self.size = [1] * n
+
+        # per chain head: pseudo-liberty count, sum and sum of squares of the pseudo-liberties
+        self.libs = [0] * n
+        self.lib_sum = [0] * n
+        self.lib_sum2 = [0] * n
+
+        # point that may not be played because of ko, or None
+        self.ko = None
+
+        # stones captured from each player
+        self.captures = {Stone.BLACK: 0, Stone.WHITE: 0}
+
+    @classmethod
+    def from_state(cls, state):
+        '''
+        Build a board from a TacticalState (or anything with points and board_size)
+        '''
+        board = cls(state.board_size)
+        for p, value in enumerate(state.points):
+            if value == Stone.BLACK or value == Stone.WHITE:
+                board.add_stone(value, p)
+        board.ko = state.ko
+        return board
+
+    def copy(self):
+        board = FastBoard.__new__(FastBoard)
+        board.board_size = self.board_size
+        board.stride = self.stride
+        board.points = self.points[:]
+        board.head = self.head[:]
+        board.next = self.next[:]
+        board.size = self.size[:]
+        board.libs = self.libs[:]
+        board.lib_sum = self.lib_sum[:]
+        board.lib_sum2 = self.lib_sum2[:]
+        board.ko = self.ko
+        board.captures = dict(self.captures)
+        return board
+
+    def neighbors(self, p):
+        return (p - self.stride, p + self.stride, p - 1, p + 1)
+
+    def in_atari(self, p):
+        '''
+        Check if the chain at p has exactly one liberty
+        '''
+        h = self.head[p]
+        return self.libs[h] * self.lib_sum2[h] == self.lib_sum[h] * self.lib_sum[h]
+
+    def is_legal(self, stone, p):
+        '''
+        Check if `stone` may be played at p (empty, not ko, not suicide)
+        '''
+        points = self.points
+        if points[p] != Stone.EMPTY or p == self.ko:
+            return False
+        head, libs, lib_sum, lib_sum2 = self.head, self.libs, self.lib_sum, self.lib_sum2
+        stride = self.stride
+        for n in (p - stride, p + stride, p - 1, p + 1):
+            value = points[n]
+            if value == Stone.EMPTY:
+                return True
+            if value == BORDER:
+                continue
+            # a chain in atari only has p as liberty: capture it, or it gives no liberty
+            h = head[n]
+            in_atari = libs[h] * lib_sum2[h] == lib_sum[h] * lib_sum[h]
+            if (value == stone) != in_atari:
+                return True
+        return False
+
+    def is_own_eye(self, stone, p):
+        points = self.points
+        stride = self.stride
+        for n in (p - stride, p + stride, p - 1, p + 1):
+            if points[n] != stone and points[n] != BORDER:
+                return False
+        return True
+
+    def play(self, stone, p):
+        '''
+        Play `stone` on the empty point p, ignoring ko, and return the removed points:
+        the captured stones, or the player's own chain if the move is a suicide
+        '''
+        opponent = Stone.WHITE if stone == Stone.BLACK else Stone.BLACK
+        points = self.points
+        head = self.head
+        self.add_stone(stone, p)
+
+        captured = []
+        for n in self.neighbors(p):
+            if points[n] == opponent and self.libs[head[n]] == 0:
+                captured.extend(self._remove_chain(n))
+
+        self.ko = None
+        if not captured and self.libs[head[p]] == 0:
+            suicide = self._remove_chain(p)
+            self.captures[stone] += len(suicide)
+            return suicide
+
+        self.captures[opponent] += len(captured)
+        if len(captured) == 1 and self.size[head[p]] == 1 and self.in_atari(p):
+            self.ko = captured[0]
+        return captured
+
+    def add_stone(self, stone, p):
+        '''
+        Put `stone` on the empty point p, joining chains but capturing nothing
+        '''
+        points = self.points
+        head = self.head
+        libs, lib_sum, lib_sum2 = self.libs, self.lib_sum, self.lib_sum2
+
+        points[p] = stone
+        head[p] = p
+        self.next[p] = p
+        self.size[p] = 1
+        libs[p] = lib_sum[p] = lib_sum2[p] = 0
+        square = p * p
+        for n in self.neighbors(p):
+            value = points[n]
+            if value == Stone.EMPTY:
+                libs[p] += 1
+                lib_sum[p] += n
+                lib_sum2[p] += n * n
+            elif value != BORDER:
+                # p is no longer a liberty of the neighbouring chain
+                h = head[n]
+                libs[h] -= 1
+                lib_sum[h] -= p
+                lib_sum2[h] -= square
+
+        for n in self.neighbors(p):
+            if points[n] == stone and head[n] != head[p]:
+                self._merge(head[p], head[n])
+
+    def _merge(self, a, b):
+        '''
+        Merge the chains with heads a and b, relabelling the smaller one
+        '''
+        head = self.head
+        nxt = self.next
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+
+        q = b
+        while True:
+            head[q] = a
+            q = nxt[q]
+            if q == b:
+                break
+        nxt[a], nxt[b] = nxt[b], nxt[a]
+        self.size[a] += self.size[b]
+        self.libs[a] += self.libs[b]
+        self.lib_sum[a] += self.lib_sum[b]
+        self.lib_sum2[a] += self.lib_sum2[b]
+
+    def _remove_chain(self, p):
+        '''
+        Take the chain at p off the board, giving liberties back to its neighbours.
+        Return the removed points
+        '''
+        points = self.points
+        head = self.head
+        nxt = self.next
+        stones = []
+        q = p
+        while True:
+            stones.append(q)
+            q = nxt[q]
+            if q == p:
+                break
+
+        for q in stones:
+            points[q] = Stone.EMPTY
+        for q in stones:
+            square = q * q
+            for n in self.neighbors(q):
+                value = points[n]
+                if value == Stone.BLACK or value == Stone.WHITE:
+                    h = head[n]
+                    self.libs[h] += 1
+                    self.lib_sum[h] += q
+                    self.lib_sum2[h] += square
+        return stones
+
+    def empty_points(self):
+        return [p for p, value in enumerate(self.points) if value == Stone.EMPTY]
@@ -0,0 +1,206 @@
+'''
+Alternative game engine with the rules and interface of src.game.Game.
+
+Chains are kept on a FastBoard (flat points, linked chains with incremental
+pseudo-liberties) instead of Group objects, and the Board is only written to
+mirror the position. The rules follow Game exactly, including its ko rule:
+the ko is the stone that captured a single stone, and recapturing that stone
+with a move that captures nothing else is forbidden for as long as the ko is
+kept. Registered as the "flat" engine backend (see src.backends), and checked
+against Game by src.differential.
+'''
+from src.board import Board
+from src.game import Game
+from src.group import Group
+from src.fastboard import FastBoard
+from src.tactics import BORDER
+from src.utils import Stone, get_opposite_stone
+from src.cache import EvaluationCache
+from src.trace import traced
+from src.exceptions import SelfDestructException, KoException
+
+
+class FlatGame(Game):
+    '''
+    Game on flat chains instead of a GroupManager
+    '''
+    def __init__(self, config):
+
+        # 2D board, mirroring the flat board
+        self.board = Board(config)
+
+        # dimension of the square board
+        self.board_size = config['board_size']
+
+        # allow self-destruction
+        self.enable_self_destruct = config['enable_self_destruct']
+
+        # chains and liberties
+        self._flat = FastBoard(self.board_size)
+
+        # stone that took a ko on the last move, as (y, x), see Game.ko
+        self._ko = None
+
+        # Group objects handed out by get_group for the current position, by chain head
+        self._groups = {}
+
+        # count the number of consecutive passes
+        self.count_pass = 0
+
+        # the player to move next
+        self.turn = Stone.BLACK
+
+        # optional cache of position evaluations, shared with copies of this game
+        self.eval_cache = EvaluationCache.from_config(config)
+
+    @property
+    def ko(self):
+        return self._ko
+
+    @traced('place_stone', 'game')
+    def _place_stone(self, stone, y, x):
+        '''
+        Place a stone on the empty point (y, x) and resolve captures.
+        Throw an exception if self-destruct or ko rules are violated
+        '''
+        if stone == Stone.EMPTY:
+            return
+        flat = self._flat
+        points = flat.points
+        stride = flat.stride
+        p = (y + 1) * stride + x + 1
+        opponent = get_opposite_stone(stone)
+
+        # neighbours of p in opposing chains whose last liberty is p
+        neighbors = (p - stride, p + stride, p - 1, p + 1)
+        captured = [n for n in neighbors if points[n] == opponent and flat.in_atari(n)]
+
+        ko = None
+        if len(captured) == 1:
+            n = captured[0]
+            if (n // stride - 1, n % stride - 1) == self._ko:
+                raise KoException('You may not repeat the last board state. Please choose a different move')
+            ko = (y, x) if flat.size[flat.head[n]] == 1 else self._ko
+
+        # suicide: no empty neighbour, and no friendly chain with another liberty
+        if not captured and not any(points[n] == Stone.EMPTY or (points[n] == stone and not flat.in_atari(n))
+                                    for n in neighbors):
+            if not self.enable_self_destruct:
+                raise SelfDestructException('Self destruction is not permitted. Please choose a different move.')
+
+        # set only once the move is allowed, so that a refused move leaves the ko as it was
+        self._ko = ko
+
+        board = self.board
+        board.place_stone(stone, y, x)
+        for q in flat.play(stone, p):
+            board.remove_stone(q // stride - 1, q % stride - 1)
+        self._groups = {}
+
+        self.count_pass = 0
+        self.turn = opponent
+
+    @property
+    def num_black_captured(self):
+        return self._flat.captures[Stone.BLACK]
+
+    @property
+    def num_white_captured(self):
+        return self._flat.captures[Stone.WHITE]
+
+    def get_group(self, y, x):
+        '''
+        Return a Group with the stones and liberties of the chain at (y, x), or None if
+        the point is empty. Stones of one chain get the same Group until the next move
+        '''
+        flat = self._flat
+        stride = flat.stride
+        p = (y + 1) * stride + x + 1
+        if flat.points[p] == Stone.EMPTY:
+            return None
+        head = flat.head[p]
+        group = self._groups.get(head)
+        if group is None:
+            group = self._groups[head] = Group(flat.points[p])
+            q = head
+            while True:
+                group.coords.add((q // stride - 1, q % stride - 1))
+                for n in flat.neighbors(q):
+                    if flat.points[n] == Stone.EMPTY:
+                        group.liberties.add((n // stride - 1, n % stride - 1))
+                q = flat.next[q]
+                if q == head:
+                    break
+        return group
+
+    def get_groups_by_liberties(self, stone, liberties):
+        '''
+        Return the groups of `stone` with `liberties` liberties, 3 standing for 3 or more.
+        Pseudo-liberties do not give exact counts, so this looks at every chain
+        '''
+        flat = self._flat
+        stride = flat.stride
+        groups = []
+        for p, value in enumerate(flat.points):
+            if value == stone and flat.head[p] == p:
+                group = self.get_group(p // stride - 1, p % stride - 1)
+                if min(group.num_liberties, 3) == min(liberties, 3):
+                    groups.append(group)
+        return groups
+
+    def _load_position(self, board, labels, captured, ko):
+        '''
+        Set up a position on this new game, see Game._load_position.
+        Chains follow from the stones, so `labels` is not needed
+        '''
+        flat = self._flat
+        for y in range(self.board_size):
+            for x in range(self.board_size):
+                stone = int(board[y, x])
+                if stone != Stone.EMPTY:
+                    self.board.place_stone(stone, y, x)
+                    flat.add_stone(stone, (y + 1) * flat.stride + x + 1)
+        flat.captures[Stone.BLACK], flat.captures[Stone.WHITE] = captured
+        self._ko = ko
+        self._groups = {}
+
+    def _get_flat_board(self):
+        '''
+        Moves of apply_moves are played on the game's own flat board
+        '''
+        return self._flat
+
+    def _set_flat_board(self, flat, ko):
+        self._ko = ko
+        self._groups = {}
+
+    def _count_territory(self):
+        '''
+        Return the number of territory points of black and white: empty regions
+        bordered by stones of one player only
+        '''
+        points = self._flat.points
+        stride = self._flat.stride
+        seen = bytearray(len(points))
+        scores = {Stone.BLACK: 0, Stone.WHITE: 0}
+
+        for p, value in enumerate(points):
+            if value != Stone.EMPTY or seen[p]:
+                continue
+            seen[p] = 1
+            region = [p]
+            # bitwise or of the bordering stones: BLACK | WHITE is neutral
+            owner = 0
+            for q in region:
+                for n in (q - stride, q + stride, q - 1, q + 1):
+                    value = points[n]
+                    if value == Stone.EMPTY:
+                        if not seen[n]:
+                            seen[n] = 1
+                            region.append(n)
+                    elif value != BORDER:
+                        owner |= value
+            if owner == Stone.BLACK or owner == Stone.WHITE:
+                scores[owner] += len(region)
+
+        return scores[Stone.BLACK], scores[Stone.WHITE]
@@ -1,15 +1,15 @@
-from src.board import Board
+import numpy as np
+
+from src.board import Board, get_coords
 from src.utils import *
+from src.backends import get_backend
+from src.fastboard import FastBoard
+from src.liberties import label_chains, chain_liberties
+from src.influence import estimate_scores
 from src.group import Group, GroupManager
-from src.ui import UI
-from src.exceptions import (
-    SelfDestructException,
-    KoException,
-    InvalidInputException,
-    BoardFullException,
-)
-
-import pygame
+from src.cache import EvaluationCache, position_key
+from src.trace import traced
+from src.exceptions import SelfDestructException, KoException
 
 
 class Game(object):
@@ -17,6 +17,15 @@ class Game(object):
     Manage the high level gameplay of Go
     """
 
+    def __new__(cls, config=None):
+        """
+        Create the game on the backend named by `engine_backend` in the config
+        (see src.backends). Backend subclasses are created as they are
+        """
+        if cls is Game and config is not None and config.get("engine_backend"):
+            cls = get_backend(config["engine_backend"])
+        return super().__new__(cls)
+
     def __init__(self, config):
 
         # 2D board
@@ -33,6 +42,12 @@ class Game(object):
         # count the number of consecutive passes
         self.count_pass = 0
 
+        # the player to move next
+        self.turn = Stone.BLACK
+
+        # optional cache of position evaluations, shared with copies of this game
+        self.eval_cache = EvaluationCache.from_config(config)
+
     def place_black(self, y, x):
         """
         Place a black stone at coordinate (y, x)
@@ -50,6 +65,7 @@ class Game(object):
         Pass this turn
         """
         self.count_pass += 1
+        self.turn = get_opposite_stone(self.turn)
 
     def is_over(self):
         """
@@ -63,6 +79,7 @@ class Game(object):
         """
         return self.board.is_within_bounds(y, x)
 
+    @traced("place_stone", "game")
     def _place_stone(self, stone, y, x):
         """
         Place a stone at (y, x), then resolve interactions due to the move.
@@ -82,6 +99,7 @@ class Game(object):
             raise e
 
         self.count_pass = 0
+        self.turn = get_opposite_stone(stone)
         self.gm.update_state()
 
     @property
@@ -98,12 +116,232 @@ class Game(object):
         """
         return self.gm._num_captured_stones[Stone.WHITE]
 
+    @property
+    def ko(self):
+        """
+        Return the coordinate of the stone that took a ko, which may not be
+        recaptured right away, or None
+        """
+        return self.gm._ko
+
+    def get_group(self, y, x):
+        """
+        Return the group of the stone at (y, x), or None if the point is empty
+        """
+        return self.gm._get_group(y, x)
+
+    def get_groups_by_liberties(self, stone, liberties):
+        """
+        Return the groups of `stone` with `liberties` liberties, 3 standing for 3 or more,
+        in time proportional to their number
+        """
+        return self.gm.get_groups_by_liberties(stone, liberties)
+
+    @classmethod
+    def from_array(cls, board, to_move, ko=None, captures=(0, 0), config=None):
+        """
+        Create a game with the position of `board`, an array of stones, with
+        `to_move` to play, the ko as (y, x) or None (see ko), and the numbers of
+        captured black and white stones. The chains are labelled and their groups
+        built in one pass rather than placing stones one by one.
+        `config` defaults to a plain config for the size of the board
+        """
+        board = np.asarray(board)
+        if board.ndim != 2 or board.shape[0] != board.shape[1]:
+            raise ValueError(f"Expected a square board, got shape {board.shape}")
+        if config is None:
+            config = {"black_stone": "b", "white_stone": "w", "board_size": board.shape[0],
+                      "enable_self_destruct": False}
+        elif config["board_size"] != board.shape[0]:
+            raise ValueError(f"Board of size {board.shape[0]} for a game of size {config['board_size']}")
+
+        labels = label_chains(board)
+        if np.any(chain_liberties(board, labels)[labels > 0] == 0):
+            raise ValueError("The board has chains without liberties")
+
+        game = cls(config)
+        game._load_position(board, labels, captures, None if ko is None else tuple(ko))
+        game.turn = int(to_move)
+        return game
+
+    def _load_position(self, board, labels, captured, ko):
+        """
+        Set up a position on this new game: the stones of `board`, grouped by the
+        chain labels `labels` (0 for empty points), the numbers of captured black
+        and white stones, and the ko as (y, x) or None
+        """
+        self.board.set_position(board)
+        self._build_groups(labels)
+
+        self.gm._num_captured_stones[Stone.BLACK] = int(captured[0])
+        self.gm._num_captured_stones[Stone.WHITE] = int(captured[1])
+        self.gm._ko = ko
+
+    def _build_groups(self, labels):
+        """
+        Build the groups of the stones on the board, by the chain labels `labels`,
+        in an empty group manager. The stones, liberties and removed liberties of
+        every chain are sorted out with array operations, and only the Group
+        objects are made one by one
+        """
+        board = np.asarray(self.board)
+        labels = np.asarray(labels).astype(np.int64)
+        area = self.board_size * self.board_size
+        points = np.arange(area).reshape(board.shape)
+
+        # one key per (chain, empty or opposing neighbour): the label, then 0 for a
+        # liberty and 1 for a removed liberty, then the neighbour
+        keys = []
+        for stone_side, neighbor_side in (((slice(1, None), slice(None)), (slice(None, -1), slice(None))),
+                                          ((slice(None, -1), slice(None)), (slice(1, None), slice(None))),
+                                          ((slice(None), slice(1, None)), (slice(None), slice(None, -1))),
+                                          ((slice(None), slice(None, -1)), (slice(None), slice(1, None)))):
+            chain = labels[stone_side]
+            neighbor = board[neighbor_side]
+            touching = (chain > 0) & (neighbor != board[stone_side])
+            keys.append(chain[touching] * (2 * area) + (neighbor[touching] != Stone.EMPTY) * area
+                        + points[neighbor_side][touching])
+        keys = np.sort(np.concatenate(keys))
+        keys = keys[np.diff(keys, prepend=-1) != 0]
+
+        # stones by chain, with the label of every chain and its first stone
+        stone_points = np.flatnonzero(labels)
+        stone_labels = labels.reshape(-1)[stone_points]
+        order = np.argsort(stone_labels, kind="stable")
+        stone_labels = stone_labels[order]
+        stone_points = stone_points[order]
+        starts = np.flatnonzero(np.diff(stone_labels, prepend=-1))
+        chain_ids = stone_labels[starts]
+        stones = board.reshape(-1)[stone_points[starts]].tolist()
+        stone_bounds = starts.tolist() + [len(stone_points)]
+        stone_points = stone_points.tolist()
+
+        neighbors = (keys % area).tolist()
+        liberty_bounds = np.searchsorted(keys, chain_ids * (2 * area)).tolist() + [len(neighbors)]
+        removed_bounds = np.searchsorted(keys, chain_ids * (2 * area) + area).tolist()
+
+        coords = get_coords(self.board_size)
+        index = self.gm._liberty_index
+        buckets = self.gm._group_buckets
+        groups = {}
+        for i, label in enumerate(chain_ids.tolist()):
+            group = groups[label] = Group(
+                stones[i],
+                liberties=set(map(coords.__getitem__, neighbors[liberty_bounds[i]:removed_bounds[i]])),
+                removed_liberties=set(map(coords.__getitem__, neighbors[removed_bounds[i]:liberty_bounds[i + 1]])),
+                coords=set(map(coords.__getitem__, stone_points[stone_bounds[i]:stone_bounds[i + 1]])))
+
+            # see GroupManager._index_group
+            bucket = min(len(group.liberties), 3)
+            if bucket:
+                index[group.stone][bucket].add(group)
+                buckets[group] = bucket
+
+        self.gm._group_map = [[groups[label] if label else None for label in row]
+                              for row in labels.tolist()]
+
+    def apply_moves(self, moves, trusted=True, stride=None):
+        """
+        Play a sequence of moves, each by the player to move, encoded as
+        y * board_size + x, or board_size ** 2 for a pass (see encode_moves).
+
+        With `trusted`, the moves are known to be legal: ko and self-destruct are
+        not checked, and the moves are played on a flat board (see src.fastboard).
+        The board is brought up to date where positions are yielded, and the groups
+        once at the end. An illegal move then leaves the game in an undefined state.
+        Otherwise every move is checked, and an illegal one raises as with
+        place_black and place_white.
+
+        With `stride`, return an iterator instead, which plays the moves as it goes
+        and yields (number of moves played, board) after every `stride` moves and
+        after the last one. The board is the game's own, so it changes with the next
+        move; the rest of the game is only up to date once the iterator is done
+        """
+        positions = self._apply_moves(np.asarray(moves, dtype=np.int64).tolist(), trusted, stride)
+        if stride is not None:
+            return positions
+        for _ in positions:
+            pass
+
+    def _apply_moves(self, moves, trusted, stride):
+        """
+        Generator of apply_moves
+        """
+        size = self.board_size
+        pass_move = size * size
+        stride = stride or len(moves) or 1
+        last = len(moves)
+
+        if not trusted:
+            for i, move in enumerate(moves, 1):
+                if move == pass_move:
+                    self.pass_turn()
+                else:
+                    self._place_stone(self.turn, *divmod(move, size))
+                if i % stride == 0 or i == last:
+                    yield i, self.board
+            return
+
+        flat = self._get_flat_board()
+        points = flat.points
+        offset = flat.stride
+        ko = self.ko
+        try:
+            for i, move in enumerate(moves, 1):
+                if move == pass_move:
+                    self.pass_turn()
+                else:
+                    stone = self.turn
+                    opponent = get_opposite_stone(stone)
+                    y, x = divmod(move, size)
+                    p = (y + 1) * offset + x + 1
+
+                    # the ko rule of GroupManager._check_ko, on the neighbours captured by the move
+                    captured = [n for n in (p - offset, p + offset, p - 1, p + 1)
+                                if points[n] == opponent and flat.in_atari(n)]
+                    if len(captured) != 1:
+                        ko = None
+                    elif flat.size[flat.head[captured[0]]] == 1:
+                        ko = (y, x)
+
+                    flat.play(stone, p)
+                    self.count_pass = 0
+                    self.turn = opponent
+                if i % stride == 0 or i == last:
+                    self.board.set_position(np.reshape(points, (offset, offset))[1:-1, 1:-1])
+                    yield i, self.board
+        finally:
+            self.board.set_position(np.reshape(points, (offset, offset))[1:-1, 1:-1])
+            self._set_flat_board(flat, ko)
+
+    def _get_flat_board(self):
+        """
+        Return a flat board (see src.fastboard) with the position of this game,
+        for apply_moves
+        """
+        flat = FastBoard(self.board_size)
+        for y, x in np.argwhere(np.asarray(self.board) != Stone.EMPTY).tolist():
+            flat.add_stone(int(self.board[y, x]), (y + 1) * flat.stride + x + 1)
+        flat.captures = dict(self.gm._num_captured_stones)
+        return flat
+
+    def _set_flat_board(self, flat, ko):
+        """
+        Bring the game up to date with the flat board of apply_moves, which the
+        board already mirrors, and the ko
+        """
+        self.gm = GroupManager(self.board, enable_self_destruct=self.gm.enable_self_destruct)
+        self._build_groups(label_chains(self.board))
+        self.gm._num_captured_stones.update(flat.captures)
+        self.gm._ko = ko
+
     def render_board(self):
         """
         Render the board
         """
         self.board._render()
 
+    @traced("get_scores", "game")
     def get_scores(self):
         """
         Return the score of black and white.
@@ -111,6 +349,34 @@ class Game(object):
         An area is a territory for a player if any area within that territory can only reach
         stones of of that player.
         """
+        if self.eval_cache is None:
+            black_territory, white_territory = self._count_territory()
+        else:
+            # captures are not part of the position hash, so only territory is cached
+            black_territory, white_territory = self.eval_cache.get_or_compute(
+                position_key(self, "territory"), self._count_territory
+            )
+
+        scores = {Stone.BLACK: black_territory, Stone.WHITE: white_territory}
+        scores[Stone.BLACK] -= self.num_black_captured
+        scores[Stone.WHITE] -= self.num_white_captured
+        return scores
+
+    def estimate_scores(self):
+        """
+        Return an estimate of the score of black and white, counted like get_scores
+        but with the territory each player controls by influence (see src.influence),
+        so that it is meaningful before the borders of the territories are closed.
+        """
+        black, white = estimate_scores(
+            self.board, (self.num_black_captured, self.num_white_captured)
+        ).tolist()
+        return {Stone.BLACK: black, Stone.WHITE: white}
+
+    def _count_territory(self):
+        """
+        Return the number of territory points of black and white
+        """
         scores = {Stone.BLACK: 0, Stone.WHITE: 0}
         traversed = make_2d_array(
             self.board_size, self.board_size, default=lambda: False
@@ -148,263 +414,24 @@ class Game(object):
                     if stone is not None and stone != Stone.EMPTY:
                         scores[stone] += score
 
-        scores[Stone.BLACK] -= self.num_black_captured
-        scores[Stone.WHITE] -= self.num_white_captured
-        return scores
+        return scores[Stone.BLACK], scores[Stone.WHITE]
 
 
-class GameUI(object):
+def encode_moves(moves, board_size):
     """
-    Main interface between the game and the players
+    Encode moves given as (y, x) or "pass" for Game.apply_moves
     """
+    return np.array([board_size * board_size if move == "pass" else move[0] * board_size + move[1]
+                     for move in moves], dtype=np.int64)
 
-    def __init__(self, config):
-
-        # the game object
-        self.game = Game(config)
-
-        # the pygame user interface
-        self.ui = UI(config)
-
-        # store which player's turn it is
-        self.turn = Stone.BLACK
-        self.hover_pos = None
-
-        self.board_size = config["board_size"]
-
-        self.ui.render(self.game.board, self.turn, self.hover_pos)
-
-    def play(self):
-        """
-        Start the game of Go. Two players alternate turns placing stones on the board
-        until the game is over.
-        """
-
-        while not self.game.is_over():
-            is_turn_over = False
-            self.game.render_board()
-
-            while not is_turn_over:
-                move = self.handle_user_input()
-                if move is None:
-                    continue
-                elif move == "pass":
-                    self.game.pass_turn()
-                    is_turn_over = True
-                else:
-                    is_turn_over = self._place_stone(move)
-
-            self.ui.render(self.game.board, self.turn, self.hover_pos)
-            self._switch_turns()
-
-        self._display_result()
-
-    def _move_hover(self, y_offset=0, x_offset=0):
-        if not self.hover_pos:
-            self._default_hover()
-            return
-
-        def skip_stones():
-            # skip over already placed stones
-            y, x = self.hover_pos
-            while self.game.board[y][x] != Stone.EMPTY:
-                self.hover_pos[0] += y_offset
-                self.hover_pos[1] += x_offset
-                if self.out_off_bounds(self.hover_pos):
-                    skip_edges()
-                elif self.hover_pos == org_pos:
-                    self.hover_pos = self.next_best_position(org_pos)
-                y, x = self.hover_pos
-
-        def skip_edges():
-            # move to the opposite side of the board
-            for i in [0, 1]:
-                if self.hover_pos[i] < 0:
-                    self.hover_pos[i] = self.board_size - 1
-                    skip_stones()
-                elif self.hover_pos[i] > self.board_size - 1:
-                    self.hover_pos[i] = 0
-                    skip_stones()
-
-        org_pos = list(self.hover_pos)
-
-        assert y_offset or x_offset
-        self.hover_pos[0] += y_offset
-        self.hover_pos[1] += x_offset
-
-        if not self.out_off_bounds(self.hover_pos):
-            skip_stones()
-        skip_edges()
-
-        self.ui.render(self.game.board, self.turn, self.hover_pos)
-
-    def _default_hover(self):
-        center = [self.board_size // 2, self.board_size // 2]
-        self.hover_pos = self.next_best_position(center)
-        self.ui.render(self.game.board, self.turn, self.hover_pos)
-
-    def next_best_position(self, center):
-        for ring_size in range(self.board_size):
-            for y, x in self.get_surrounding_positions(center, ring_size):
-                if self.game.board[y][x] == Stone.EMPTY:
-                    return [y, x]
-        raise BoardFullException
-
-    def out_off_bounds(self, pos):
-        y, x = pos
-        if y < 0 or x < 0 or y >= self.board_size or x >= self.board_size:
-            return True
-        return False
-
-    def get_surrounding_positions(self, center, offset):
-        """returns all positions that sourround the center with a given offset."""
-        y, x = center
-        for y_offset in range(-offset, offset + 1):
-            for x_offset in range(offset, -offset - 1, -1):
-                if abs(y_offset) + abs(x_offset) != offset:
-                    continue
-                pos = [y + y_offset, x + x_offset]
-                if self.out_off_bounds(pos):
-                    continue
-                yield pos
-
-    def handle_user_input(self):
-        move = None
-        for event in pygame.event.get():
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    pygame.quit()
-                    return -1
-
-                elif event.key == pygame.K_UP:
-                    self._move_hover(y_offset=-1)
-                elif event.key == pygame.K_DOWN:
-                    self._move_hover(y_offset=1)
-                elif event.key == pygame.K_LEFT:
-                    self._move_hover(x_offset=-1)
-                elif event.key == pygame.K_RIGHT:
-                    self._move_hover(x_offset=1)
-
-                elif event.key == pygame.K_RETURN:
-                    if self.hover_pos:
-                        move = self.hover_pos
-
-                elif event.key == pygame.K_p:
-                    move = "pass"
-
-        return move
-
-    def _display_result(self):
-        """
-        Show the result of the game including the scores and winner
-        """
-        scores = self.game.get_scores()
-        black_score = scores[Stone.BLACK]
-        white_score = scores[Stone.WHITE]
-
-        print(f"Black score: {black_score}")
-        print(f"White score: {white_score}")
-
-        if black_score == white_score:
-            print("The result is a tie!")
-        else:
-            winner = Stone.BLACK if black_score > white_score else Stone.WHITE
-            winner = self._get_player_name(winner)
-            print(f"The winner is {winner}!")
-
-    def _place_stone(self, move):
-        """
-        Place a stone at the specified coordinate. Return True if it is valid
-        """
-        y, x = move
-        try:
-            if self.turn == Stone.BLACK:
-                self.game.place_black(y, x)
-            elif self.turn == Stone.WHITE:
-                self.game.place_white(y, x)
-            is_turn_over = True
-        except Exception as e:
-            print(e)
-            is_turn_over = False
-        return is_turn_over
-
-    def _get_player_name(self, stone):
-        """
-        Return the player name for the specified stone
-        """
-        return "Black" if stone == Stone.BLACK else "White"
-
-    def _switch_turns(self):
-        """
-        Swap the turn
-        """
-        self.turn = Stone.BLACK if self.turn == Stone.WHITE else Stone.WHITE
 
-    def _prompt_move(self):
-        """
-        Prompt a user input move. The input format is one of
-            - "pass" to pass for the current player   or
-            - "y x" to place a stone at the specified coordinate
-        The prompt repeats until a valid input is given
-        """
-        move = None
-        player = self._get_player_name(self.turn)
-        while not self._is_valid_input(move):
-            print(
-                "Please input a valid move"
-                '(enter "pass" to pass or "y x" to place a stone at the coordinate (y, x))'
-            )
-            move = input(f"{player} move: ")
+def __getattr__(name):
+    """
+    Load GameUI on first access, so that headless users of Game never import pygame
+    """
+    if name == "GameUI":
+        from src.game_ui import GameUI
 
-        return self._parse_move(move)
+        return GameUI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    def _is_valid_input(self, move):
-        """
-        Check if the given input would give a valid move, in terms of placing a stone
-        on the board
-        """
-        if move == "pass":
-            return True
-        try:
-            y, x = self._parse_coordinates(move)
-            return self.game.is_within_bounds(y, x)
-        except:
-            return False
-
-    def _parse_coordinates(self, move):
-        """
-        Parse the coordinate input into (y, x) valid coordinates
-        """
-        y, x = move.strip().split()
-        y = self._label_to_coord(y)
-        x = self._label_to_coord(x)
-        return y, x
-
-    def _label_to_coord(self, label):
-        """
-        Translate an individual input coordinate into a valid one.
-        The labels are given as 0, 1, 2, ... , 9, A, B, ...
-        This helper translates all labels into integer coordinates
-        Eg. _label_to_coord('9') --> 9
-            _label_to_coord('A') --> 10
-            _label_to_coord('C') --> 12
-        """
-        if label.isnumeric():
-            coord = int(label)
-            if coord >= 10:
-                raise InvalidInputException
-            return int(label)
-        if label.isalpha() and label >= "A":
-            diff = ord(label) - ord("A")
-            if diff < 0:
-                raise InvalidInputException
-            return 10 + diff
-        raise InvalidInputException
-
-    def _parse_move(self, move):
-        """
-        Parse an arbitrary input
-        """
-        if move == "pass":
-            return move
-        return self._parse_coordinates(move)
@@ -0,0 +1,371 @@
+from src.game import Game
+from src.utils import *
+from src.ui import UI
+from src.history import MoveHistory
+from src.trace import span
+from src.exceptions import InvalidInputException, BoardFullException
+
+import pygame
+
+
+class GameUI(object):
+    """
+    Main interface between the game and the players
+    """
+
+    def __init__(self, config, players=None):
+
+        # the game object
+        self.game = Game(config)
+
+        # the pygame user interface
+        self.ui = UI(config)
+
+        # engine players by stone; a missing entry or None is a human at the keyboard
+        self.players = players or {}
+
+        # upper bound on redraws per second while an engine is thinking
+        self.frame_rate = config.get("frame_rate", 30)
+
+        # store which player's turn it is
+        self.turn = Stone.BLACK
+        self.hover_pos = None
+
+        self.board_size = config["board_size"]
+
+        # moves played so far, with checkpoints for going back to earlier positions
+        self.history = MoveHistory.from_config(config, self.game)
+
+        # (number of moves, game) of an earlier position on screen, or None for the current one
+        self.viewed = None
+
+        # digits typed so far of a move number to jump to, or None when no number is being typed
+        self.move_entry = None
+
+        self._render()
+
+    def play(self):
+        """
+        Start the game of Go. Two players alternate turns placing stones on the board
+        until the game is over.
+        """
+
+        while not self.game.is_over():
+            is_turn_over = False
+            self.game.render_board()
+
+            player = self.players.get(self.turn)
+            if player is not None:
+                player.start(self.game, self.turn)
+
+            while not is_turn_over:
+                if player is None:
+                    # nothing changes on screen until the human acts, so sleep until an event arrives
+                    move = self.handle_user_input()
+                else:
+                    # wake up once per frame to show the engine's progress
+                    move = self.handle_user_input(timeout=1000 // self.frame_rate)
+                    if move != -1:
+                        move = player.poll()
+                        self._render(progress=player.progress)
+
+                if move == -1:
+                    if player is not None:
+                        player.stop()
+                    return
+                elif move is None:
+                    continue
+                elif move == "pass":
+                    self.game.pass_turn()
+                    is_turn_over = True
+                else:
+                    is_turn_over = self._place_stone(move)
+                    if not is_turn_over and player is not None:
+                        # the engine would answer the same refused move again: pass instead
+                        self.game.pass_turn()
+                        move = "pass"
+                        is_turn_over = True
+                if is_turn_over:
+                    self.history.record(self.game, move)
+
+            self._render()
+            self._switch_turns()
+
+        self._display_result()
+
+    def _move_hover(self, y_offset=0, x_offset=0):
+        if not self.hover_pos:
+            self._default_hover()
+            return
+
+        def skip_stones():
+            # skip over already placed stones
+            y, x = self.hover_pos
+            while self.game.board[y][x] != Stone.EMPTY:
+                self.hover_pos[0] += y_offset
+                self.hover_pos[1] += x_offset
+                if self.out_off_bounds(self.hover_pos):
+                    skip_edges()
+                elif self.hover_pos == org_pos:
+                    self.hover_pos = self.next_best_position(org_pos)
+                y, x = self.hover_pos
+
+        def skip_edges():
+            # move to the opposite side of the board
+            for i in [0, 1]:
+                if self.hover_pos[i] < 0:
+                    self.hover_pos[i] = self.board_size - 1
+                    skip_stones()
+                elif self.hover_pos[i] > self.board_size - 1:
+                    self.hover_pos[i] = 0
+                    skip_stones()
+
+        org_pos = list(self.hover_pos)
+
+        assert y_offset or x_offset
+        self.hover_pos[0] += y_offset
+        self.hover_pos[1] += x_offset
+
+        if not self.out_off_bounds(self.hover_pos):
+            skip_stones()
+        skip_edges()
+
+        self._render()
+
+    def _default_hover(self):
+        center = [self.board_size // 2, self.board_size // 2]
+        self.hover_pos = self.next_best_position(center)
+        self._render()
+
+    def next_best_position(self, center):
+        position = self.game.board.nearest_empty(*center)
+        if position is None:
+            raise BoardFullException
+        return position
+
+    def out_off_bounds(self, pos):
+        y, x = pos
+        if y < 0 or x < 0 or y >= self.board_size or x >= self.board_size:
+            return True
+        return False
+
+    def handle_user_input(self, timeout=None):
+        """
+        Block until at least one event arrives, or until `timeout` milliseconds pass,
+        then process all pending events. Return the chosen move, if any, or -1 on quit
+        """
+        move = None
+        events = [pygame.event.wait(timeout)] if timeout else [pygame.event.wait()]
+        events += pygame.event.get()
+        # waiting for events is not part of the span, only handling them
+        with span("handle_user_input", "ui", events=len(events)):
+            for event in events:
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    return -1
+
+                if event.type == pygame.KEYDOWN and self.move_entry is not None:
+                    self._enter_move_number(event.key)
+
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        pygame.quit()
+                        return -1
+
+                    elif event.key == pygame.K_UP:
+                        self._move_hover(y_offset=-1)
+                    elif event.key == pygame.K_DOWN:
+                        self._move_hover(y_offset=1)
+                    elif event.key == pygame.K_LEFT:
+                        self._move_hover(x_offset=-1)
+                    elif event.key == pygame.K_RIGHT:
+                        self._move_hover(x_offset=1)
+
+                    elif event.key == pygame.K_RETURN:
+                        if self.hover_pos and self.viewed is None:
+                            move = self.hover_pos
+
+                    elif event.key == pygame.K_p:
+                        if self.viewed is None:
+                            move = "pass"
+
+                    elif event.key == pygame.K_COMMA:
+                        self._view_move(self._viewed_move() - 1)
+                    elif event.key == pygame.K_PERIOD:
+                        self._view_move(self._viewed_move() + 1)
+                    elif event.key == pygame.K_HOME:
+                        self._view_move(0)
+                    elif event.key == pygame.K_END:
+                        self._view_move(len(self.history))
+                    elif event.key == pygame.K_g:
+                        self.move_entry = ""
+                        self._render()
+
+        return move
+
+    def _render(self, progress=None):
+        """
+        Render the current position, or the earlier position being viewed
+        """
+        if self.move_entry is not None:
+            caption = f"Jump to move (0-{len(self.history)}): {self.move_entry}"
+        elif self.viewed is not None:
+            caption = f"Move {self.viewed[0]} of {len(self.history)} (End to return to the game)"
+        else:
+            caption = None
+
+        if self.viewed is None:
+            self.ui.render(self.game.board, self.turn, self.hover_pos, progress=progress, caption=caption)
+        else:
+            self.ui.render(self.viewed[1].board, self.turn, None, progress=progress, caption=caption)
+
+    def _viewed_move(self):
+        """
+        Return the number of moves of the position on screen
+        """
+        return len(self.history) if self.viewed is None else self.viewed[0]
+
+    def _view_move(self, num_moves):
+        """
+        Show the position after `num_moves` moves. Moves can only be played
+        once back at the current position
+        """
+        num_moves = max(0, min(num_moves, len(self.history)))
+        if num_moves == len(self.history):
+            self.viewed = None
+        elif self.viewed is None or self.viewed[0] != num_moves:
+            self.viewed = (num_moves, self.history.seek(num_moves))
+        self._render()
+
+    def _enter_move_number(self, key):
+        """
+        Handle a key pressed while typing a move number in the window: digits and
+        backspace edit it, enter jumps to it and escape gives up
+        """
+        if pygame.K_0 <= key <= pygame.K_9:
+            self.move_entry += str(key - pygame.K_0)
+        elif key == pygame.K_BACKSPACE:
+            self.move_entry = self.move_entry[:-1]
+        elif key == pygame.K_RETURN:
+            entry, self.move_entry = self.move_entry, None
+            if entry:
+                self._view_move(int(entry))
+                return
+        elif key == pygame.K_ESCAPE:
+            self.move_entry = None
+        self._render()
+
+    def _display_result(self):
+        """
+        Show the result of the game including the scores and winner
+        """
+        scores = self.game.get_scores()
+        black_score = scores[Stone.BLACK]
+        white_score = scores[Stone.WHITE]
+
+        print(f"Black score: {black_score}")
+        print(f"White score: {white_score}")
+
+        if black_score == white_score:
+            print("The result is a tie!")
+        else:
+            winner = Stone.BLACK if black_score > white_score else Stone.WHITE
+            winner = self._get_player_name(winner)
+            print(f"The winner is {winner}!")
+
+    def _place_stone(self, move):
+        """
+        Place a stone at the specified coordinate. Return True if it is valid
+        """
+        y, x = move
+        try:
+            if self.turn == Stone.BLACK:
+                self.game.place_black(y, x)
+            elif self.turn == Stone.WHITE:
+                self.game.place_white(y, x)
+            is_turn_over = True
+        except Exception as e:
+            print(e)
+            is_turn_over = False
+        return is_turn_over
+
+    def _get_player_name(self, stone):
+        """
+        Return the player name for the specified stone
+        """
+        return "Black" if stone == Stone.BLACK else "White"
+
+    def _switch_turns(self):
+        """
+        Swap the turn
+        """
+        self.turn = Stone.BLACK if self.turn == Stone.WHITE else Stone.WHITE
+
+    def _prompt_move(self):
+        """
+        Prompt a user input move. The input format is one of
+            - "pass" to pass for the current player   or
+            - "y x" to place a stone at the specified coordinate
+        The prompt repeats until a valid input is given
+        """
+        move = None
+        player = self._get_player_name(self.turn)
+        while not self._is_valid_input(move):
+            print(
+                "Please input a valid move"
+                '(enter "pass" to pass or "y x" to place a stone at the coordinate (y, x))'
+            )
+            move = input(f"{player} move: ")
+
+        return self._parse_move(move)
+
+    def _is_valid_input(self, move):
+        """
+        Check if the given input would give a valid move, in terms of placing a stone
+        on the board
+        """
+        if move == "pass":
+            return True
+        try:
+            y, x = self._parse_coordinates(move)
+            return self.game.is_within_bounds(y, x)
+        except:
+            return False
+
+    def _parse_coordinates(self, move):
+        """
+        Parse the coordinate input into (y, x) valid coordinates
+        """
+        y, x = move.strip().split()
+        y = self._label_to_coord(y)
+        x = self._label_to_coord(x)
+        return y, x
+
+    def _label_to_coord(self, label):
+        """
+        Translate an individual input coordinate into a valid one.
+        The labels are given as 0, 1, 2, ... , 9, A, B, ...
+        This helper translates all labels into integer coordinates
+        Eg. _label_to_coord('9') --> 9
+            _label_to_coord('A') --> 10
+            _label_to_coord('C') --> 12
+        """
+        if label.isnumeric():
+            coord = int(label)
+            if coord >= 10:
+                raise InvalidInputException
+            return int(label)
+        if label.isalpha() and label >= "A":
+            diff = ord(label) - ord("A")
+            if diff < 0:
+                raise InvalidInputException
+            return 10 + diff
+        raise InvalidInputException
+
+    def _parse_move(self, move):
+        """
+        Parse an arbitrary input
+        """
+        if move == "pass":
+            return move
+        return self._parse_coordinates(move)
@@ -145,6 +145,15 @@ class GroupManager(object):
         # ko resulting from the previous move only to check for violation of Ko rule
         self._ko = None
 
+        # groups of each stone color by number of liberties: 1, 2, and 3 for 3 or more
+        self._liberty_index = {
+            Stone.BLACK: {1: set(), 2: set(), 3: set()},
+            Stone.WHITE: {1: set(), 2: set(), 3: set()}
+        }
+
+        # the entry of _liberty_index that each indexed group is in
+        self._group_buckets = {}
+
     def _get_group(self, y, x):
         '''
         Get the group that the stone at the specified coordinate belongs to.
@@ -158,6 +167,39 @@ class GroupManager(object):
             self._group_map[y][x] = new_g
         return new_g
 
+    def _index_group(self, group):
+        '''
+        File the group under its current number of liberties, or drop it
+        from the liberty index if it has none
+        '''
+        bucket = min(len(group.liberties), 3)
+        old_bucket = self._group_buckets.get(group)
+        if bucket == old_bucket:
+            return
+        index = self._liberty_index[group.stone]
+        if old_bucket is not None:
+            index[old_bucket].discard(group)
+        if bucket:
+            index[bucket].add(group)
+            self._group_buckets[group] = bucket
+        elif old_bucket is not None:
+            del self._group_buckets[group]
+
+    def _unindex_group(self, group):
+        '''
+        Drop the group from the liberty index
+        '''
+        bucket = self._group_buckets.pop(group, None)
+        if bucket is not None:
+            self._liberty_index[group.stone][bucket].discard(group)
+
+    def get_groups_by_liberties(self, stone, liberties):
+        '''
+        Return the groups of `stone` with `liberties` liberties, where 3 stands for
+        3 or more. Takes time in the number of groups returned
+        '''
+        return list(self._liberty_index[stone][min(liberties, 3)])
+
     def _is_captured(self, group):
         '''
         Check if the specified group is captured
@@ -191,6 +233,7 @@ class GroupManager(object):
         if self_destruct:
             new_group.assign_group(None)
             if not self.enable_self_destruct:
+                self._captured_groups.discard(new_group)
                 self.undo_stone(y, x)
                 raise SelfDestructException('Self destruction is not permitted. Please choose a different move.')
         
@@ -215,6 +258,7 @@ class GroupManager(object):
                 group.restore_liberty((y, x))
                 group.assign_group(group)
                 self._captured_groups.discard(group)
+                self._index_group(group)
 
         this_group = self._get_group(y, x)
         self._captured_groups.discard(this_group)
@@ -241,6 +285,7 @@ class GroupManager(object):
 
             elif self.board[ly, lx] == opposite_stone:
                 g.remove_liberty((y, x))
+                self._index_group(g)
                 if self._is_captured(g):
                     captured.append((ly, lx))
                     new_group_liberties.add((ly, lx))
@@ -250,6 +295,7 @@ class GroupManager(object):
             else:
                 groups.add(g)
 
+        ko = self._ko
         self._check_ko(y, x, captured)
 
         new_group = Group.merge(stone, groups, (y, x),  
@@ -257,11 +303,18 @@ class GroupManager(object):
                                 removed_liberties=new_group_removed_liberties
                                )
 
-        self._check_self_destruct(y, x, new_group)
+        try:
+            self._check_self_destruct(y, x, new_group)
+        except SelfDestructException:
+            # a refused move leaves the ko as it was
+            self._ko = ko
+            raise
 
         for g in groups:
             g.assign_group(new_group)
+            self._unindex_group(g)
         self._group_map[y][x] = new_group
+        self._index_group(new_group)
 
     def update_state(self):
         '''
@@ -269,10 +322,13 @@ class GroupManager(object):
         At this point, the move prior is considered valid, and 
         all post-processing of captures occurs here
         '''
-        for g in self._captured_groups:
+        # groups and their stones are removed in a fixed order, so that the empty points the
+        # board indexes do not depend on object ids
+        for g in sorted(self._captured_groups, key=lambda g: min(g.coords)):
 
             # nullify group
             g.assign_group(None)
+            self._unindex_group(g)
 
             # restore liberties to those who had liberties removed by a group that was captured
             for y, x in g.removed_liberties:
@@ -283,9 +339,10 @@ class GroupManager(object):
                 for lcoord in liberty_coords:
                     if lcoord in g.coords:
                         group_to_change.restore_liberty(lcoord)
+                self._index_group(group_to_change)
 
             # clear captured regions on board
-            for y, x in g.coords:
+            for y, x in sorted(g.coords):
                 self.board.remove_stone(y, x)
                 self._group_map[y][x] = None
 
@@ -0,0 +1,97 @@
+'''
+Move history of a game, for going back to any earlier position.
+
+Each move is kept as a two-byte delta, encoded as by src.game.encode_moves, and
+the full position is kept every `interval` moves as a checkpoint (a snapshot,
+see src.journal.take_snapshot). Seeking to move n restores the last checkpoint
+at or before n and replays the moves after it with Game.apply_moves, so it
+costs at most `interval` - 1 replays however long the game is.
+
+At most `max_checkpoints` checkpoints are kept: once there would be more, every
+other one is dropped and the interval doubles. Memory then stays bounded at
+about `max_checkpoints` snapshots plus two bytes per move, while seeks replay
+up to the doubled interval.
+'''
+from array import array
+
+from src.game import Game
+from src.journal import take_snapshot, restore_snapshot
+
+
+class MoveHistory(object):
+    '''
+    Moves of a game from its initial position, each played by the player to move,
+    with checkpoints of the position every `interval` moves
+    '''
+    def __init__(self, config, game=None, interval=50, max_checkpoints=64):
+        self.config = config
+        self.board_size = config['board_size']
+        self.interval = interval
+        self.max_checkpoints = max_checkpoints
+
+        # encoded moves in order, board_size ** 2 for a pass
+        self.moves = array('H')
+
+        # snapshots by number of moves played, always including the initial position
+        self.checkpoints = {0: take_snapshot(game if game is not None else Game(config))}
+
+    @classmethod
+    def from_config(cls, config, game=None):
+        '''
+        Create a history starting from `game`, or an empty board, with the interval and
+        bound of `history_checkpoint_interval` and `history_max_checkpoints`
+        '''
+        return cls(config, game, interval=config.get('history_checkpoint_interval') or 50,
+                   max_checkpoints=config.get('history_max_checkpoints') or 64)
+
+    def __len__(self):
+        return len(self.moves)
+
+    def record(self, game, move):
+        '''
+        Record that the player to move played `move` ((y, x) or "pass") in `game`,
+        which must already reflect the move
+        '''
+        self.moves.append(self.board_size ** 2 if move == 'pass'
+                          else move[0] * self.board_size + move[1])
+        if len(self.moves) % self.interval == 0:
+            self.checkpoints[len(self.moves)] = take_snapshot(game)
+            if len(self.checkpoints) > self.max_checkpoints:
+                self._thin_checkpoints()
+
+    def _thin_checkpoints(self):
+        '''
+        Drop every other checkpoint and double the interval
+        '''
+        self.interval *= 2
+        self.checkpoints = {n: snapshot for n, snapshot in self.checkpoints.items()
+                            if n % self.interval == 0}
+
+    def truncate(self, num_moves):
+        '''
+        Forget the moves after the first `num_moves`, to continue the game from there
+        '''
+        del self.moves[num_moves:]
+        self.checkpoints = {n: snapshot for n, snapshot in self.checkpoints.items()
+                            if n <= num_moves}
+
+    def seek(self, num_moves):
+        '''
+        Return a new Game in the position after the first `num_moves` moves
+        '''
+        if not 0 <= num_moves <= len(self.moves):
+            raise IndexError(f'Move {num_moves} is not in a history of {len(self.moves)} moves')
+        start = num_moves - num_moves % self.interval
+        game = restore_snapshot(self.config, self.checkpoints[start])
+        if start < num_moves:
+            # the moves were legal when played, so they are replayed without checking them again
+            game.apply_moves(self.moves[start:num_moves])
+        return game
+
+    @property
+    def nbytes(self):
+        '''
+        Approximate memory held by the moves and the arrays of the checkpoints
+        '''
+        return self.moves.itemsize * len(self.moves) + sum(
+            field.nbytes for snapshot in self.checkpoints.values() for field in snapshot.values())
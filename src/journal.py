@@ -0,0 +1,284 @@
+'''
+Persistence for games: an append-only move log per game, plus a compact
+snapshot of the full position every K moves.
+
+A game is recovered by loading its last snapshot and replaying only the
+moves logged after it.
+
+Recording a move only appends to memory; the writes and fsyncs happen in
+MoveJournal.flush, which may run on another thread, so that a server can keep
+them off its event loop.
+
+    <directory>/<game_id>.log        one JSON object per line: a header with the
+                                     config, then {"n": 1, "s": 1, "m": [y, x]}
+                                     or {"n": 2, "s": 2, "m": "pass"} per move
+    <directory>/<game_id>.snap.npz   latest snapshot (see take_snapshot)
+'''
+import os
+import json
+import time
+import threading
+
+import numpy as np
+
+from src.game import Game
+
+
+# config keys that affect game play, stored in the log header
+GAME_CONFIG_KEYS = ('board_size', 'enable_self_destruct', 'black_stone', 'white_stone')
+
+FSYNC_POLICIES = ('always', 'batch', 'never')
+
+
+def take_snapshot(game):
+    '''
+    Return the full state of `game` as a dict of small NumPy arrays:
+    the board, a group id per point (0 for empty), capture counts, ko,
+    consecutive passes, the side to move and the Zobrist hash of the board
+    '''
+    labels = np.zeros((game.board_size, game.board_size), dtype=np.int16)
+    ids = {}
+    for y in range(game.board_size):
+        for x in range(game.board_size):
+            group = game.get_group(y, x)
+            if group is not None:
+                labels[y, x] = ids.setdefault(id(group), len(ids) + 1)
+
+    ko = game.ko if game.ko is not None else (-1, -1)
+    return {
+        'board': np.array(game.board, dtype=np.int8),
+        'groups': labels,
+        'captured': np.array([game.num_black_captured, game.num_white_captured], dtype=np.int32),
+        'ko': np.array(ko, dtype=np.int16),
+        'count_pass': np.array(game.count_pass, dtype=np.int8),
+        'turn': np.array(game.turn, dtype=np.int8),
+        'hash': np.array(game.board.zobrist_hash, dtype=np.uint64),
+    }
+
+
+def restore_snapshot(config, snapshot):
+    '''
+    Build a Game from a snapshot produced by take_snapshot
+    '''
+    game = Game(config)
+    ko = tuple(snapshot['ko'].tolist())
+    game._load_position(snapshot['board'], snapshot['groups'], snapshot['captured'].tolist(),
+                        ko if ko != (-1, -1) else None)
+    game.count_pass = int(snapshot['count_pass'])
+    game.turn = int(snapshot['turn'])
+    return game
+
+
+def _play(game, stone, move):
+    if move == 'pass':
+        game.pass_turn()
+    else:
+        game._place_stone(stone, *move)
+
+
+class MoveJournal(object):
+    '''
+    Append-only move log with periodic snapshots for a single game.
+
+    `fsync_policy` decides when logged moves are due to be flushed to the disk:
+        "always"  write and fsync every move
+        "batch"   write and fsync once `batch_size` moves are pending,
+                  or the oldest pending move is `flush_interval` seconds old
+        "never"   write in batches like "batch", but leave syncing to the OS
+    record() says when a flush is due, and the caller then calls flush()
+    '''
+    def __init__(self, directory, game_id, config, snapshot_interval=50,
+                 fsync_policy='batch', batch_size=32, flush_interval=1.0, num_moves=0):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f'fsync_policy must be one of {FSYNC_POLICIES}')
+        if snapshot_interval is not None and snapshot_interval < 0:
+            raise ValueError('snapshot_interval must not be negative')
+
+        self.directory = directory
+        self.game_id = game_id
+
+        # write a full snapshot every this many moves, never if 0 or None
+        self.snapshot_interval = snapshot_interval
+
+        self.fsync_policy = fsync_policy
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        # number of moves (including passes) recorded so far, non-zero when resuming a recovered game
+        self.num_moves = num_moves
+
+        # encoded log lines not yet written
+        self._pending = []
+        self._oldest_pending = None
+
+        # (number of moves, arrays of take_snapshot) of a snapshot not yet written
+        self._snapshot = None
+
+        # guards the pending lines and snapshot, which record() adds to while flush() runs
+        self._lock = threading.Lock()
+
+        # held for the whole of a flush, so that flushes of this journal run one at a time
+        self._io_lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(self.log_path(directory, game_id), 'ab')
+        self._truncate_partial_line()
+        if self._file.tell() == 0:
+            header = {key: config[key] for key in GAME_CONFIG_KEYS if key in config}
+            self._append({'config': header})
+            self.flush()
+
+    @staticmethod
+    def log_path(directory, game_id):
+        return os.path.join(directory, f'{game_id}.log')
+
+    @staticmethod
+    def snapshot_path(directory, game_id):
+        return os.path.join(directory, f'{game_id}.snap.npz')
+
+    def record(self, game, stone, move):
+        '''
+        Record in memory that `stone` played `move` ([y, x] or "pass") in `game`,
+        which must already reflect the move. Return True if a flush is due
+        '''
+        self.num_moves += 1
+        snapshot = None
+        if self.snapshot_interval and self.num_moves % self.snapshot_interval == 0:
+            snapshot = take_snapshot(game)
+        with self._lock:
+            self._append({'n': self.num_moves, 's': int(stone),
+                          'm': move if move == 'pass' else [int(move[0]), int(move[1])]})
+            if snapshot is not None:
+                self._snapshot = (self.num_moves, snapshot)
+        return self.is_due()
+
+    def is_due(self):
+        '''
+        Check if pending moves or a snapshot should be flushed now, by the fsync policy
+        '''
+        with self._lock:
+            if self._snapshot is not None:
+                return True
+            if not self._pending:
+                return False
+            return self.fsync_policy == 'always' or len(self._pending) >= self.batch_size \
+                or time.monotonic() - self._oldest_pending >= self.flush_interval
+
+    def _write_snapshot(self, num_moves, snapshot):
+        '''
+        Atomically replace the game's snapshot with one taken after `num_moves` moves
+        '''
+        path = self.snapshot_path(self.directory, self.game_id)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, num_moves=np.array(num_moves), **snapshot)
+            if self.fsync_policy != 'never':
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def close(self, finished=False):
+        '''
+        Flush pending moves and close the log. A finished game is not recovered
+        '''
+        if finished:
+            with self._lock:
+                self._append({'closed': True})
+        with self._io_lock:
+            self._flush()
+            self._file.close()
+
+    def _truncate_partial_line(self):
+        '''
+        Drop a partially written last line left by a crash, so new entries start on a fresh line
+        '''
+        if self._file.tell() == 0:
+            return
+        with open(self._file.name, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b'\n':
+                return
+            f.seek(0)
+            data = f.read()
+        self._file.truncate(data.rfind(b'\n') + 1)
+        self._file.seek(0, os.SEEK_END)
+
+    def _append(self, entry):
+        if not self._pending:
+            self._oldest_pending = time.monotonic()
+        self._pending.append(json.dumps(entry).encode() + b'\n')
+
+    def flush(self):
+        '''
+        Write pending moves to the log, then a pending snapshot, syncing them unless the
+        policy is "never". Safe to call from any thread while moves are being recorded
+        '''
+        with self._io_lock:
+            self._flush()
+
+    def _flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+            snapshot, self._snapshot = self._snapshot, None
+        if pending:
+            self._file.write(b''.join(pending))
+            self._file.flush()
+            if self.fsync_policy != 'never':
+                os.fsync(self._file.fileno())
+        # after the log, so that the log never lags behind the snapshot
+        if snapshot is not None:
+            self._write_snapshot(*snapshot)
+
+
+def read_log(directory, game_id):
+    '''
+    Return (config header, move entries, closed) from a game's log.
+    A partially written last line, as left by a crash, is ignored
+    '''
+    header, moves, closed = {}, [], False
+    with open(MoveJournal.log_path(directory, game_id), 'rb') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            if 'config' in entry:
+                header = entry['config']
+            elif entry.get('closed'):
+                closed = True
+            else:
+                moves.append(entry)
+    return header, moves, closed
+
+
+def recover(directory, game_id, config):
+    '''
+    Rebuild a game from its last snapshot plus the tail of its move log.
+    Return (game, number of moves recorded, closed)
+    '''
+    header, moves, closed = read_log(directory, game_id)
+    config = dict(config, **header)
+
+    num_moves = 0
+    path = MoveJournal.snapshot_path(directory, game_id)
+    if os.path.exists(path):
+        with np.load(path) as snapshot:
+            num_moves = int(snapshot['num_moves'])
+            game = restore_snapshot(config, snapshot)
+    else:
+        game = Game(config)
+
+    for entry in moves:
+        if entry['n'] > num_moves:
+            _play(game, entry['s'], entry['m'])
+            num_moves = entry['n']
+    return game, num_moves, closed
+
+
+def list_games(directory):
+    '''
+    Return the ids of all games with a log in `directory`
+    '''
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-len('.log')] for name in os.listdir(directory) if name.endswith('.log'))
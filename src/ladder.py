@@ -0,0 +1,168 @@
+from src.tactics import TacticalState
+from src.utils import Stone, get_opposite_stone
+
+
+class LadderResult(object):
+    '''
+    Outcome of reading a ladder
+    '''
+    def __init__(self, escapes, nodes, depth_exceeded):
+
+        # True if the chain can escape (or was not in atari to begin with)
+        self.escapes = escapes
+
+        # number of moves made while reading
+        self.nodes = nodes
+
+        # True if the reading hit the depth limit; an unresolved ladder counts as escaping
+        self.depth_exceeded = depth_exceeded
+
+
+class LadderReader(object):
+    '''
+    Atari-chase solver. The defender, to move, tries to save a chain in atari by
+    capturing an adjacent attacker in atari, or by extending to its last liberty.
+    The attacker keeps the chain in atari by playing either of its two liberties.
+    The chain escapes once it reaches three or more liberties.
+
+    The chain's stones and liberties are carried through the search and updated
+    from each move, falling back to a full walk of the chain only after captures
+    or merges with other chains. Likewise, only attacking stones next to the
+    last moves are checked for atari, since no other attacker can have lost a liberty.
+    '''
+    def __init__(self, state, max_depth=200):
+        self.state = state
+        self.max_depth = max_depth
+        self.depth_exceeded = False
+
+        # stones of the chain being chased
+        self.chain = set()
+
+    def defender_escapes(self, p, liberty, depth, threats=None):
+        '''
+        The chain at p is in atari at `liberty`, with its owner to move.
+        `threats` are attacking stones that may be in atari; None means all
+        attacking stones touching the chain must be checked
+        '''
+        state = self.state
+        points = state.points
+        stone = points[p]
+        attacker = get_opposite_stone(stone)
+
+        # capture attacking stones that are themselves in atari
+        in_atari, captures = self._find_ataris(attacker, threats)
+        for move in captures:
+            if state.play(stone, move):
+                escapes = self._after_walk(p, depth)
+                state.undo()
+                if escapes:
+                    return True
+
+        if not state.play(stone, liberty):
+            return False
+
+        if state._history[-1][1] or any(points[n] == stone and n not in self.chain
+                                        for n in state.neighbors(liberty)):
+            escapes = self._after_walk(p, depth)
+        else:
+            # the only old liberty was filled, so the new liberties are those of the new stone.
+            # Attacking stones can only have lost liberties next to the new stone
+            liberties = [n for n in state.neighbors(liberty) if points[n] == Stone.EMPTY]
+            threats = in_atari + [n for n in state.neighbors(liberty) if points[n] == attacker]
+            self.chain.add(liberty)
+            escapes = self._after_defence(p, liberties, depth, threats)
+            self.chain.discard(liberty)
+        state.undo()
+        return escapes
+
+    def _after_walk(self, p, depth):
+        chain = self.chain
+        stones, liberties = self.state.chain_and_liberties(p)
+        self.chain = set(stones)
+        escapes = self._after_defence(p, liberties, depth, None)
+        self.chain = chain
+        return escapes
+
+    def _after_defence(self, p, liberties, depth, threats):
+        if len(liberties) >= 3:
+            return True
+        if len(liberties) <= 1:
+            # still in atari with the attacker to move
+            return False
+        return self.attacker_fails(p, liberties, depth + 1, threats)
+
+    def attacker_fails(self, p, liberties, depth, threats=None):
+        '''
+        The chain at p has two liberties with the attacker to move
+        '''
+        if depth >= self.max_depth:
+            self.depth_exceeded = True
+            return True
+
+        state = self.state
+        attacker = get_opposite_stone(state.points[p])
+        for move in liberties:
+            if not state.play(attacker, move):
+                continue
+            if state._history[-1][1]:
+                remaining = state.liberties(p)
+                next_threats = None
+            else:
+                remaining = [liberty for liberty in liberties if liberty != move]
+                next_threats = None if threats is None else threats + [move]
+
+            # the defender's reply includes capturing the atari stone, if it is itself in atari
+            escapes = len(remaining) >= 2 or \
+                (len(remaining) == 1 and
+                 self.defender_escapes(p, remaining[0], depth + 1, next_threats))
+            state.undo()
+            if not escapes:
+                return False
+        return True
+
+    def _find_ataris(self, attacker, threats):
+        '''
+        Return (attacking stones in atari, moves capturing them) among `threats`,
+        or among all attacking stones touching the chased chain if `threats` is None
+        '''
+        state = self.state
+        points = state.points
+        if threats is None:
+            threats = [n for q in self.chain for n in state.neighbors(q) if points[n] == attacker]
+
+        in_atari = []
+        captures = []
+        seen = set()
+        for t in threats:
+            if points[t] != attacker or t in seen:
+                continue
+            chain, liberties = state.chain_and_liberties(t, 2)
+            seen.update(chain)
+            if len(liberties) == 1:
+                in_atari.append(t)
+                if liberties[0] not in captures:
+                    captures.append(liberties[0])
+        return in_atari, captures
+
+
+def read_ladder(state, y, x, max_depth=200):
+    '''
+    Read whether the chain at (y, x) can escape, with its owner to move.
+    `state` is a TacticalState, or a Game to build one from.
+    Chains with two or more liberties are not in atari, and count as escaping
+    '''
+    if not isinstance(state, TacticalState):
+        state = TacticalState.from_game(state)
+    p = state.point(y, x)
+    if state.points[p] not in (Stone.BLACK, Stone.WHITE):
+        raise ValueError(f'There is no stone at ({y}, {x})')
+
+    nodes = state.nodes
+    reader = LadderReader(state, max_depth)
+    stones, liberties = state.chain_and_liberties(p)
+    if len(liberties) >= 2:
+        escapes = True
+    else:
+        reader.chain = set(stones)
+        escapes = bool(liberties) and reader.defender_escapes(p, liberties[0], 0)
+    return LadderResult(escapes, state.nodes - nodes, reader.depth_exceeded)
@@ -0,0 +1,90 @@
+import numpy as np
+
+from src.utils import Stone
+
+# neighbour offsets as (dy, dx)
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def shift(array, dy, dx, fill):
+    '''
+    Return `array` shifted over its last two axes, so that result[..., y, x] is
+    array[..., y + dy, x + dx], with `fill` for points beyond the edge
+    '''
+    result = np.full_like(array, fill)
+    size_y, size_x = array.shape[-2:]
+    result[..., max(-dy, 0):size_y - max(dy, 0), max(-dx, 0):size_x - max(dx, 0)] = \
+        array[..., max(dy, 0):size_y - max(-dy, 0), max(dx, 0):size_x - max(-dx, 0)]
+    return result
+
+
+def count_empty_neighbors(boards):
+    '''
+    Return the number of empty neighbours of every point, for a board of
+    shape (size, size) or a batch of boards of shape (N, size, size)
+    '''
+    empty = (np.asarray(boards) == Stone.EMPTY).astype(np.int8)
+    counts = np.zeros(empty.shape, dtype=np.int8)
+    for dy, dx in DIRECTIONS:
+        counts += shift(empty, dy, dx, 0)
+    return counts
+
+
+def label_chains(boards):
+    '''
+    Label the chains of a board or a batch of boards. Stones of the same chain share
+    a label, distinct across the whole batch, and empty points are labelled 0.
+
+    Labels start as each stone's flat index plus one, and every stone repeatedly takes
+    the smallest label among itself and its neighbours of the same colour. Each round
+    also follows labels to the label of the stone they point to, so long chains
+    converge in a few rounds rather than one round per stone.
+    '''
+    boards = np.asarray(boards)
+    stones = boards != Stone.EMPTY
+    labels = np.where(stones, np.arange(1, boards.size + 1).reshape(boards.shape), 0)
+
+    # for each direction, whether the neighbour belongs to the same chain
+    same = [stones & (shift(boards, dy, dx, Stone.EMPTY) == boards) for dy, dx in DIRECTIONS]
+
+    while True:
+        new = labels.copy()
+        for (dy, dx), connected in zip(DIRECTIONS, same):
+            np.minimum(new, np.where(connected, shift(labels, dy, dx, 0), new), out=new)
+        new[stones] = new.reshape(-1)[new[stones] - 1]
+        if np.array_equal(new, labels):
+            return labels
+        labels = new
+
+
+def chain_liberties(boards, labels=None):
+    '''
+    Return the number of liberties of the chain at every point (0 for empty points),
+    for a board or a batch of boards. `labels` may be passed if already computed
+    with label_chains
+    '''
+    boards = np.asarray(boards)
+    if labels is None:
+        labels = label_chains(boards)
+    empty = boards == Stone.EMPTY
+    empty_index = np.arange(boards.size).reshape(boards.shape)
+
+    # every (chain, empty neighbour) pair, counted once per chain
+    pairs = []
+    for dy, dx in DIRECTIONS:
+        neighbor_labels = shift(labels, dy, dx, 0)
+        adjacent = empty & (neighbor_labels > 0)
+        pairs.append(neighbor_labels[adjacent].astype(np.int64) * boards.size + empty_index[adjacent])
+    pairs = np.unique(np.concatenate(pairs))
+
+    counts = np.bincount(pairs // boards.size, minlength=boards.size + 1)
+    return np.where(labels > 0, counts[labels], 0)
+
+
+def liberty_maps(boards):
+    '''
+    Return (empty neighbour counts, chain liberty counts) for every point
+    of a board or a batch of boards
+    '''
+    boards = np.asarray(boards)
+    return count_empty_neighbors(boards), chain_liberties(boards)
@@ -0,0 +1,123 @@
+import numpy as np
+
+from src.utils import Stone, get_opposite_stone
+
+
+def _get_chains(game, stone):
+    '''
+    Return the distinct groups of `stone` on the board, keyed by id
+    '''
+    chains = {}
+    ys, xs = np.nonzero(np.asarray(game.board) == stone)
+    for y, x in zip(ys.tolist(), xs.tolist()):
+        group = game.get_group(y, x)
+        chains[id(group)] = group
+    return chains
+
+
+def _get_regions(game, stone):
+    '''
+    Return the maximal connected regions of points not occupied by `stone`.
+    Each region is a tuple (points, empty points, ids of bordering chains of `stone`)
+    '''
+    board = game.board
+    size = game.board_size
+    visited = np.asarray(board) == stone
+    regions = []
+
+    for y in range(size):
+        for x in range(size):
+            if visited[y, x]:
+                continue
+            visited[y, x] = True
+            points, empties, borders = [], set(), set()
+            search = [(y, x)]
+            while search:
+                cy, cx = search.pop()
+                points.append((cy, cx))
+                if board[cy, cx] == Stone.EMPTY:
+                    empties.add((cy, cx))
+                for ly, lx in board.get_liberty_coords(cy, cx):
+                    if board[ly, lx] == stone:
+                        borders.add(id(game.get_group(ly, lx)))
+                    elif not visited[ly, lx]:
+                        visited[ly, lx] = True
+                        search.append((ly, lx))
+            regions.append((points, empties, borders))
+    return regions
+
+
+def find_unconditional_life(game, stone):
+    '''
+    Benson's algorithm. Return (alive groups, vital regions) for `stone`:
+    the groups that can never be captured, even if `stone` always passes,
+    and the enclosed regions that give them their eyes, as lists of points.
+
+    A region enclosed by `stone` is vital to a group if all of its empty points
+    are liberties of that group. Groups with fewer than two vital regions, and
+    regions bordering such groups, are removed until nothing changes.
+    '''
+    chains = _get_chains(game, stone)
+    regions = _get_regions(game, stone)
+
+    # for every region, the bordering chains it is vital to
+    vital_to = [
+        {chain_id for chain_id in borders if empties <= chains[chain_id].liberties}
+        for points, empties, borders in regions
+    ]
+
+    alive_chains = set(chains)
+    alive_regions = set(range(len(regions)))
+
+    while True:
+        num_vital = dict.fromkeys(alive_chains, 0)
+        for r in alive_regions:
+            for chain_id in vital_to[r]:
+                if chain_id in num_vital:
+                    num_vital[chain_id] += 1
+
+        dead_chains = {chain_id for chain_id, n in num_vital.items() if n < 2}
+        if not dead_chains:
+            break
+        alive_chains -= dead_chains
+        alive_regions = {r for r in alive_regions if not (regions[r][2] & dead_chains)}
+
+    alive_groups = [chains[chain_id] for chain_id in alive_chains]
+    vital_regions = [regions[r][0] for r in alive_regions if vital_to[r] & alive_chains]
+    return alive_groups, vital_regions
+
+
+def find_settled(game):
+    '''
+    Run Benson's algorithm for both players.
+    Return ({stone: (alive groups, vital regions)}, settled mask), where the boolean
+    mask marks the unconditionally alive stones and their vital regions. Nothing played
+    on a settled point can change its owner, so playouts may skip these points, and
+    stop once every empty point is settled
+    '''
+    settled = np.zeros((game.board_size, game.board_size), dtype=bool)
+    life = {}
+    for stone in (Stone.BLACK, Stone.WHITE):
+        alive_groups, vital_regions = life[stone] = find_unconditional_life(game, stone)
+        for group in alive_groups:
+            for y, x in group.coords:
+                settled[y, x] = True
+        for points in vital_regions:
+            for y, x in points:
+                settled[y, x] = True
+    return life, settled
+
+
+def get_settled_scores(game, life):
+    '''
+    Score a position in which every empty point is settled, as returned by find_settled.
+    Vital regions count as territory for their owner, and the opposing stones inside them
+    as captured, which is how the position ends once those dead stones are taken off
+    '''
+    board = game.board
+    scores = {Stone.BLACK: -game.num_black_captured, Stone.WHITE: -game.num_white_captured}
+    for stone, (alive_groups, vital_regions) in life.items():
+        for points in vital_regions:
+            scores[stone] += len(points)
+            scores[get_opposite_stone(stone)] -= sum(board[y, x] != Stone.EMPTY for y, x in points)
+    return scores
@@ -0,0 +1,139 @@
+'''
+Load generator for src.server. It plays many random games at once and reports
+move throughput and request latency.
+
+    python -m src.loadgen [--host HOST --port PORT | --unix PATH] [--clients N] [--games N]
+'''
+import json
+import time
+import random
+import asyncio
+import argparse
+
+import numpy as np
+
+
+class LoadClient(object):
+    '''
+    One connection playing random games back to back, recording the latency of every request
+    '''
+    def __init__(self, reader, writer, board_size, bot_fraction, rng):
+        self.reader = reader
+        self.writer = writer
+        self.board_size = board_size
+
+        # fraction of moves requested from the server's engine rather than chosen locally
+        self.bot_fraction = bot_fraction
+        self.rng = rng
+
+        # latency of each request in seconds
+        self.latencies = []
+
+        # number of stones placed
+        self.moves = 0
+
+    async def request(self, **request):
+        start = time.perf_counter()
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        await self.writer.drain()
+        response = json.loads(await self.reader.readline())
+        self.latencies.append(time.perf_counter() - start)
+        return response
+
+    async def play_game(self, max_moves):
+        '''
+        Play one game of random moves, then score and close it
+        '''
+        response = await self.request(op='new', board_size=self.board_size)
+        game = response['game']
+
+        # the client tracks empty points itself, using the captures the server reports
+        empty = {(y, x) for y in range(self.board_size) for x in range(self.board_size)}
+
+        for _ in range(max_moves):
+            if self.rng.random() < self.bot_fraction:
+                response = await self.request(op='bot', game=game)
+                if response['move'] == 'pass':
+                    continue
+                empty.discard(tuple(response['move']))
+            else:
+                response = await self._random_move(game, empty)
+                if response is None:
+                    break
+            self.moves += 1
+            empty.update(tuple(coord) for coord in response['removed'])
+
+        await self.request(op='pass', game=game)
+        await self.request(op='pass', game=game)
+        await self.request(op='score', game=game)
+        await self.request(op='close', game=game)
+
+    async def _random_move(self, game, empty):
+        # illegal moves (ko or self-destruct) are simply retried elsewhere
+        candidates = list(empty)
+        self.rng.shuffle(candidates)
+        for y, x in candidates:
+            response = await self.request(op='move', game=game, y=y, x=x)
+            if response['ok']:
+                empty.discard((y, x))
+                return response
+        return None
+
+
+async def run_load(connect, clients, games, board_size, max_moves, bot_fraction, seed=0):
+    '''
+    Run `clients` concurrent connections, each playing `games` games.
+    Return (moves, requests latencies in seconds, elapsed seconds)
+    '''
+    load_clients = []
+    for i in range(clients):
+        reader, writer = await connect()
+        load_clients.append(LoadClient(reader, writer, board_size, bot_fraction,
+                                       random.Random(seed + i)))
+
+    async def run(client):
+        for _ in range(games):
+            await client.play_game(max_moves)
+        client.writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(client) for client in load_clients))
+    elapsed = time.perf_counter() - start
+
+    moves = sum(client.moves for client in load_clients)
+    latencies = [t for client in load_clients for t in client.latencies]
+    return moves, latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate load against a src.server instance')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='connect to this Unix socket path instead of TCP')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--games', type=int, default=4, help='games per client')
+    parser.add_argument('--board-size', type=int, default=9)
+    parser.add_argument('--max-moves', type=int, default=120)
+    parser.add_argument('--bot-fraction', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.unix:
+        connect = lambda: asyncio.open_unix_connection(args.unix)
+    else:
+        connect = lambda: asyncio.open_connection(args.host, args.port)
+
+    moves, latencies, elapsed = asyncio.run(run_load(
+        connect, args.clients, args.games, args.board_size,
+        args.max_moves, args.bot_fraction, args.seed))
+
+    latencies = np.array(latencies) * 1000
+    print(f'{args.clients} clients, {args.clients * args.games} games, {moves} moves in {elapsed:.2f} s')
+    print(f'  moves/sec     {moves / elapsed:.1f}')
+    print(f'  requests/sec  {len(latencies) / elapsed:.1f}')
+    print(f'  latency p50   {np.percentile(latencies, 50):.2f} ms')
+    print(f'  latency p99   {np.percentile(latencies, 99):.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+import copy
+import queue
+import random
+import itertools
+import threading
+import multiprocessing
+
+from src.book import BookEngine
+from src.search import AnytimeSearch
+from src.utils import Stone
+from src.trace import span
+from src.exceptions import SelfDestructException, KoException
+
+# random draws of an empty point before a random move tries every empty point in turn
+RANDOM_MOVE_TRIES = 8
+
+
+def is_own_eye(board, stone, y, x):
+    '''
+    Check if (y, x) is a single point surrounded only by stones of `stone`
+    '''
+    return all(board[ly, lx] == stone for ly, lx in board.get_liberty_coords(y, x))
+
+
+def random_move(game, stone, report_progress):
+    '''
+    Engine that plays a uniformly random legal move that does not fill its own eye,
+    or passes if there is none. Points are drawn straight from the empty-point index,
+    and only after RANDOM_MOVE_TRIES rejected draws is every empty point tried in turn.
+    `game` is a private copy, so trying moves on it does not affect the caller
+    '''
+    num_empty = game.board.num_empty()
+    draws = (game.board.random_empty(random) for _ in range(min(RANDOM_MOVE_TRIES, num_empty)))
+    for i, (y, x) in enumerate(itertools.chain(draws, game.board.iter_random_empty(random))):
+        report_progress(min(1.0, i / (num_empty + RANDOM_MOVE_TRIES)))
+        if is_own_eye(game.board, stone, y, x):
+            continue
+        try:
+            game._place_stone(stone, y, x)
+        except (SelfDestructException, KoException):
+            continue
+        return [y, x]
+    return "pass"
+
+
+def _think(select_move, game, stone, messages):
+    '''
+    Worker entry point. Progress updates and the final move are sent
+    back through `messages` as ("progress", fraction) and ("move", move)
+    '''
+    def report_progress(fraction):
+        messages.put(("progress", fraction))
+
+    with span("engine move", "engine", engine=getattr(select_move, "__name__", type(select_move).__name__)):
+        move = select_move(game, stone, report_progress)
+    messages.put(("move", move))
+
+
+class EnginePlayer(object):
+    '''
+    A computer player whose move is computed in a worker thread or process,
+    so that the user interface stays responsive while it thinks.
+    '''
+    def __init__(self, select_move=random_move, use_process=False):
+
+        # callable (game, stone, report_progress) -> [y, x] or "pass"
+        self.select_move = select_move
+
+        # compute moves in a separate process rather than a thread
+        self.use_process = use_process
+
+        # fraction of the current search that has been completed
+        self.progress = 0.0
+
+        self._messages = None
+        self._worker = None
+        self._move = None
+
+    def start(self, game, stone):
+        '''
+        Start thinking about a move for `stone` in the given position
+        '''
+        self.progress = 0.0
+        self._move = None
+
+        if self.use_process:
+            self._messages = multiprocessing.Queue()
+            worker_cls = multiprocessing.Process
+        else:
+            self._messages = queue.Queue()
+            worker_cls = threading.Thread
+
+        # the worker gets its own copy so it may freely try out moves
+        args = (self.select_move, copy.deepcopy(game), stone, self._messages)
+        self._worker = worker_cls(target=_think, args=args, daemon=True)
+        self._worker.start()
+
+    def poll(self):
+        '''
+        Return the chosen move if the engine has finished thinking, otherwise None.
+        This never blocks
+        '''
+        while self._move is None:
+            try:
+                kind, value = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                self.progress = value
+            else:
+                self._move = value
+                self.progress = 1.0
+                self._worker.join()
+        return self._move
+
+    def stop(self):
+        '''
+        Abandon the current search, if any
+        '''
+        if self.use_process and self._worker is not None and self._worker.is_alive():
+            self._worker.terminate()
+        self._worker = None
+
+
+# AnytimeSearch of the montecarlo engine on each thread
+_searches = threading.local()
+
+
+def montecarlo_move(game, stone, report_progress):
+    '''
+    Engine running a one-second AnytimeSearch. Each thread has a search of its own, since
+    a search is not meant to run on several threads at once
+    '''
+    search = getattr(_searches, "search", None)
+    if search is None:
+        search = _searches.search = AnytimeSearch(time_budget=1.0)
+    return search(game, stone, report_progress)
+
+
+# engines that can be selected by name in config.yaml
+ENGINES = {
+    "random": random_move,
+    "montecarlo": montecarlo_move,
+}
+
+
+def make_player(name, use_process=False, book=None):
+    '''
+    Create the player for a config entry. "human" gives None, meaning
+    moves are taken from the keyboard. With an OpeningBook, the engine
+    plays book moves while the position is in the book
+    '''
+    if name is None or name == "human":
+        return None
+    select_move = ENGINES[name]
+    if book is not None:
+        select_move = BookEngine(book, select_move)
+    return EnginePlayer(select_move, use_process=use_process)
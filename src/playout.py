@@ -0,0 +1,125 @@
+import copy
+import random
+
+import numpy as np
+
+from src.life import find_settled, get_settled_scores
+from src.player import RANDOM_MOVE_TRIES, is_own_eye
+from src.utils import Stone, get_opposite_stone
+from src.exceptions import SelfDestructException, KoException
+
+
+class PlayoutResult(object):
+    '''
+    Outcome of a random playout
+    '''
+    def __init__(self, scores, num_moves, stopped_early):
+
+        # scores of the final position, as returned by Game.get_scores
+        self.scores = scores
+
+        # number of stones placed during the playout
+        self.num_moves = num_moves
+
+        # True if the playout ended because every empty point was settled, or at the cutoff
+        self.stopped_early = stopped_early
+
+    @property
+    def winner(self):
+        if self.scores[Stone.BLACK] == self.scores[Stone.WHITE]:
+            return Stone.EMPTY
+        return Stone.BLACK if self.scores[Stone.BLACK] > self.scores[Stone.WHITE] else Stone.WHITE
+
+
+def random_playout(game, rng=None, max_moves=None, use_benson=True, benson_interval=None,
+                   copy_game=True, capture_first=False, cutoff=None):
+    '''
+    Play random legal moves, never filling one's own eye, until both players pass.
+    With `capture_first`, a move that captures opposing stones in atari is played
+    whenever there is one.
+
+    With `use_benson`, unconditional life (see src.life) is checked every
+    `benson_interval` moves. Moves inside settled points are skipped, and the
+    playout stops as soon as every empty point is settled, since no further
+    move can change the score.
+
+    With `cutoff`, the playout stops after that many moves, and its position
+    is scored by influence (see Game.estimate_scores) rather than played out.
+    '''
+    rng = rng or random.Random()
+    if copy_game:
+        game = copy.deepcopy(game)
+    size = game.board_size
+    max_moves = max_moves or 3 * size * size
+    benson_interval = benson_interval or size
+
+    settled = np.zeros((size, size), dtype=bool)
+    num_moves = 0
+    passes = 0
+
+    while passes < 2 and num_moves < max_moves:
+        if num_moves == cutoff:
+            return PlayoutResult(game.estimate_scores(), num_moves, True)
+
+        if use_benson and num_moves % benson_interval == 0:
+            life, settled = find_settled(game)
+            if settled[np.asarray(game.board) == Stone.EMPTY].all():
+                return PlayoutResult(get_settled_scores(game, life), num_moves, True)
+
+        if (capture_first and _play_capture(game, game.turn, rng)) or \
+                _play_random_move(game, game.turn, settled, rng):
+            num_moves += 1
+            passes = 0
+        else:
+            game.pass_turn()
+            passes += 1
+
+    return PlayoutResult(game.get_scores(), num_moves, False)
+
+
+def _play_capture(game, stone, rng):
+    '''
+    Capture a random opposing group in atari. Return False if no capture is legal
+    '''
+    groups = game.get_groups_by_liberties(get_opposite_stone(stone), 1)
+    points = sorted({point for group in groups for point in group.liberties})
+    rng.shuffle(points)
+    for y, x in points:
+        try:
+            game._place_stone(stone, y, x)
+        except (SelfDestructException, KoException):
+            continue
+        return True
+    return False
+
+
+def _play_random_move(game, stone, settled, rng):
+    '''
+    Play a random legal move for `stone` outside settled points. Return False if there is none.
+    Points are drawn straight from the empty-point index, and only after RANDOM_MOVE_TRIES
+    rejected draws is every empty point tried in turn
+    '''
+    board = game.board
+    for _ in range(RANDOM_MOVE_TRIES):
+        point = board.random_empty(rng)
+        if point is None:
+            return False
+        if _try_move(game, stone, settled, *point):
+            return True
+    for y, x in board.iter_random_empty(rng):
+        if _try_move(game, stone, settled, y, x):
+            return True
+    return False
+
+
+def _try_move(game, stone, settled, y, x):
+    '''
+    Play `stone` at (y, x) unless the point is settled, its own eye or illegal. Return True if played
+    '''
+    if settled[y, x] or is_own_eye(game.board, stone, y, x):
+        return False
+    try:
+        game._place_stone(stone, y, x)
+    except (SelfDestructException, KoException):
+        return False
+    return True
@@ -0,0 +1,114 @@
+'''
+Flat positions in shared memory, for handing positions to worker processes.
+
+Pickling a Game for a pool worker sends the Board and the whole graph of Group
+objects with every task. Here a position is a fixed-size record of NumPy fields
+(see position_dtype), and many positions live in one SharedPositions block in
+multiprocessing.shared_memory. Workers attach to the block by name, so a task
+only needs the index of its position. The fields of a record are views into the
+block: a worker can read the board, chains and liberties of a position without
+copying them, or rebuild a Game from the record with src.journal.restore_snapshot.
+'''
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.liberties import chain_liberties
+
+
+def position_dtype(board_size):
+    '''
+    Return the NumPy record type of a position. Its fields are those of a snapshot
+    (see src.journal.take_snapshot), plus the liberty count of the chain at every
+    point and the Zobrist hash of the board
+    '''
+    shape = (board_size, board_size)
+    return np.dtype([
+        ('board', np.int8, shape),
+        ('groups', np.int16, shape),
+        ('liberties', np.int16, shape),
+        ('captured', np.int32, (2,)),
+        ('ko', np.int16, (2,)),
+        ('count_pass', np.int8),
+        ('turn', np.int8),
+        ('hash', np.uint64),
+    ])
+
+
+def write_position(record, snapshot):
+    '''
+    Fill a position record from a snapshot (see src.journal.take_snapshot)
+    '''
+    for field in ('board', 'groups', 'captured', 'ko', 'count_pass', 'turn', 'hash'):
+        record[field] = snapshot[field]
+    record['liberties'] = chain_liberties(snapshot['board'], snapshot['groups'])
+
+
+class SharedPositions(object):
+    '''
+    A block of `count` position records of one board size in shared memory.
+
+    The creating process owns the block and must unlink it when done. A
+    SharedPositions sent to another process pickles as the name of the block,
+    and is attached to there without copying any position.
+    '''
+    def __init__(self, board_size, count, name=None):
+        dtype = position_dtype(board_size)
+
+        # the shared memory block, created unless `name` is given
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(dtype.itemsize * count, 1))
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        self.board_size = board_size
+
+        # the records, a structured array over the shared memory block
+        self.positions = np.ndarray((count,), dtype=dtype, buffer=self.shm.buf)
+
+    @classmethod
+    def from_snapshots(cls, snapshots, board_size):
+        '''
+        Create a block holding the given snapshots
+        '''
+        shared = cls(board_size, len(snapshots))
+        for i, snapshot in enumerate(snapshots):
+            write_position(shared.positions[i], snapshot)
+        return shared
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, i):
+        '''
+        Return the record of position `i`. It can be passed wherever a snapshot is
+        expected, and its fields are views into the shared memory block
+        '''
+        return self.positions[i]
+
+    def __reduce__(self):
+        return (self.__class__, (self.board_size, len(self), self.name))
+
+    def close(self):
+        '''
+        Detach from the block. Records taken from it must not be used afterwards
+        '''
+        self.positions = None
+        self.shm.close()
+
+    def unlink(self):
+        '''
+        Free the block once every process has closed it. Only the creator should call this
+        '''
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        self.unlink()
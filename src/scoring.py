@@ -0,0 +1,65 @@
+'''
+Vectorized scoring of batches of finished boards.
+
+score_boards scores boards by the rules of Game.get_scores: an empty region
+bordered by stones of one player only is that player's territory, and each
+player's captured stones are subtracted. Empty regions are labelled across the
+whole batch at once (see src.liberties.label_chains), the colours bordering each
+point are found with four shifts of the batch, and region sizes and bordering
+colours are summed with bincount, so no Python loop runs per board or per region.
+'''
+import numpy as np
+
+from src.liberties import DIRECTIONS, shift, label_chains
+from src.utils import Stone
+
+
+def label_regions(boards):
+    '''
+    Label the empty regions of a board or a batch of boards. Points of the same
+    region share a label, distinct across the whole batch, and stones are labelled 0
+    '''
+    boards = np.asarray(boards)
+    return label_chains((boards == Stone.EMPTY).view(np.int8))
+
+
+def count_territory(boards, labels=None):
+    '''
+    Return the territory points of black and white, of shape (2,) for a board or
+    (N, 2) for a batch of boards. `labels` may be passed if already computed with
+    label_regions
+    '''
+    boards = np.asarray(boards)
+    if labels is None:
+        labels = label_regions(boards)
+    area = boards.shape[-1] * boards.shape[-2]
+
+    # bitwise or of the colours next to every point: BLACK | WHITE is neutral
+    borders = np.zeros(boards.shape, dtype=np.int8)
+    for dy, dx in DIRECTIONS:
+        borders |= shift(boards, dy, dx, Stone.EMPTY)
+
+    empty = labels > 0
+    regions = labels[empty]
+    num_labels = boards.size + 1
+    sizes = np.bincount(regions, minlength=num_labels)
+    borders = borders[empty]
+    black = np.bincount(regions, weights=borders & Stone.BLACK, minlength=num_labels) > 0
+    white = np.bincount(regions, weights=borders & Stone.WHITE, minlength=num_labels) > 0
+
+    # labels are flat indices plus one, so each region tells its board
+    board_index = np.maximum(np.arange(num_labels) - 1, 0) // area
+    num_boards = boards.size // area
+    territory = np.stack([np.bincount(board_index, weights=sizes * (black & ~white), minlength=num_boards),
+                          np.bincount(board_index, weights=sizes * (white & ~black), minlength=num_boards)],
+                         axis=-1).astype(np.int64)
+    return territory.reshape(boards.shape[:-2] + (2,))
+
+
+def score_boards(boards, captured=(0, 0)):
+    '''
+    Score a board, or a batch of boards, like Game.get_scores: territory minus
+    captured stones. `captured` holds (black stones captured, white stones captured),
+    or one such pair per board. Return the (black, white) scores, of shape (2,) or (N, 2)
+    '''
+    return count_territory(boards) - np.asarray(captured)
@@ -0,0 +1,310 @@
+'''
+Anytime move selection under a hard latency budget.
+
+AnytimeSearch runs flat Monte Carlo search: random playouts after each candidate
+move, choosing which candidate to sample next by UCB1. The search answers with
+the most sampled move as soon as the wall-clock budget or the node budget runs
+out. Playouts run on copies of a FastBoard, a flat board with incremental
+pseudo-liberties, so the Game is never copied, and the deadline is also checked
+every few moves inside a playout, so a single playout cannot overrun the budget.
+'''
+import gc
+import math
+import time
+import random
+import threading
+
+from src.fastboard import FastBoard
+from src.trace import traced
+from src.tactics import BORDER, TacticalState
+from src.utils import Stone, get_opposite_stone
+
+TIME = 'time'
+NODES = 'nodes'
+
+# searches running in this process, and whether the collector was enabled before the first
+# of them paused it; only the last one to finish restores it
+_running = 0
+_gc_was_enabled = False
+_gc_lock = threading.Lock()
+
+# share of the reserve of a search carried over to the next one
+RESERVE_DECAY = 0.9
+
+# multiple of the longest work between two checks kept back from a deadline, for the
+# stretches of it that are stalled by the scheduler
+RESERVE_FACTOR = 3
+
+
+def _pause_gc():
+    global _running, _gc_was_enabled
+    with _gc_lock:
+        if _running == 0:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _running += 1
+
+
+def _resume_gc():
+    global _running
+    with _gc_lock:
+        _running -= 1
+        if _running == 0 and _gc_was_enabled:
+            gc.enable()
+
+
+def measure_check_cost(samples=10000):
+    '''
+    Return the cost in seconds of one deadline check, as made by Deadline.expired
+    '''
+    deadline = Deadline(3600)
+    start = time.perf_counter()
+    for _ in range(samples):
+        deadline.expired()
+    return (time.perf_counter() - start) / samples
+
+
+class Deadline(object):
+    '''
+    Wall-clock deadline `time_budget` seconds from now, counting how often it is checked.
+    The deadline counts as expired as soon as RESERVE_FACTOR times the longest stretch of
+    work seen between two checks would no longer fit before it, so the work after the
+    last check does not overrun it, even if it is stalled for a while
+    '''
+    def __init__(self, time_budget, reserve=0.0):
+        self._last = time.perf_counter()
+        self.end = self._last + time_budget
+        self.checks = 0
+
+        # longest time between two checks so far, kept back from the deadline
+        self.reserve = reserve
+
+    def expired(self):
+        self.checks += 1
+        now = time.perf_counter()
+        if now - self._last > self.reserve:
+            self.reserve = now - self._last
+        self._last = now
+        return now + RESERVE_FACTOR * self.reserve >= self.end
+
+
+class SearchResult(object):
+    '''
+    Outcome of an anytime search
+    '''
+    def __init__(self, move, nodes, elapsed, stop_reason, deadline_checks, check_cost, candidates):
+
+        # selected move, [y, x] or "pass"
+        self.move = move
+
+        # number of completed playouts
+        self.nodes = nodes
+
+        # wall-clock seconds spent in the search
+        self.elapsed = elapsed
+
+        # TIME or NODES, whichever budget ran out first
+        self.stop_reason = stop_reason
+
+        # number of deadline checks, and the estimated seconds spent on each
+        self.deadline_checks = deadline_checks
+        self.check_cost = check_cost
+
+        # (move, playouts, win rate) of every sampled candidate, most sampled first
+        self.candidates = candidates
+
+    @property
+    def check_overhead(self):
+        '''
+        Estimated seconds spent checking the deadline
+        '''
+        return self.deadline_checks * self.check_cost
+
+
+class AnytimeSearch(object):
+    '''
+    Flat Monte Carlo search bounded by `time_budget` seconds and `node_budget` playouts
+    (None for no limit). The deadline is checked while setting up the search, between
+    playouts and every `check_interval` moves within one, and a multiple of the longest
+    work seen between two checks is kept back from it (see Deadline), starting from what
+    earlier searches saw, so that a stall seen once is allowed for next time; `margin`
+    seconds are kept back as well for returning the answer.
+    Also usable as an engine: (game, stone, report_progress) -> [y, x] or "pass".
+    Every search updates the reserve, so one instance must not search on several threads at once
+    '''
+    def __init__(self, time_budget=1.0, node_budget=None, margin=0.001, check_interval=8,
+                 exploration=1.0, seed=None):
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.margin = margin
+        self.check_interval = check_interval
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+
+        # seconds per deadline check, measured once
+        self.check_cost = measure_check_cost(1000)
+
+        # longest work between two deadline checks seen by recent searches, decaying
+        # from one search to the next
+        self.reserve = 0.0
+
+    def __call__(self, game, stone, report_progress):
+        return self.search(game, stone, report_progress).move
+
+    @traced('search', 'engine')
+    def search(self, game, stone=None, report_progress=None):
+        '''
+        Search the current position of `game` for `stone` (by default the side to move)
+        and return a SearchResult. The garbage collector is paused until no search is left
+        running in the process: playouts make no reference cycles, and a full collection
+        can take longer than the margin
+        '''
+        _pause_gc()
+        try:
+            return self._search(game, stone, report_progress)
+        finally:
+            _resume_gc()
+
+    def _search(self, game, stone, report_progress):
+        start = time.perf_counter()
+        deadline = Deadline(self.time_budget - self.margin, self.reserve * RESERVE_DECAY)
+        stone = game.turn if stone is None else stone
+        opponent = get_opposite_stone(stone)
+
+        # the setup is timed by the deadline too, but needs no answer before the first candidate
+        state = TacticalState.from_game(game)
+        deadline.expired()
+        root = FastBoard.from_state(state)
+        deadline.expired()
+        root.captures = {Stone.BLACK: game.num_black_captured, Stone.WHITE: game.num_white_captured}
+        empty = root.empty_points()
+        ko = (game.ko[0] + 1) * root.stride + game.ko[1] + 1 if game.ko is not None else None
+        candidates = []
+        for i, p in enumerate(empty):
+            # once out of time, the candidates found so far will do
+            if i % 32 == 0 and candidates and deadline.expired():
+                break
+            if root.is_legal(stone, p) and not root.is_own_eye(stone, p) \
+                    and not self._breaks_game_ko(root, stone, p, ko):
+                candidates.append(p)
+        self.rng.shuffle(candidates)
+
+        # per candidate point: [playouts, wins]
+        stats = {}
+        nodes = 0
+        stop_reason = NODES
+        while candidates:
+            if self.node_budget is not None and nodes >= self.node_budget:
+                stop_reason = NODES
+                break
+            if deadline.expired():
+                stop_reason = TIME
+                break
+
+            p = self._select(candidates, stats, nodes)
+            board = root.copy()
+            board.play(stone, p)
+            winner = self._playout(board, opponent, deadline)
+            if winner is None:
+                stop_reason = TIME
+                break
+
+            entry = stats.setdefault(p, [0, 0.0])
+            entry[0] += 1
+            entry[1] += 1.0 if winner == stone else 0.5 if winner == Stone.EMPTY else 0.0
+            nodes += 1
+            if report_progress is not None:
+                report_progress(min(1.0, (time.perf_counter() - start) / self.time_budget))
+
+        size = root.stride
+        ranked = sorted(stats.items(), key=lambda item: (-item[1][0], -item[1][1]))
+        ranked = [([p // size - 1, p % size - 1], n, wins / n) for p, (n, wins) in ranked]
+        if ranked:
+            move = ranked[0][0]
+        elif candidates:
+            move = [candidates[0] // size - 1, candidates[0] % size - 1]
+        else:
+            move = 'pass'
+        self.reserve = deadline.reserve
+        return SearchResult(move, nodes, time.perf_counter() - start, stop_reason,
+                            deadline.checks, self.check_cost, ranked)
+
+    @staticmethod
+    def _breaks_game_ko(board, stone, p, ko):
+        '''
+        Check if `stone` at p is refused by the Game's ko rule (GroupManager._check_ko),
+        which differs from the simple ko of the FastBoard: a move whose captures take
+        exactly one neighbouring stone may not take the stone at the game's ko point `ko`
+        '''
+        if ko is None:
+            return False
+        opponent = get_opposite_stone(stone)
+        captured = [n for n in board.neighbors(p) if board.points[n] == opponent and board.in_atari(n)]
+        return captured == [ko]
+
+    def _select(self, candidates, stats, nodes):
+        '''
+        Return the candidate to sample next: an unsampled one if any, otherwise by UCB1
+        '''
+        if len(stats) < len(candidates):
+            for p in candidates:
+                if p not in stats:
+                    return p
+        log_nodes = math.log(nodes)
+        return max(candidates, key=lambda p: stats[p][1] / stats[p][0] +
+                   self.exploration * math.sqrt(log_nodes / stats[p][0]))
+
+    def _playout(self, board, stone, deadline):
+        '''
+        Play random moves on `board`, `stone` first, never filling one's own eye, until
+        both players pass. Return the winner, or None if the deadline passed first
+        '''
+        random = self.rng.random
+        is_own_eye = board.is_own_eye
+        is_legal = board.is_legal
+        empty = board.empty_points()
+        max_moves = 3 * board.board_size * board.board_size
+        passes = 0
+        moves = 0
+
+        while passes < 2 and moves < max_moves:
+            if moves % self.check_interval == 0 and deadline.expired():
+                return None
+
+            # sample empty points without replacement, moving tried ones to the end of `empty`
+            n = len(empty)
+            played = False
+            while n:
+                i = int(random() * n)
+                p = empty[i]
+                n -= 1
+                empty[i], empty[n] = empty[n], p
+                if is_own_eye(stone, p) or not is_legal(stone, p):
+                    continue
+                empty[n] = empty[-1]
+                empty.pop()
+                empty.extend(board.play(stone, p))
+                played = True
+                break
+
+            passes = 0 if played else passes + 1
+            moves += 1
+            stone = Stone.WHITE if stone == Stone.BLACK else Stone.BLACK
+
+        return self._winner(board)
+
+    @staticmethod
+    def _winner(board):
+        '''
+        Score a finished playout like Game.get_scores: single-point territories,
+        which are all that is left empty at the end of a playout, minus captured stones
+        '''
+        scores = {Stone.BLACK: -board.captures[Stone.BLACK], Stone.WHITE: -board.captures[Stone.WHITE]}
+        points = board.points
+        for p in board.empty_points():
+            owners = {points[n] for n in board.neighbors(p)} - {BORDER}
+            if len(owners) == 1:
+                scores[owners.pop()] += 1
+        if scores[Stone.BLACK] == scores[Stone.WHITE]:
+            return Stone.EMPTY
+        return Stone.BLACK if scores[Stone.BLACK] > scores[Stone.WHITE] else Stone.WHITE
@@ -0,0 +1,376 @@
+'''
+Asyncio server hosting many games at once over a line-delimited JSON protocol.
+
+Every request is a single JSON object on its own line, and every request gets
+exactly one JSON response line back on the same connection:
+
+    {"op": "new", "board_size": 9}              -> {"ok": true, "game": "1"}
+    {"op": "move", "game": "1", "y": 2, "x": 3} -> {"ok": true, "turn": 2, "removed": [[y, x], ...]}
+    {"op": "pass", "game": "1"}                 -> {"ok": true, "turn": 1, "over": false}
+    {"op": "bot", "game": "1"}                  -> {"ok": true, "move": [y, x] or "pass", ...}
+    {"op": "score", "game": "1"}                -> {"ok": true, "black": 10, "white": 7}
+    {"op": "state", "game": "1"}                -> {"ok": true, "board": [[...]], "turn": 1, ...}
+    {"op": "close", "game": "1"}                -> {"ok": true}
+
+A "new" request may set "board_size", an integer from MIN_BOARD_SIZE to MAX_BOARD_SIZE,
+and "enable_self_destruct", true or false; "y" and "x" of a move must be integers.
+Failed requests answer {"ok": false, "error": <exception name>, "message": ...}.
+An optional "id" in a request is echoed back in its response.
+
+Bot moves and scoring run in an executor so the event loop never stalls on them.
+With a journal directory, every game is logged so it survives a restart (see src.journal);
+pending moves are flushed every `journal_flush_interval` seconds, and on shutdown. Journal
+writes and fsyncs run on threads of their own, so they do not stall the event loop either.
+
+    python -m src.server [--host HOST --port PORT | --unix PATH] [--workers N] [--processes]
+                         [--journal DIR]
+'''
+import copy
+import json
+import asyncio
+import argparse
+import itertools
+import concurrent.futures
+
+import yaml
+import numpy as np
+
+from src.game import Game
+from src.journal import MoveJournal, recover, list_games
+from src.player import ENGINES
+from src.utils import Stone
+from src.trace import span, configure as configure_tracing
+from src.exceptions import InvalidInputException, ProtocolError
+
+# board sizes a "new" request may ask for
+MIN_BOARD_SIZE = 5
+MAX_BOARD_SIZE = 25
+
+
+def _bot_move(engine, game, stone):
+    '''
+    Executor task choosing a move for `stone` on a private copy of `game`
+    '''
+    with span('engine move', 'engine', engine=engine):
+        return ENGINES[engine](copy.deepcopy(game), stone, lambda fraction: None)
+
+
+def _get_scores(game):
+    '''
+    Executor task scoring a game
+    '''
+    return game.get_scores()
+
+
+class GameSession(object):
+    '''
+    A hosted game, with a lock serialising requests that touch it
+    '''
+    def __init__(self, game, journal=None):
+        self.game = game
+        self.journal = journal
+        self.lock = asyncio.Lock()
+
+
+class GameServer(object):
+    '''
+    Owns many Game instances keyed by game id and serves requests for them
+    '''
+    def __init__(self, config, executor=None, engine='random', journal_dir=None):
+
+        # defaults for new games; a "new" request may override the board size and self-destruct rule
+        self.config = config
+
+        # executor for CPU-heavy work, such as bot moves and scoring
+        self.executor = executor or concurrent.futures.ThreadPoolExecutor()
+
+        # name of the engine in src.player.ENGINES that plays "bot" moves
+        self.engine = engine
+
+        # directory for move journals and snapshots, or None to keep games in memory only
+        self.journal_dir = journal_dir
+
+        # threads writing and syncing the journals; not `executor`, which may be a process pool
+        self.journal_executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix='journal')
+
+        # mapping from game id to GameSession
+        self.sessions = {}
+
+        # tasks serving the connected clients
+        self.connections = set()
+
+        self._ids = itertools.count(1)
+
+    def _open_journal(self, game_id, config, num_moves=0):
+        if self.journal_dir is None:
+            return None
+        return MoveJournal(self.journal_dir, game_id, config,
+                           snapshot_interval=self.config.get('snapshot_interval', 50),
+                           fsync_policy=self.config.get('journal_fsync', 'batch'),
+                           batch_size=self.config.get('journal_batch_size', 32),
+                           flush_interval=self.config.get('journal_flush_interval', 1.0),
+                           num_moves=num_moves)
+
+    def recover_games(self):
+        '''
+        Restore every unfinished game from the journal directory. Return the number restored
+        '''
+        if self.journal_dir is None:
+            return 0
+        last_id = 0
+        for game_id in list_games(self.journal_dir):
+            if game_id.isdigit():
+                last_id = max(last_id, int(game_id))
+            game, num_moves, closed = recover(self.journal_dir, game_id, self.config)
+            if not closed:
+                journal = self._open_journal(game_id, self.config, num_moves)
+                self.sessions[game_id] = GameSession(game, journal)
+        self._ids = itertools.count(last_id + 1)
+        return len(self.sessions)
+
+    async def flush_journals(self):
+        '''
+        Write the pending moves of every game's journal, on the journal threads
+        '''
+        await asyncio.gather(*[self._run_journal(session.journal.flush)
+                               for session in list(self.sessions.values())
+                               if session.journal is not None])
+
+    def close_journals(self):
+        '''
+        Flush and close every game's journal, leaving unfinished games to be recovered
+        '''
+        for session in list(self.sessions.values()):
+            if session.journal is not None:
+                session.journal.close()
+                session.journal = None
+
+    async def flush_journals_forever(self):
+        '''
+        Flush every game's journal each `journal_flush_interval` seconds, so that moves
+        pending in batch mode reach the disk even if no further move is recorded
+        '''
+        interval = self.config.get('journal_flush_interval', 1.0)
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush_journals()
+
+    async def handle_connection(self, reader, writer):
+        '''
+        Serve requests from one client until it disconnects
+        '''
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self.handle_line(line)
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            self.connections.discard(task)
+
+    async def handle_line(self, line):
+        '''
+        Parse one request line and return the response object
+        '''
+        request = {}
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ProtocolError('Each request must be a JSON object')
+            response = await self.handle_request(request)
+            response['ok'] = True
+        except Exception as e:
+            response = {'ok': False, 'error': type(e).__name__, 'message': str(e)}
+        if isinstance(request, dict) and 'id' in request:
+            response['id'] = request['id']
+        return response
+
+    async def handle_request(self, request):
+        '''
+        Dispatch a request to the handler for its "op"
+        '''
+        op = request.get('op')
+        handler = getattr(self, f'op_{op}', None)
+        if handler is None:
+            raise ProtocolError(f'Unknown op {op!r}')
+        if op == 'new':
+            return await handler(request)
+
+        session = self._get_session(request)
+        async with session.lock:
+            return await handler(session, request)
+
+    def _get_session(self, request):
+        try:
+            return self.sessions[str(request['game'])]
+        except KeyError:
+            raise ProtocolError(f'Unknown game {request.get("game")!r}')
+
+    def _run(self, fn, *args):
+        return asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def _run_journal(self, fn, *args):
+        return asyncio.get_running_loop().run_in_executor(self.journal_executor, fn, *args)
+
+    async def _record(self, session, stone, move):
+        '''
+        Record a move in the session's journal, and flush it on a journal thread if due.
+        Flushes of one game run under its session lock, one at a time
+        '''
+        if session.journal is not None and session.journal.record(session.game, stone, move):
+            await self._run_journal(session.journal.flush)
+
+    async def op_new(self, request):
+        if 'board_size' in request:
+            board_size = request['board_size']
+            # bool is a subclass of int, but not a board size
+            if type(board_size) is not int or not MIN_BOARD_SIZE <= board_size <= MAX_BOARD_SIZE:
+                raise ProtocolError(f'board_size must be an integer from {MIN_BOARD_SIZE} '
+                                    f'to {MAX_BOARD_SIZE}, not {board_size!r}')
+        if 'enable_self_destruct' in request and type(request['enable_self_destruct']) is not bool:
+            raise ProtocolError(f'enable_self_destruct must be true or false, '
+                                f'not {request["enable_self_destruct"]!r}')
+        config = dict(self.config)
+        for key in ('board_size', 'enable_self_destruct'):
+            if key in request:
+                config[key] = request[key]
+        game_id = str(next(self._ids))
+        journal = await self._run_journal(self._open_journal, game_id, config)
+        self.sessions[game_id] = GameSession(Game(config), journal)
+        return {'game': game_id}
+
+    def _check_not_over(self, game):
+        if game.is_over():
+            raise InvalidInputException('The game is over')
+
+    async def op_move(self, session, request):
+        game = session.game
+        self._check_not_over(game)
+        y, x = request.get('y'), request.get('x')
+        # bool is a subclass of int, but not a coordinate
+        if type(y) is not int or type(x) is not int:
+            raise ProtocolError(f'y and x must be integers, not {y!r} and {x!r}')
+        if not (0 <= y < game.board_size and 0 <= x < game.board_size):
+            raise InvalidInputException(f'({y}, {x}) is outside the board')
+        if game.board[y, x] != Stone.EMPTY:
+            raise InvalidInputException(f'({y}, {x}) is already occupied')
+        return await self._play(session, y, x)
+
+    async def op_pass(self, session, request):
+        game = session.game
+        self._check_not_over(game)
+        stone = game.turn
+        game.pass_turn()
+        await self._record(session, stone, 'pass')
+        return {'turn': game.turn, 'over': game.is_over()}
+
+    async def op_bot(self, session, request):
+        game = session.game
+        self._check_not_over(game)
+        move = await self._run(_bot_move, self.engine, game, game.turn)
+        if move == 'pass':
+            response = await self.op_pass(session, request)
+        else:
+            response = await self._play(session, *move)
+        response['move'] = move
+        return response
+
+    async def op_score(self, session, request):
+        scores = await self._run(_get_scores, session.game)
+        return {'black': scores[Stone.BLACK], 'white': scores[Stone.WHITE]}
+
+    async def op_state(self, session, request):
+        game = session.game
+        return {'board': game.board.tolist(),
+                'turn': game.turn,
+                'over': game.is_over(),
+                'black_captured': game.num_black_captured,
+                'white_captured': game.num_white_captured}
+
+    async def op_close(self, session, request):
+        del self.sessions[str(request['game'])]
+        if session.journal is not None:
+            await self._run_journal(session.journal.close, True)
+        return {}
+
+    async def _play(self, session, y, x):
+        '''
+        Play the side to move at (y, x) and report which stones were captured
+        '''
+        game = session.game
+        stone = game.turn
+        captured = game.num_black_captured + game.num_white_captured
+        before = np.array(game.board)
+        game._place_stone(stone, y, x)
+        await self._record(session, stone, [y, x])
+
+        removed = []
+        if game.num_black_captured + game.num_white_captured != captured:
+            removed = np.argwhere((before != Stone.EMPTY) & (game.board == Stone.EMPTY)).tolist()
+        return {'turn': game.turn, 'removed': removed}
+
+    async def serve(self, host='127.0.0.1', port=0, path=None):
+        '''
+        Start listening on a TCP port or, if `path` is given, a Unix socket
+        '''
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle_connection, path=path)
+        return await asyncio.start_server(self.handle_connection, host=host, port=port)
+
+
+async def _main(args, config):
+    if args.processes:
+        executor = concurrent.futures.ProcessPoolExecutor(args.workers)
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(args.workers)
+
+    game_server = GameServer(config, executor=executor, engine=args.engine,
+                             journal_dir=args.journal)
+    recovered = game_server.recover_games()
+    if recovered:
+        print(f'Recovered {recovered} games from {args.journal}')
+    server = await game_server.serve(args.host, args.port, args.unix)
+    for sock in server.sockets:
+        print(f'Serving on {sock.getsockname()}')
+    flusher = asyncio.create_task(game_server.flush_journals_forever()) if args.journal else None
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if flusher is not None:
+            flusher.cancel()
+        game_server.close_journals()
+        game_server.journal_executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Host many games of Go over line-delimited JSON')
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='listen on this Unix socket path instead of TCP')
+    parser.add_argument('--workers', type=int, default=None, help='executor size')
+    parser.add_argument('--processes', action='store_true', help='use a process pool executor')
+    parser.add_argument('--engine', default='random', choices=sorted(ENGINES))
+    parser.add_argument('--journal', help='directory to persist games in, recovered on startup')
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f)
+    configure_tracing(config)
+
+    try:
+        asyncio.run(_main(args, config))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+import numpy as np
+
+from src.board import get_zobrist_keys
+from src.utils import Stone
+
+# value of the off-board points surrounding the padded board
+BORDER = 3
+
+
+# (empty padded points, Zobrist keys per padded point) by board size
+_templates = {}
+
+
+def _get_template(board_size):
+    if board_size not in _templates:
+        stride = board_size + 2
+        padded = np.full((stride, stride), BORDER, dtype=int)
+        padded[1:-1, 1:-1] = Stone.EMPTY
+
+        keys = np.zeros((3, stride, stride), dtype=np.uint64)
+        keys[:, 1:-1, 1:-1] = get_zobrist_keys(board_size)
+        _templates[board_size] = (tuple(padded.ravel().tolist()),
+                                  [row.ravel().tolist() for row in keys])
+    return _templates[board_size]
+
+
+class TacticalState(object):
+    '''
+    Minimal undoable position for tactical reading (ladders, life and death).
+
+    The board is a flat list padded with a border, so point p = (y + 1) * stride + (x + 1)
+    has neighbours p - 1, p + 1, p - stride and p + stride. Moves are made with play()
+    and taken back with undo(), instead of copying the Game or rolling back through exceptions.
+    Ko follows the usual simple ko rule: a single stone that just captured a single stone
+    may not be recaptured immediately.
+    '''
+    def __init__(self, board_size):
+
+        # dimension of the square board, and of a padded row
+        self.board_size = board_size
+        self.stride = board_size + 2
+
+        # padded points, and Zobrist keys indexed by [stone][p] matching Board.zobrist_hash;
+        # both are shared by all states of the same size
+        empty, self._keys = _get_template(board_size)
+        self.points = list(empty)
+        self.zobrist_hash = 0
+
+        # point that may not be played because of ko, or None
+        self.ko = None
+
+        # one entry per move played: (point, captured points, previous ko, previous hash)
+        self._history = []
+
+        # number of moves made, for node counting by searches
+        self.nodes = 0
+
+    @classmethod
+    def from_game(cls, game):
+        '''
+        Build the tactical state of the current position of a Game
+        '''
+        state = cls(game.board_size)
+        board = np.asarray(game.board)
+        ys, xs = np.nonzero(board != Stone.EMPTY)
+        for y, x, stone in zip(ys.tolist(), xs.tolist(), board[ys, xs].tolist()):
+            state.points[state.point(y, x)] = stone
+        state.zobrist_hash = game.board.zobrist_hash
+
+        # the game stores the stone that took a ko; its only liberty is the ko point
+        if game.ko is not None:
+            p = state.point(*game.ko)
+            if state.points[p] != Stone.EMPTY:
+                stones, liberties = state.chain_and_liberties(p, 2)
+                if len(stones) == 1 and len(liberties) == 1:
+                    state.ko = liberties[0]
+        return state
+
+    def point(self, y, x):
+        return (y + 1) * self.stride + (x + 1)
+
+    def coord(self, p):
+        return p // self.stride - 1, p % self.stride - 1
+
+    def neighbors(self, p):
+        return (p - self.stride, p + self.stride, p - 1, p + 1)
+
+    def chain_and_liberties(self, p, limit=None):
+        '''
+        Return (stones, liberties) of the chain at p. The search stops
+        early once `limit` liberties are found
+        '''
+        points = self.points
+        stride = self.stride
+        stone = points[p]
+        stones = [p]
+        seen = {p}
+        liberties = []
+        i = 0
+        while i < len(stones):
+            q = stones[i]
+            i += 1
+            for n in (q - stride, q + stride, q - 1, q + 1):
+                if n in seen:
+                    continue
+                seen.add(n)
+                value = points[n]
+                if value == stone:
+                    stones.append(n)
+                elif value == Stone.EMPTY:
+                    liberties.append(n)
+                    if limit is not None and len(liberties) >= limit:
+                        return stones, liberties
+        return stones, liberties
+
+    def liberties(self, p, limit=None):
+        return self.chain_and_liberties(p, limit)[1]
+
+    def has_liberty(self, p):
+        '''
+        Check if the chain at p has a liberty, looking next to p before walking the chain
+        '''
+        points = self.points
+        stride = self.stride
+        if Stone.EMPTY in (points[p - stride], points[p + stride], points[p - 1], points[p + 1]):
+            return True
+        return bool(self.chain_and_liberties(p, 1)[1])
+
+    def is_legal(self, stone, p):
+        '''
+        Check if `stone` may be played at p. Plays the move and takes it back
+        '''
+        if self.play(stone, p):
+            self.undo()
+            return True
+        return False
+
+    def play(self, stone, p):
+        '''
+        Play `stone` at p, capturing opposing chains left without liberties.
+        Return False, leaving the position unchanged, if the move is illegal
+        (occupied, ko or suicide)
+        '''
+        points = self.points
+        if points[p] != Stone.EMPTY or p == self.ko:
+            return False
+
+        opponent = Stone.WHITE if stone == Stone.BLACK else Stone.BLACK
+        keys = self._keys
+        old_hash = self.zobrist_hash
+        points[p] = stone
+        self.zobrist_hash ^= keys[stone][p]
+
+        captured = []
+        for n in self.neighbors(p):
+            if points[n] == opponent and not self.has_liberty(n):
+                for q in self.chain_and_liberties(n)[0]:
+                    points[q] = Stone.EMPTY
+                    self.zobrist_hash ^= keys[opponent][q]
+                    captured.append(q)
+
+        if not captured and not self.has_liberty(p):
+            points[p] = Stone.EMPTY
+            self.zobrist_hash = old_hash
+            return False
+
+        self._history.append((p, captured, self.ko, old_hash))
+        self.ko = None
+        if len(captured) == 1:
+            stones, liberties = self.chain_and_liberties(p, 2)
+            if len(stones) == 1 and len(liberties) == 1:
+                self.ko = captured[0]
+        self.nodes += 1
+        return True
+
+    def undo(self):
+        '''
+        Take back the last move played
+        '''
+        p, captured, self.ko, self.zobrist_hash = self._history.pop()
+        points = self.points
+        opponent = Stone.WHITE if points[p] == Stone.BLACK else Stone.BLACK
+        for q in captured:
+            points[q] = opponent
+        points[p] = Stone.EMPTY
+
+    def to_array(self):
+        '''
+        Return the position as a (board_size, board_size) array
+        '''
+        padded = np.array(self.points).reshape(self.stride, self.stride)
+        return padded[1:-1, 1:-1].copy()
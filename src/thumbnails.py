@@ -0,0 +1,134 @@
+'''
+Headless rendering of positions to PNG images, for game thumbnails.
+
+Positions are drawn by the same code as the window (see src.ui.UI), on an
+off-screen surface with an 8-bit palette: the board only uses three colours,
+and a palette image encodes several times faster than an RGB one. No display is
+opened, and the dummy SDL video driver is selected before pygame is imported, so
+this runs on machines without a display server. Batches of positions are
+rendered in a pool of worker processes, each keeping its own surfaces.
+
+    python -m src.thumbnails <journal directory> <output directory> [--size 200] [--workers 4]
+                             [--config FILE]
+'''
+import os
+import sys
+import time
+import argparse
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import yaml
+import numpy as np
+import pygame
+
+from src.ui import UI
+from src.utils import Color
+from src.journal import list_games, recover
+
+
+# width and height of an image in pixels
+DEFAULT_IMAGE_SIZE = 200
+
+# config of games whose journal header leaves it out
+DEFAULT_CONFIG = {'black_stone': 'b', 'white_stone': 'w', 'enable_self_destruct': False}
+
+# off-screen UIs of this process by (board size, image size)
+_uis = {}
+
+
+def get_ui(board_size, image_size=DEFAULT_IMAGE_SIZE):
+    '''
+    Return the off-screen UI of this process drawing `board_size` boards on
+    `image_size` images, created on first use
+    '''
+    key = (board_size, image_size)
+    ui = _uis.get(key)
+    if ui is None:
+        screen = pygame.Surface((image_size, image_size), 0, 8)
+        screen.set_palette([Color.BROWN, Color.BLACK, Color.WHITE])
+        ui = _uis[key] = UI({'board_size': board_size, 'screen_size': image_size}, screen=screen)
+    return ui
+
+
+def render_board(board, path, image_size=DEFAULT_IMAGE_SIZE):
+    '''
+    Render a board array to a PNG image at `path`. Return the path
+    '''
+    board = np.asarray(board)
+    ui = get_ui(len(board), image_size)
+    ui.draw(board)
+    pygame.image.save(ui.screen, path)
+    return path
+
+
+def render_game(directory, game_id, output, image_size=DEFAULT_IMAGE_SIZE, config=None):
+    '''
+    Render the current position of a journaled game (see src.journal) to
+    <output>/<game_id>.png, recovering it with `config` (by default DEFAULT_CONFIG).
+    Return the path
+    '''
+    game, _, _ = recover(directory, game_id, config or DEFAULT_CONFIG)
+    return render_board(game.board, os.path.join(output, f'{game_id}.png'), image_size)
+
+
+def _chunksize(count, workers):
+    # a few chunks per worker, so that workers finishing early pick up more
+    return max(1, count // (4 * (workers or os.cpu_count() or 1)))
+
+
+def render_boards(boards, paths, image_size=DEFAULT_IMAGE_SIZE, workers=None):
+    '''
+    Render board arrays to PNG images at `paths` in a pool of `workers` processes,
+    or in this process if `workers` is 0. Return the paths
+    '''
+    if workers == 0:
+        return [render_board(board, path, image_size) for board, path in zip(boards, paths)]
+    boards = [np.asarray(board) for board in boards]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(render_board, boards, paths, repeat(image_size),
+                                 chunksize=_chunksize(len(boards), workers)))
+
+
+def render_games(directory, output, image_size=DEFAULT_IMAGE_SIZE, workers=None, game_ids=None,
+                 config=None):
+    '''
+    Render the current position of every game of a journal directory, or of
+    `game_ids`, to <output>/<game_id>.png in a pool of `workers` processes.
+    Each worker recovers its games from the journal with `config`. Return the paths
+    '''
+    if game_ids is None:
+        game_ids = list_games(directory)
+    os.makedirs(output, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(render_game, repeat(directory), game_ids, repeat(output),
+                                 repeat(image_size), repeat(config),
+                                 chunksize=_chunksize(len(game_ids), workers)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render the games of a journal directory to PNG thumbnails')
+    parser.add_argument('journal')
+    parser.add_argument('output')
+    parser.add_argument('--size', type=int, default=DEFAULT_IMAGE_SIZE)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--config', help='by default config.yaml, if present')
+    args = parser.parse_args(argv)
+
+    config = dict(DEFAULT_CONFIG)
+    if args.config or os.path.exists('config.yaml'):
+        with open(args.config or 'config.yaml', 'r') as f:
+            config.update(yaml.safe_load(f) or {})
+
+    start = time.perf_counter()
+    paths = render_games(args.journal, args.output, args.size, args.workers, config=config)
+    seconds = time.perf_counter() - start
+    print(f'rendered {len(paths)} images to {args.output} in {seconds:.2f} s '
+          f'({len(paths) / seconds if seconds else 0:.0f} images/s)')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,176 @@
+'''
+Opt-in tracer writing Chrome trace-event JSON, to be opened in chrome://tracing
+or https://ui.perfetto.dev.
+
+Spans are recorded around input handling, move resolution, rendering, scoring
+and engine searches. Tracing is off unless `trace_file` is set in config.yaml
+(see configure) or the GO_TRACE_FILE environment variable names a file; the
+trace is written there when the program exits. Spans of worker processes are
+not written. While tracing is off, a traced function costs one extra call and a
+check of a global.
+
+    GO_TRACE_FILE=trace.json python main.py
+'''
+import os
+import json
+import time
+import atexit
+import threading
+import functools
+import multiprocessing
+from collections import deque
+
+# environment variable naming the trace file, taking precedence over the config
+TRACE_ENV = 'GO_TRACE_FILE'
+
+# the active tracer, or None while tracing is off
+_tracer = None
+
+
+class Tracer(object):
+    '''
+    Collects complete ("X") trace events, keeping only the latest `max_events`
+    '''
+    def __init__(self, path, max_events=1000000):
+
+        # file the trace is written to
+        self.path = path
+
+        # trace events as dicts, oldest first
+        self.events = deque(maxlen=max_events)
+
+        # timestamps are microseconds since the tracer started
+        self._start = time.perf_counter()
+        self._pid = os.getpid()
+
+    def add(self, name, category, start, end, args=None):
+        '''
+        Record a span from `start` to `end`, both perf_counter() times
+        '''
+        event = {'name': name, 'cat': category, 'ph': 'X', 'pid': self._pid,
+                 'tid': threading.get_ident(),
+                 'ts': (start - self._start) * 1e6, 'dur': (end - start) * 1e6}
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    def write(self, path=None):
+        '''
+        Write the events recorded so far as Chrome trace-event JSON
+        '''
+        with open(path or self.path, 'w') as f:
+            json.dump({'traceEvents': list(self.events), 'displayTimeUnit': 'ms'}, f)
+
+
+class _Span(object):
+    '''
+    Context manager recording a span on the active tracer
+    '''
+    __slots__ = ('name', 'category', 'args', 'start')
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        tracer = _tracer
+        if tracer is not None:
+            tracer.add(self.name, self.category, self.start, time.perf_counter(), self.args)
+
+
+class _NullSpan(object):
+    '''
+    Context manager doing nothing, used while tracing is off
+    '''
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, category='go', **args):
+    '''
+    Return a context manager recording the code it wraps as a span named `name`,
+    with `args` shown in the trace viewer
+    '''
+    if _tracer is None:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def traced(name, category='go'):
+    '''
+    Decorator recording every call of a function as a span named `name`
+    '''
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                tracer = _tracer
+                if tracer is not None:
+                    tracer.add(name, category, start, time.perf_counter())
+        return wrapper
+    return decorate
+
+
+def is_enabled():
+    return _tracer is not None
+
+
+def start(path, max_events=1000000):
+    '''
+    Start tracing to `path`, written at exit or by stop(). Return the tracer
+    '''
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(path, max_events)
+        atexit.register(_write_at_exit, _tracer)
+    return _tracer
+
+
+def stop():
+    '''
+    Stop tracing and write the trace. Return the tracer, or None if tracing was off
+    '''
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        atexit.unregister(_write_at_exit)
+        tracer.write()
+    return tracer
+
+
+def configure(config):
+    '''
+    Start tracing if GO_TRACE_FILE or `trace_file` in the config names a file,
+    keeping at most `trace_max_events` events
+    '''
+    path = os.environ.get(TRACE_ENV) or config.get('trace_file')
+    if path:
+        start(path, config.get('trace_max_events') or 1000000)
+
+
+def _write_at_exit(tracer):
+    # worker processes inherit or re-import the tracer, but only its owner writes the file
+    if os.getpid() == tracer._pid:
+        tracer.write()
+
+
+if os.environ.get(TRACE_ENV) and multiprocessing.parent_process() is None:
+    start(os.environ[TRACE_ENV])
@@ -0,0 +1,280 @@
+'''
+Local life and death. A chain inside an enclosed region is read out by
+alpha-beta search over the moves inside the region, on a TacticalState with
+make/unmake and a transposition table keyed by the Zobrist hash.
+
+The attacker wins by capturing the target chain. The defender wins when the
+chain has two eyes made of its own stones, or when both sides pass.
+Kos are resolved by reading twice: once with the defender allowed to retake
+every ko (as if it always had a ko threat) and once with the attacker allowed to.
+'''
+import copy
+import time
+
+import numpy as np
+
+from src.life import _get_regions
+from src.tactics import BORDER, TacticalState
+from src.utils import Stone, get_opposite_stone
+
+KILL = 'kill'
+LIVE = 'live'
+KO = 'ko'
+UNKNOWN = 'unknown'
+
+PASS = None
+
+
+class SearchAborted(Exception):
+    '''
+    Raised inside the search when the node or time budget runs out
+    '''
+
+
+class TsumegoResult(object):
+    '''
+    Outcome of reading a region
+    '''
+    def __init__(self, status, move, nodes, depth_exceeded):
+
+        # KILL, LIVE or KO, or UNKNOWN if the budget ran out
+        self.status = status
+
+        # best first move for the side to move, as (y, x), "pass", or None if unknown
+        self.move = move
+
+        # number of positions searched, over both readings
+        self.nodes = nodes
+
+        # True if some line was cut at the depth limit, and counted as a win for the defender
+        self.depth_exceeded = depth_exceeded
+
+
+class TsumegoSolver(object):
+    '''
+    Reads whether the chain at `target` can be captured, with moves limited to `region`
+    (the chain's own points and the empty points around it that either side may play).
+    The search is bounded by `max_nodes`, `time_limit` in seconds and `max_depth` moves
+    '''
+    def __init__(self, state, region, target, max_nodes=100000, time_limit=None, max_depth=60):
+        self.state = state
+        self.target = target
+        self.defender = state.points[target]
+        self.attacker = get_opposite_stone(self.defender)
+        self.region = list(region)
+
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.deadline = None if time_limit is None else time.perf_counter() + time_limit
+
+        self.nodes = 0
+        self.depth_exceeded = False
+
+        # side allowed to ignore the ko ban in the current reading
+        self.ko_winner = None
+
+        # (hash, player, ko point, passes) -> True if the attacker wins, for the current reading
+        self.table = {}
+
+        # hashes of the positions on the current line, so only the ko winner may repeat one
+        self.path = set()
+
+    def solve(self, to_move):
+        '''
+        Read the region with `to_move` playing first, and return a TsumegoResult
+        '''
+        history = len(self.state._history)
+        try:
+            # the attacker wins even if the defender wins every ko
+            kill, kill_move = self._read(to_move, self.defender)
+            if kill:
+                status, move = KILL, kill_move
+            else:
+                # the defender wins even if the attacker wins every ko
+                kill, live_move = self._read(to_move, self.attacker)
+                if not kill:
+                    status, move = LIVE, live_move
+                else:
+                    status = KO
+                    move = kill_move if to_move == self.defender else live_move
+        except SearchAborted:
+            # take back the moves of the abandoned line
+            while len(self.state._history) > history:
+                self.state.undo()
+            return TsumegoResult(UNKNOWN, None, self.nodes, self.depth_exceeded)
+
+        if move is not PASS:
+            move = self.state.coord(move)
+        else:
+            move = 'pass'
+        return TsumegoResult(status, move, self.nodes, self.depth_exceeded)
+
+    def _read(self, to_move, ko_winner):
+        '''
+        Return (True if the attacker wins, best first move) when `ko_winner` may retake kos
+        '''
+        self.ko_winner = ko_winner
+        self.table = {}
+        self.path = {self.state.zobrist_hash}
+        return self._search(to_move, 0, 0)
+
+    def _search(self, player, passes, depth):
+        state = self.state
+        if state.points[self.target] != self.defender:
+            return True, PASS
+        if passes >= 2 or self._has_two_eyes():
+            return False, PASS
+        if depth >= self.max_depth:
+            self.depth_exceeded = True
+            return False, PASS
+
+        key = (state.zobrist_hash, player, state.ko, passes)
+        if key in self.table:
+            return self.table[key], PASS
+
+        self.nodes += 1
+        if self.nodes > self.max_nodes or \
+                (self.deadline is not None and self.nodes % 256 == 0 and time.perf_counter() > self.deadline):
+            raise SearchAborted()
+
+        wanted = player == self.attacker
+        opponent = get_opposite_stone(player)
+        best = PASS
+        for move in self._ordered_moves():
+            if move is PASS:
+                attacker_wins = self._search(opponent, passes + 1, depth + 1)[0]
+            else:
+                if not self._play(player, move):
+                    continue
+                zobrist_hash = state.zobrist_hash
+                if zobrist_hash in self.path and player != self.ko_winner:
+                    state.undo()
+                    continue
+                added = zobrist_hash not in self.path
+                self.path.add(zobrist_hash)
+                attacker_wins = self._search(opponent, 0, depth + 1)[0]
+                if added:
+                    self.path.discard(zobrist_hash)
+                state.undo()
+
+            if attacker_wins == wanted:
+                best = move
+                break
+        else:
+            attacker_wins = not wanted
+
+        self.table[key] = attacker_wins
+        return attacker_wins, best
+
+    def _ordered_moves(self):
+        '''
+        Empty points of the region, liberties of the target first, then pass
+        '''
+        points = self.state.points
+        liberties = self.state.liberties(self.target)
+        moves = liberties + [p for p in self.region if points[p] == Stone.EMPTY and p not in liberties]
+        moves.append(PASS)
+        return moves
+
+    def _play(self, player, p):
+        state = self.state
+        ko = state.ko
+        if p == ko and player == self.ko_winner:
+            # retake the ko, as if after an exchange of ko threats elsewhere
+            state.ko = None
+            if not state.play(player, p):
+                state.ko = ko
+                return False
+            # undo restores the ko ban as it was before the retake
+            p, captured, _, old_hash = state._history[-1]
+            state._history[-1] = (p, captured, ko, old_hash)
+            return True
+        return state.play(player, p)
+
+    def _has_two_eyes(self):
+        '''
+        Check if the target has two empty points surrounded only by its own stones.
+        Both are then vital regions in the sense of Benson's algorithm, so the chain
+        can never be captured
+        '''
+        state = self.state
+        stones, liberties = state.chain_and_liberties(self.target)
+        if len(liberties) < 2:
+            return False
+        stones = set(stones)
+        points = state.points
+        eyes = 0
+        for p in liberties:
+            if all(n in stones or points[n] == BORDER for n in state.neighbors(p)):
+                eyes += 1
+                if eyes >= 2:
+                    return True
+        return False
+
+
+def solve_region(game, region, target, to_move=None, max_nodes=100000, time_limit=None, max_depth=60):
+    '''
+    Read the life and death of the chain at `target` ((y, x)) in `game`, with moves
+    limited to `region`, a boolean (size, size) mask or a list of (y, x) points.
+    `to_move` defaults to the game's side to move. Return a TsumegoResult
+    '''
+    state = game if isinstance(game, TacticalState) else TacticalState.from_game(game)
+    if isinstance(region, np.ndarray):
+        region = zip(*np.nonzero(region))
+    points = [state.point(int(y), int(x)) for y, x in region]
+
+    p = state.point(*target)
+    if state.points[p] not in (Stone.BLACK, Stone.WHITE):
+        raise ValueError(f'There is no stone at {tuple(target)}')
+
+    to_move = getattr(game, 'turn', Stone.BLACK) if to_move is None else to_move
+    solver = TsumegoSolver(state, points, p, max_nodes, time_limit, max_depth)
+    return solver.solve(to_move)
+
+
+def find_dead_stones(game, max_region_size=16, max_nodes=20000, time_limit=0.05):
+    '''
+    Find the chains that can be captured even with their owner moving first.
+    Only chains in small regions enclosed by the opponent (at most `max_region_size`
+    points) are read, each with its own node and time budget, and the enclosing stones
+    are taken as safe. Chains that are unresolved or depend on a ko are left alive.
+    Return the set of dead stones as (y, x) points
+    '''
+    state = TacticalState.from_game(game)
+    dead = set()
+    for attacker in (Stone.BLACK, Stone.WHITE):
+        defender = get_opposite_stone(attacker)
+        for points, empties, borders in _get_regions(game, attacker):
+            if len(points) > max_region_size or len(empties) == len(points):
+                continue
+            remaining = {point for point in points if game.board[point] == defender}
+            region = [state.point(y, x) for y, x in points]
+            while remaining:
+                y, x = remaining.pop()
+                p = state.point(y, x)
+                chain = [state.coord(q) for q in state.chain_and_liberties(p)[0]]
+                remaining.difference_update(chain)
+
+                solver = TsumegoSolver(state, region, p, max_nodes, time_limit)
+                if solver.solve(defender).status == KILL:
+                    dead.update(chain)
+    return dead
+
+
+def get_scores_with_dead_stones(game, dead=None):
+    '''
+    Score like Game.get_scores, after taking the dead stones off the board as captures.
+    `dead` defaults to find_dead_stones(game)
+    '''
+    if dead is None:
+        dead = find_dead_stones(game)
+    cleared = copy.deepcopy(game)
+    for y, x in dead:
+        cleared.board.remove_stone(y, x)
+    black_territory, white_territory = cleared._count_territory()
+
+    scores = {Stone.BLACK: black_territory - game.num_black_captured,
+              Stone.WHITE: white_territory - game.num_white_captured}
+    for y, x in dead:
+        scores[game.board[y, x]] -= 1
+    return scores
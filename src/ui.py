@@ -1,53 +1,87 @@
 from src.utils import *
+from src.trace import traced
 
+import numpy as np
 import pygame
 
 
 class UI:
-    def __init__(self, config):
+    def __init__(self, config, screen=None):
         self.board_size = config["board_size"]
         self.screen_size = config["screen_size"]
 
         self.cell_size = self.screen_size // (self.board_size + 1)
         self.stone_radius = self.cell_size * 0.4
 
-        pygame.init()
-        self.screen = pygame.display.set_mode((self.screen_size, self.screen_size))
+        # surface drawn on: the window, or an off-screen surface that is never displayed
+        if screen is None:
+            pygame.init()
+            screen = pygame.display.set_mode((self.screen_size, self.screen_size))
+        self.screen = screen
 
-    def _draw_board(self):
-        self.screen.fill(Color.BROWN)
+        # whether render() shows the screen in the window
+        self.is_window = screen is pygame.display.get_surface()
+
+        # the empty board, and a sprite of each stone, drawn once and blitted on every render
+        self._background = self._make_background()
+        self._sprites = {stone: self._make_sprite(stone) for stone in (Stone.BLACK, Stone.WHITE)}
+
+        # font of the caption, loaded the first time a caption is drawn
+        self._font = None
+
+    def _make_surface(self, size):
+        # a surface of the screen's pixel format, and palette for 8-bit screens
+        surface = pygame.Surface(size, 0, self.screen)
+        if self.screen.get_bitsize() == 8:
+            surface.set_palette(self.screen.get_palette())
+        return surface
+
+    def _make_background(self):
+        background = self._make_surface(self.screen.get_size())
+        background.fill(Color.BROWN)
+        width = min(4, max(1, self.cell_size // 8))
 
         for yi in range(1, self.board_size + 1):
             pygame.draw.line(
-                self.screen,
+                background,
                 Color.BLACK,
                 [self.cell_size, yi * (self.cell_size)],
                 [self.screen_size - self.cell_size, yi * (self.cell_size)],
-                4,
+                width,
             )
 
         for xi in range(1, self.board_size + 1):
             pygame.draw.line(
-                self.screen,
+                background,
                 Color.BLACK,
                 [xi * (self.cell_size), self.cell_size],
                 [xi * (self.cell_size), self.screen_size - self.cell_size],
-                4,
+                width,
             )
+        return background
+
+    def _make_sprite(self, stone):
+        # a cell-sized square keyed on the board colour, with the stone drawn at its centre
+        sprite = self._make_surface((self.cell_size, self.cell_size))
+        sprite.fill(Color.BROWN)
+        sprite.set_colorkey(Color.BROWN)
+        center = self.cell_size // 2
+        pygame.draw.circle(sprite, get_color(stone), (center, center), self.stone_radius)
+        return sprite
+
+    def _draw_board(self):
+        self.screen.blit(self._background, (0, 0))
 
     def _draw_stones(self, board):
-        for yi in range(self.board_size):
-            for xi in range(self.board_size):
-                stone = board[yi][xi]
-                if stone == Stone.EMPTY:
-                    continue
-                color = get_color(stone)
-                pygame.draw.circle(
-                    self.screen,
-                    color,
-                    ((xi + 1) * self.cell_size, (yi + 1) * self.cell_size),
-                    self.stone_radius,
-                )
+        offset = self.cell_size - self.cell_size // 2
+        ys, xs = np.nonzero(np.asarray(board))
+        self.screen.blits(
+            [
+                (self._sprites[stone], (xi * self.cell_size + offset, yi * self.cell_size + offset))
+                for yi, xi, stone in zip(ys.tolist(), xs.tolist(), np.asarray(board)[ys, xs].tolist())
+            ],
+            doreturn=False,
+        )
 
     def _draw_hover(self, turn, hover_pos):
         yi, xi = hover_pos
@@ -59,10 +93,39 @@ class UI:
             self.stone_radius * 0.8,
         )
 
-    def render(self, board, turn, hover_pos):
+    def _draw_progress(self, turn, progress):
+        # thin bar along the bottom margin showing how far the engine has searched
+        height = max(2, self.cell_size // 8)
+        top = self.screen_size - self.cell_size // 2 - height // 2
+        width = int((self.screen_size - 2 * self.cell_size) * progress)
+        pygame.draw.rect(
+            self.screen, get_color(turn), (self.cell_size, top, width, height)
+        )
+
+    def _draw_caption(self, caption):
+        # one line of text in the top margin, clear of the stones on the first row
+        if self._font is None:
+            pygame.font.init()
+            self._font = pygame.font.Font(None, max(12, self.cell_size * 3 // 4))
+        text = self._font.render(caption, True, Color.BLACK)
+        top = max(0, (self.cell_size - int(self.stone_radius) - text.get_height()) // 2)
+        self.screen.blit(text, (self.cell_size // 2, top))
+
+    def draw(self, board, turn=None, hover_pos=None, progress=None, caption=None):
+        """
+        Draw the board on the screen surface without showing it
+        """
         self._draw_board()
         self._draw_stones(board)
         if hover_pos:
             self._draw_hover(turn, hover_pos)
+        if progress is not None:
+            self._draw_progress(turn, progress)
+        if caption:
+            self._draw_caption(caption)
 
-        pygame.display.flip()
+    @traced("render", "ui")
+    def render(self, board, turn, hover_pos, progress=None, caption=None):
+        self.draw(board, turn, hover_pos, progress, caption)
+        if self.is_window:
+            pygame.display.flip()
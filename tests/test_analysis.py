@@ -0,0 +1,48 @@
+import unittest
+from src.utils import Stone
+from src.analysis import analyze_game, analyze_position, get_positions
+
+B, W = Stone.BLACK, Stone.WHITE
+
+MOVES = [(B, (2, 2)), (W, (1, 2)), (B, (2, 1)), (W, 'pass'), (B, (1, 1))]
+
+
+class TestAnalysis(unittest.TestCase):
+    '''
+    Test case for whole-game analysis
+    '''
+    def setUp(self):
+        self.configs = {'black_stone': 'b',
+                        'white_stone': 'w',
+                        'board_size': 5,
+                        'enable_self_destruct': False
+        }
+
+    def test__positions(self):
+        positions = get_positions(MOVES, self.configs)
+        self.assertEqual(len(positions), len(MOVES) + 1)
+        self.assertEqual(int(positions[0]['board'].sum()), 0)
+        self.assertEqual(int(positions[-1]['board'][1, 1]), B)
+        self.assertEqual(int(positions[4]['turn']), B)
+
+        with self.assertRaises(ValueError):
+            get_positions(MOVES + [(W, (1, 1))], self.configs)
+        with self.assertRaises(ValueError):
+            get_positions([(B, (0, 1)), (W, 'pass'), (B, (1, 0)), (W, (0, 0))], self.configs)
+
+    def test__stream(self):
+        results = list(analyze_game(MOVES, self.configs, workers=2, playouts=2, candidates=2))
+        self.assertEqual([r.move_number for r in results], list(range(len(MOVES) + 1)))
+        self.assertEqual([r.played for r in results], [move for _, move in MOVES] + [None])
+        self.assertEqual(results[1].turn, W)
+        for result in results:
+            self.assertTrue(0 <= result.black_win_rate <= 1)
+            self.assertLessEqual(len(result.best_moves), 2)
+            win_rates = [win_rate for _, win_rate in result.best_moves]
+            self.assertEqual(win_rates, sorted(win_rates, reverse=True))
+
+        # a worker gives the same result as analysing the position in this process
+        snapshot = get_positions(MOVES, self.configs)[3]
+        local = analyze_position(self.configs, snapshot, 3, MOVES[3][1], 2, 2, seed=3)
+        self.assertEqual(local.score, results[3].score)
+        self.assertEqual(local.best_moves, results[3].best_moves)
@@ -0,0 +1,176 @@
+import copy
+import pickle
+import unittest
+import numpy as np
+from src.game import Game
+from src.utils import Stone
+from src.life import find_unconditional_life
+from src.tactics import TacticalState
+from src.journal import take_snapshot, restore_snapshot
+from src.differential import run_games
+from src.backends import DEFAULT_BACKEND, available_backends, get_backend
+from src.exceptions import SelfDestructException, KoException
+from tests.utils import capture1, capture2, self_destruct2, self_destruct3
+
+
+class BackendConformance(object):
+    '''
+    Tests every engine backend must pass, run once per registered backend
+    '''
+    backend = None
+
+    def setUp(self):
+        self.black_stone = 'b'
+        self.white_Stone = 'w'
+        self.board_size = 7
+
+        self.configs = {'black_stone': self.black_stone,
+                        'white_stone': self.white_Stone,
+                        'board_size': self.board_size,
+                        'enable_self_destruct': False,
+                        'engine_backend': self.backend
+        }
+
+        self.game = Game(self.configs)
+
+    def _play_ko(self, game):
+        for y, x in [(0, 1), (1, 0), (2, 1)]:
+            game.place_black(y, x)
+        for y, x in [(0, 2), (1, 3), (2, 2), (1, 1)]:
+            game.place_white(y, x)
+        game.place_black(1, 2)
+
+    def test__backend(self):
+        self.assertIs(type(self.game), get_backend(self.backend))
+        self.assertIsInstance(self.game, Game)
+
+    def test__capture(self):
+        capture2(self.game)
+        self.assertFalse(np.any(self.game.board == Stone.BLACK))
+        self.assertEqual(self.game.num_black_captured, 3)
+        self.assertEqual(self.game.get_scores(), {Stone.BLACK: -3, Stone.WHITE: 42})
+        self.assertEqual(self.game.board.zobrist_hash, self.game.board.compute_zobrist_hash())
+
+    def test__self_destruct(self):
+        with self.assertRaises(SelfDestructException):
+            self_destruct2(self.game)
+        self.assertEqual(self.game.board[4, 4], Stone.EMPTY)
+        self.assertEqual(self.game.board[4, 3], Stone.BLACK)
+
+        game = Game(dict(self.configs, enable_self_destruct=True))
+        self_destruct3(game)
+        self.assertEqual(int(np.sum(game.board == Stone.BLACK)), 0)
+        self.assertEqual(game.num_black_captured, 9)
+
+    def test__ko(self):
+        self._play_ko(self.game)
+        self.assertEqual(self.game.ko, (1, 2))
+        self.assertEqual(self.game.turn, Stone.WHITE)
+        with self.assertRaises(KoException):
+            self.game.place_white(1, 1)
+        self.assertEqual(self.game.board[1, 1], Stone.EMPTY)
+        self.assertEqual(self.game.turn, Stone.WHITE)
+
+        state = TacticalState.from_game(self.game)
+        self.assertEqual(state.ko, state.point(1, 1))
+
+        self.game.place_white(5, 5)
+        self.assertIsNone(self.game.ko)
+
+    def test__get_group(self):
+        self.game.place_black(0, 0)
+        self.game.place_black(0, 1)
+        self.game.place_white(1, 1)
+        group = self.game.get_group(0, 0)
+        self.assertIs(group, self.game.get_group(0, 1))
+        self.assertEqual(group.stone, Stone.BLACK)
+        self.assertEqual(group.coords, {(0, 0), (0, 1)})
+        self.assertEqual(group.liberties, {(1, 0), (0, 2)})
+        self.assertIsNone(self.game.get_group(3, 3))
+
+    def test__groups_by_liberties(self):
+        capture1(self.game)
+        self.game.place_black(0, 0)
+        self.game.place_white(0, 1)
+        self.game.place_black(1, 1)
+        self.assertEqual([g.coords for g in self.game.get_groups_by_liberties(Stone.BLACK, 1)],
+                         [{(0, 0)}])
+        self.assertEqual([g.coords for g in self.game.get_groups_by_liberties(Stone.WHITE, 1)],
+                         [{(0, 1)}])
+        self.assertEqual(self.game.get_groups_by_liberties(Stone.WHITE, 2), [])
+        self.assertEqual(len(self.game.get_groups_by_liberties(Stone.WHITE, 3)), 4)
+        self.assertEqual([g.coords for g in self.game.get_groups_by_liberties(Stone.BLACK, 4)],
+                         [{(1, 1)}])
+
+    def test__life(self):
+        # black wall on row 2 with eyes at (0, 1) and (0, 4)
+        for x in range(self.board_size):
+            self.game.place_black(2, x)
+        for y, x in [(0, 0), (1, 0), (0, 2), (1, 2), (1, 1), (0, 3), (1, 3), (1, 4), (0, 5), (1, 5),
+                     (1, 6), (0, 6)]:
+            self.game.place_black(y, x)
+        alive, regions = find_unconditional_life(self.game, Stone.BLACK)
+        self.assertEqual(len(alive), 1)
+        self.assertEqual(sorted(map(sorted, regions)), [[(0, 1)], [(0, 4)]])
+
+    def test__snapshot(self):
+        self._play_ko(self.game)
+        restored = restore_snapshot(self.configs, take_snapshot(self.game))
+        self.assertIs(type(restored), type(self.game))
+        self.assertTrue((restored.board == self.game.board).all())
+        self.assertEqual(restored.board.zobrist_hash, self.game.board.zobrist_hash)
+        self.assertEqual(restored.ko, self.game.ko)
+        self.assertEqual(restored.turn, self.game.turn)
+        self.assertEqual(restored.num_white_captured, 1)
+        with self.assertRaises(KoException):
+            restored.place_white(1, 1)
+        self.assertEqual(restored.get_group(1, 2).liberties, {(1, 1)})
+
+    def test__from_array(self):
+        self._play_ko(self.game)
+        game = Game.from_array(self.game.board, self.game.turn, self.game.ko, (0, 1), self.configs)
+        self.assertIs(type(game), type(self.game))
+        self.assertEqual(game.board.zobrist_hash, self.game.board.zobrist_hash)
+        with self.assertRaises(KoException):
+            game.place_white(1, 1)
+        game.place_white(5, 5)
+        game.place_black(6, 6)
+        game.place_white(1, 1)
+        self.assertEqual(game.num_black_captured, 1)
+        self.assertEqual(game.num_white_captured, 1)
+
+    def test__copy(self):
+        self._play_ko(self.game)
+        for game in (copy.deepcopy(self.game), pickle.loads(pickle.dumps(self.game))):
+            self.assertIs(type(game), type(self.game))
+            game.place_white(5, 5)
+            game.place_black(6, 6)
+            game.place_white(1, 1)
+            self.assertEqual(game.num_black_captured, 1)
+            self.assertEqual(self.game.board[1, 1], Stone.EMPTY)
+
+    def test__random_games(self):
+        # the same moves, ko, captures and scores as the reference engine
+        for enable_self_destruct in (False, True):
+            configs = dict(self.configs, enable_self_destruct=enable_self_destruct)
+            report = run_games(range(30), configs, DEFAULT_BACKEND, self.backend)
+            self.assertEqual([str(d) for d in report.divergences], [])
+
+
+for name in available_backends():
+    test_case = f'Test{name.title()}Backend'
+    globals()[test_case] = type(test_case, (BackendConformance, unittest.TestCase), {'backend': name})
+
+
+class TestRegistry(unittest.TestCase):
+    '''
+    Test case for backend selection
+    '''
+    def test__default(self):
+        configs = {'black_stone': 'b', 'white_stone': 'w', 'board_size': 7, 'enable_self_destruct': False}
+        self.assertIs(type(Game(configs)), Game)
+        self.assertIs(get_backend(None), Game)
+
+    def test__unknown(self):
+        with self.assertRaises(ValueError):
+            get_backend('bitboard')
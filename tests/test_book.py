@@ -0,0 +1,111 @@
+import os
+import pickle
+import tempfile
+import unittest
+from src.game import Game
+from src.utils import Stone
+from src.journal import MoveJournal
+from src.book import OpeningBook, BookEngine, build_book, journal_games, get_symmetries, main
+
+B, W = Stone.BLACK, Stone.WHITE
+
+# the same opening, played in two orientations
+GAMES = [
+    [(B, (1, 1)), (W, (5, 5)), (B, 'pass'), (W, 'pass')],
+    [(B, (1, 5)), (W, (5, 1)), (B, 'pass'), (W, 'pass')],
+    [(B, (3, 3)), (W, (2, 3)), (B, 'pass'), (W, 'pass')],
+]
+
+
+def always_pass(game, stone, report_progress):
+    return 'pass'
+
+
+class TestOpeningBook(unittest.TestCase):
+    '''
+    Test case for the memory-mapped opening book
+    '''
+    def setUp(self):
+        self.black_stone = 'b'
+        self.white_Stone = 'w'
+        self.board_size = 7
+
+        self.configs = {'black_stone': self.black_stone,
+                        'white_stone': self.white_Stone,
+                        'board_size': self.board_size,
+                        'enable_self_destruct': False
+        }
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'opening.book')
+        build_book(GAMES, self.path, self.configs)
+        self.book = OpeningBook(self.path)
+
+    def tearDown(self):
+        self.book.close()
+        self.directory.cleanup()
+
+    def test__symmetries(self):
+        symmetries = get_symmetries(self.board_size)
+        self.assertEqual(len({tuple(s) for s in symmetries}), 8)
+        self.assertEqual(list(symmetries[0]), list(range(self.board_size ** 2)))
+
+    def test__lookup(self):
+        game = Game(self.configs)
+        moves = self.book.lookup(game)
+        self.assertEqual([m.count for m in moves], [2, 1])
+        self.assertIn(tuple(moves[0].move), {(1, 1), (1, 5), (5, 1), (5, 5)})
+
+        # both orientations of the first move lead to the same white reply, mapped back
+        game.place_black(5, 1)
+        moves = self.book.lookup(game)
+        self.assertEqual(len(moves), 1)
+        self.assertEqual(moves[0].count, 2)
+        self.assertEqual(tuple(moves[0].move), (1, 5))
+        self.assertEqual(moves[0].win_rate, 0.5)
+
+        game.place_white(1, 1)
+        self.assertEqual(self.book.lookup(game), [])
+
+    def test__engine(self):
+        engine = pickle.loads(pickle.dumps(BookEngine(self.book, always_pass)))
+        game = Game(self.configs)
+        game.place_black(3, 3)
+        self.assertEqual(engine(game, W, lambda progress: None), [2, 3])
+        game.place_white(0, 0)
+        self.assertEqual(engine(game, B, lambda progress: None), 'pass')
+        engine.book.close()
+
+    def test__journal_games(self):
+        journal_dir = os.path.join(self.directory.name, 'games')
+        journal = MoveJournal(journal_dir, 'g1', self.configs)
+        game = Game(self.configs)
+        game.place_black(1, 1)
+        journal.record(game, B, [1, 1])
+        journal.close(finished=True)
+        MoveJournal(journal_dir, 'g2', self.configs).close()
+
+        self.assertEqual(list(journal_games(journal_dir)), [[(B, (1, 1))]])
+
+    def test__main_config(self):
+        journal_dir = os.path.join(self.directory.name, 'games')
+        journal = MoveJournal(journal_dir, 'g1', self.configs)
+        game = Game(self.configs)
+        game.place_black(1, 1)
+        journal.record(game, B, [1, 1])
+        journal.close(finished=True)
+        config_path = os.path.join(self.directory.name, 'config.yaml')
+        with open(config_path, 'w') as f:
+            f.write('board_size: 7\nengine_backend: flat\n')
+
+        # the board size and backend come from the config unless given on the command line
+        path = os.path.join(self.directory.name, 'config.book')
+        main(['build', path, journal_dir, '--config', config_path])
+        book = OpeningBook(path)
+        self.assertEqual((book.board_size, len(book.hashes)), (7, 1))
+        book.close()
+        main(['build', path, journal_dir, '--config', config_path, '--board-size', '9',
+              '--backend', 'groups'])
+        book = OpeningBook(path)
+        self.assertEqual((book.board_size, len(book.hashes)), (9, 0))
+        book.close()
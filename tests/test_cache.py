@@ -0,0 +1,119 @@
+import os
+import copy
+import shutil
+import tempfile
+import unittest
+from src.game import Game
+from src.utils import Stone
+from src.cache import EvaluationCache, cached
+from tests.utils import capture1, capture2
+
+class TestZobristHash(unittest.TestCase):
+    '''
+    Test case for the incremental position hash of the board
+    '''
+    def setUp(self):
+        self.black_stone = 'b'
+        self.white_Stone = 'w'
+        self.board_size = 7
+
+        configs = {'black_stone': self.black_stone,
+                   'white_stone': self.white_Stone,
+                   'board_size': self.board_size,
+                   'enable_self_destruct': False
+        }
+
+        self.game = Game(configs)
+
+    def test__empty(self):
+        self.assertEqual(self.game.board.zobrist_hash, 0)
+
+    def test__incremental(self):
+        capture2(self.game)
+        board = self.game.board
+        self.assertNotEqual(board.zobrist_hash, 0)
+        self.assertEqual(board.zobrist_hash, board.compute_zobrist_hash())
+        self.assertEqual(copy.deepcopy(board).zobrist_hash, board.zobrist_hash)
+
+    def test__capture_restores_hash(self):
+        # after the capture only the surrounding white stones remain
+        capture1(self.game)
+        other = Game({'black_stone': 'b', 'white_stone': 'w',
+                      'board_size': self.board_size, 'enable_self_destruct': False})
+        for y, x in [(4, 5), (4, 3), (3, 4), (5, 4)]:
+            other.place_white(y, x)
+        self.assertEqual(self.game.board.zobrist_hash, other.board.zobrist_hash)
+
+
+class TestEvaluationCache(unittest.TestCase):
+    '''
+    Test case for the LRU position evaluation cache
+    '''
+    def setUp(self):
+        self.black_stone = 'b'
+        self.white_Stone = 'w'
+        self.board_size = 7
+
+        self.configs = {'black_stone': self.black_stone,
+                        'white_stone': self.white_Stone,
+                        'board_size': self.board_size,
+                        'enable_self_destruct': False,
+                        'eval_cache_size': 2
+        }
+
+        self.game = Game(self.configs)
+
+    def test__lru(self):
+        cache = EvaluationCache(max_size=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.stats['hits'], 3)
+        self.assertEqual(cache.stats['misses'], 1)
+        self.assertEqual(cache.stats['evictions'], 1)
+
+    def test__spill(self):
+        directory = tempfile.mkdtemp()
+        try:
+            cache = EvaluationCache(max_size=1, spill_path=os.path.join(directory, 'spill'))
+            cache.put('a', (1, 2))
+            cache.put('b', (3, 4))
+            self.assertEqual(len(cache), 1)
+            self.assertEqual(cache.get('a'), (1, 2))
+            self.assertEqual(cache.stats['spill_hits'], 1)
+            cache.close()
+        finally:
+            shutil.rmtree(directory)
+
+    def test__get_scores(self):
+        capture1(self.game)
+        scores = self.game.get_scores()
+        self.assertEqual(self.game.get_scores(), scores)
+        self.assertEqual(self.game.eval_cache.stats['hits'], 1)
+        self.assertEqual(scores[Stone.BLACK], -1)
+        self.assertEqual(scores[Stone.WHITE], 45)
+
+        # only the captured point remains white territory
+        self.game.place_black(0, 0)
+        scores = self.game.get_scores()
+        self.assertEqual(scores[Stone.WHITE], 1)
+        self.assertEqual(self.game.eval_cache.stats['misses'], 2)
+
+    def test__shared_with_copies(self):
+        branch = copy.deepcopy(self.game)
+        self.assertIs(branch.eval_cache, self.game.eval_cache)
+
+    def test__cached_evaluator(self):
+        calls = []
+        def evaluate(game):
+            calls.append(game)
+            return len(calls)
+        evaluate = cached(self.game.eval_cache, 'count', evaluate)
+        self.assertEqual(evaluate(self.game), 1)
+        self.assertEqual(evaluate(self.game), 1)
+        self.game.pass_turn()
+        self.assertEqual(evaluate(self.game), 2)
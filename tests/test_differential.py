@@ -0,0 +1,106 @@
+import unittest
+from src.game import Game
+from src.utils import Stone
+from src.flatgame import FlatGame
+from src.exceptions import SelfDestructException, KoException
+from src.differential import play_game, replay, run, run_games, shrink
+
+
+class NoKoGame(FlatGame):
+    '''
+    FlatGame with a bug: the ko is forgotten after every move
+    '''
+    def _place_stone(self, stone, y, x):
+        super()._place_stone(stone, y, x)
+        self._ko = None
+
+
+class TestFlatGame(unittest.TestCase):
+    '''
+    Test case for the alternative engine
+    '''
+    def setUp(self):
+        self.black_stone = 'b'
+        self.white_Stone = 'w'
+        self.board_size = 7
+
+        self.configs = {'black_stone': self.black_stone,
+                        'white_stone': self.white_Stone,
+                        'board_size': self.board_size,
+                        'enable_self_destruct': False
+        }
+
+        self.game = FlatGame(self.configs)
+
+    def test__ko(self):
+        for y, x in [(0, 1), (1, 0), (2, 1)]:
+            self.game.place_black(y, x)
+        for y, x in [(0, 2), (1, 3), (2, 2), (1, 1)]:
+            self.game.place_white(y, x)
+        self.game.place_black(1, 2)
+        self.assertEqual(self.game.ko, (1, 2))
+        self.assertEqual(self.game.num_white_captured, 1)
+        with self.assertRaises(KoException):
+            self.game.place_white(1, 1)
+        self.assertEqual(self.game.board[1, 1], Stone.EMPTY)
+
+    def test__self_destruct(self):
+        self.game.place_white(0, 1)
+        self.game.place_white(1, 0)
+        with self.assertRaises(SelfDestructException):
+            self.game.place_black(0, 0)
+        self.assertEqual(self.game.board[0, 0], Stone.EMPTY)
+
+        game = FlatGame(dict(self.configs, enable_self_destruct=True))
+        game.place_white(0, 1)
+        game.place_white(1, 0)
+        game.place_black(0, 0)
+        self.assertEqual(game.board[0, 0], Stone.EMPTY)
+        self.assertEqual(game.num_black_captured, 1)
+
+
+class TestDifferential(unittest.TestCase):
+    '''
+    Test case for the differential random-game harness
+    '''
+    def setUp(self):
+        self.configs = {'black_stone': 'b',
+                        'white_stone': 'w',
+                        'board_size': 7,
+                        'enable_self_destruct': False
+        }
+
+    def test__random_games(self):
+        for enable_self_destruct in (False, True):
+            configs = dict(self.configs, enable_self_destruct=enable_self_destruct)
+            report = run_games(range(100), configs)
+            self.assertEqual(report.games, 100)
+            self.assertEqual([str(d) for d in report.divergences], [])
+
+    def test__replay(self):
+        moves, lockstep, difference = play_game(3, self.configs)
+        self.assertIsNone(difference)
+        self.assertEqual(moves[0][0], Stone.BLACK)
+        self.assertIsNone(replay(moves, self.configs, Game, 'flat'))
+        self.assertEqual(shrink(moves, self.configs), moves)
+
+    def test__shrink(self):
+        report = run_games(range(5), self.configs, 'groups', NoKoGame)
+        self.assertTrue(report.divergences)
+        for divergence in report.divergences:
+            self.assertEqual(divergence.field, 'ko')
+            self.assertIsNone(divergence.actual)
+            # taking a single stone needs at least three stones, and no move can be left out
+            self.assertLessEqual(len(divergence.moves), 5)
+            self.assertIsNotNone(replay(divergence.moves, self.configs, 'groups', NoKoGame))
+            for i in range(len(divergence.moves)):
+                moves = divergence.moves[:i] + divergence.moves[i + 1:]
+                self.assertIsNone(replay(moves, self.configs, 'groups', NoKoGame))
+
+    def test__parallel(self):
+        report = run(self.configs, 20, seed=100, workers=2, batch_size=5)
+        self.assertEqual(report.games, 20)
+        self.assertEqual(report.divergences, [])
+        self.assertGreater(report.moves, 0)
+        self.assertGreater(report.reference_games_per_sec, 0)
+        self.assertGreater(report.alternative_games_per_sec, 0)
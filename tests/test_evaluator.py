@@ -0,0 +1,123 @@
+import threading
+import unittest
+import numpy as np
+from src.game import Game
+from src.utils import Stone
+from src.evaluator import NUM_PLANES, EvaluationService, ReferenceEvaluator, feature_planes
+
+
+def failing_evaluator(planes):
+    raise ValueError('evaluation failed')
+
+
+def short_evaluator(planes):
+    # one result too few for a batch of more than one position, none for a single one
+    policy, value = ReferenceEvaluator()(planes)
+    return (policy[1:], value[1:]) if len(planes) > 1 else (policy[0], value[0])
+
+
+class TestEvaluator(unittest.TestCase):
+    '''
+    Test case for the batched evaluation service
+    '''
+    def setUp(self):
+        self.black_stone = 'b'
+        self.white_Stone = 'w'
+        self.board_size = 7
+
+        self.configs = {'black_stone': self.black_stone,
+                        'white_stone': self.white_Stone,
+                        'board_size': self.board_size,
+                        'enable_self_destruct': False
+        }
+
+        self.game = Game(self.configs)
+        self.game.place_black(0, 0)
+        self.game.place_white(0, 1)
+
+    def test__feature_planes(self):
+        planes = feature_planes(self.game.board, Stone.WHITE)
+        self.assertEqual(planes.shape, (NUM_PLANES, self.board_size, self.board_size))
+        self.assertEqual(planes[0, 0, 1], 1)
+        self.assertEqual(planes[1, 0, 0], 1)
+        self.assertEqual(planes[4, 0, 0], 1)
+        self.assertEqual(planes[2].sum(), self.board_size ** 2 - 2)
+
+        # batched planes equal the planes of each board
+        boards = np.stack([self.game.board, self.game.board])
+        batch = feature_planes(boards, [Stone.WHITE, Stone.BLACK])
+        self.assertTrue((batch[0] == planes).all())
+        self.assertTrue((batch[1] == feature_planes(self.game.board, Stone.BLACK)).all())
+
+    def test__reference_evaluator(self):
+        planes = feature_planes(self.game.board, Stone.WHITE)
+        policy, value = ReferenceEvaluator()(planes[None])
+        self.assertEqual(policy.shape, (1, self.board_size ** 2 + 1))
+        self.assertAlmostEqual(float(policy.sum()), 1.0, places=5)
+        self.assertEqual(policy[0, 0], 0)
+        self.assertTrue(-1 <= value[0] <= 1)
+
+    def test__batching(self):
+        evaluator = ReferenceEvaluator()
+        boards = [feature_planes(self.game.board, stone) for stone in (Stone.BLACK, Stone.WHITE)]
+        expected = [evaluator(planes[None]) for planes in boards]
+        results = {}
+
+        with EvaluationService(evaluator, max_batch_size=8, max_wait=0.05) as service:
+            def search(i):
+                results[i] = service.evaluate(boards[i % 2])
+
+            threads = [threading.Thread(target=search, args=(i,)) for i in range(16)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            stats = service.stats()
+
+        for i, (policy, value) in results.items():
+            self.assertTrue(np.allclose(policy, expected[i % 2][0][0]))
+            self.assertAlmostEqual(float(value), float(expected[i % 2][1][0]), places=5)
+        self.assertEqual(stats['positions'], 16)
+        self.assertLess(stats['batches'], 16)
+
+        with self.assertRaises(RuntimeError):
+            service.submit(boards[0])
+
+    def test__errors(self):
+        with EvaluationService(failing_evaluator) as service:
+            future = service.submit(feature_planes(self.game.board, Stone.BLACK))
+            with self.assertRaises(ValueError):
+                future.result(timeout=5)
+
+    def test__wrong_shape(self):
+        # a wrong-shaped result fails its batch, and later batches are still evaluated
+        planes = feature_planes(self.game.board, Stone.BLACK)
+        with EvaluationService(short_evaluator, max_batch_size=2, max_wait=1) as service:
+            futures = [service.submit(planes) for _ in range(2)]
+            for future in futures:
+                with self.assertRaises(ValueError):
+                    future.result(timeout=5)
+            with self.assertRaises(ValueError):
+                service.submit(planes).result(timeout=5)
+            self.assertTrue(service._thread.is_alive())
+
+    def test__close_while_submitting(self):
+        # every position accepted before close() gets its result
+        planes = feature_planes(self.game.board, Stone.BLACK)
+        for _ in range(20):
+            service = EvaluationService(ReferenceEvaluator(), max_wait=0)
+            futures = []
+
+            def submit():
+                while True:
+                    try:
+                        futures.append(service.submit(planes))
+                    except RuntimeError:
+                        return
+
+            thread = threading.Thread(target=submit)
+            thread.start()
+            service.close()
+            thread.join()
+            for future in futures:
+                self.assertEqual(future.result(timeout=5)[0].shape, (self.board_size ** 2 + 1,))
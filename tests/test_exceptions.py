@@ -130,6 +130,20 @@ class TestKo(unittest.TestCase):
 
         self.game = Game(configs)
 
+    def test__self_destruct_merge(self):
+        self.game.place_black(0, 0)
+        self.game.place_white(0, 1)
+        self.game.place_white(1, 1)
+        self.game.place_white(2, 0)
+
+        with self.assertRaises(SelfDestructException):
+            self.game.place_black(1, 0)
+
+        # the rejected group is not captured with the next move
+        self.game.place_white(5, 5)
+        self.assertEqual(self.game.board[0, 0], Stone.BLACK)
+        self.assertEqual(self.game.num_black_captured, 0)
+
     def test__ko1(self):
         self.game.place_black(2, 2)
         self.game.place_black(3, 1)
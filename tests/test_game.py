@@ -1,7 +1,12 @@
+import copy
+import pickle
+import random
 import unittest
 import numpy as np
-from src.game import Game
+from src.game import Game, encode_moves
 from src.utils import Stone
+from src.playout import random_playout
+from src.exceptions import SelfDestructException, KoException
 from tests.utils import (
     capture1, capture2, capture3,
     self_destruct1, self_destruct2, self_destruct3)
@@ -139,3 +144,246 @@ class TestScore(unittest.TestCase):
         scores = self.game.get_scores()
         self.assertEqual(scores[Stone.BLACK], -3)
         self.assertEqual(scores[Stone.WHITE], 3)
+
+
+class TestEmptyIndex(unittest.TestCase):
+    '''
+    Test case for the empty-point index of the board
+    '''
+    def setUp(self):
+        self.black_stone = 'b'
+        self.white_Stone = 'w'
+        self.board_size = 7
+
+        self.configs = {'black_stone': self.black_stone,
+                        'white_stone': self.white_Stone,
+                        'board_size': self.board_size,
+                        'enable_self_destruct': False
+        }
+
+    def _empty_set(self, board):
+        return set(map(tuple, np.argwhere(np.asarray(board) == Stone.EMPTY).tolist()))
+
+    def _ring_scan(self, board, y, x):
+        # the order in which GameUI used to look for the nearest empty point
+        size = self.board_size
+        for d in range(2 * size):
+            for dy in range(-d, d + 1):
+                for dx in range(d, -d - 1, -1):
+                    ny, nx = y + dy, x + dx
+                    if abs(dy) + abs(dx) == d and 0 <= ny < size and 0 <= nx < size \
+                            and board[ny, nx] == Stone.EMPTY:
+                        return [ny, nx]
+        return None
+
+    def test__captures(self):
+        rng = random.Random(0)
+        for backend in ('groups', 'flat'):
+            game = Game(dict(self.configs, engine_backend=backend))
+            random_playout(game, rng, max_moves=60, use_benson=False, copy_game=False)
+            self.assertEqual(set(game.board.iter_random_empty(rng)), self._empty_set(game.board))
+            self.assertEqual(game.board.num_empty(), len(self._empty_set(game.board)))
+
+    def test__sampling(self):
+        game = Game(self.configs)
+        game.place_black(3, 3)
+        rng = random.Random(1)
+        points = list(game.board.iter_random_empty(rng))
+        self.assertEqual(len(points), self.board_size ** 2 - 1)
+        self.assertEqual(set(points), self._empty_set(game.board))
+        self.assertNotEqual(points, sorted(points))
+
+        # the same position reached another way gives the same draws
+        other = Game(self.configs)
+        other.place_black(0, 0)
+        other.board.remove_stone(0, 0)
+        other.place_black(3, 3)
+        self.assertEqual(list(other.board.iter_random_empty(random.Random(1))), points)
+        for _ in range(20):
+            y, x = game.board.random_empty(rng)
+            self.assertEqual(game.board[y, x], Stone.EMPTY)
+
+        for y in range(self.board_size):
+            for x in range(self.board_size):
+                game.board.place_stone(Stone.WHITE, y, x)
+        self.assertEqual(game.board.num_empty(), 0)
+        self.assertIsNone(game.board.random_empty(rng))
+        self.assertIsNone(game.board.nearest_empty(3, 3))
+
+    def test__copies(self):
+        game = Game(self.configs)
+        game.place_black(0, 0)
+        for board in (copy.deepcopy(game.board), pickle.loads(pickle.dumps(game.board))):
+            self.assertEqual(board.num_empty(), self.board_size ** 2 - 1)
+            board.place_stone(Stone.WHITE, 1, 1)
+            self.assertEqual(board.num_empty(), self.board_size ** 2 - 2)
+        self.assertEqual(game.board.num_empty(), self.board_size ** 2 - 1)
+
+    def test__nearest_empty(self):
+        rng = random.Random(2)
+        game = Game(self.configs)
+        random_playout(game, rng, max_moves=40, use_benson=False, copy_game=False)
+        for y in range(self.board_size):
+            for x in range(self.board_size):
+                self.assertEqual(game.board.nearest_empty(y, x), self._ring_scan(game.board, y, x))
+
+
+class TestApplyMoves(unittest.TestCase):
+    '''
+    Test case for applying sequences of moves
+    '''
+    def setUp(self):
+        self.black_stone = 'b'
+        self.white_Stone = 'w'
+        self.board_size = 7
+
+        self.configs = {'black_stone': self.black_stone,
+                        'white_stone': self.white_Stone,
+                        'board_size': self.board_size,
+                        'enable_self_destruct': False
+        }
+
+    def _record(self, configs, seed, num_moves=80):
+        # random legal moves and passes, trying each move on a copy of the game
+        rng = random.Random(seed)
+        game = Game(configs)
+        moves = []
+        while len(moves) < num_moves and not game.is_over():
+            empty = np.argwhere(np.asarray(game.board) == Stone.EMPTY).tolist()
+            rng.shuffle(empty)
+            for y, x in empty[:8] if rng.random() > 0.05 else []:
+                trial = copy.deepcopy(game)
+                try:
+                    trial._place_stone(trial.turn, y, x)
+                except (SelfDestructException, KoException):
+                    continue
+                game = trial
+                moves.append((y, x))
+                break
+            else:
+                game.pass_turn()
+                moves.append('pass')
+        return moves, game
+
+    def assertSameGame(self, game, expected):
+        self.assertTrue((game.board == expected.board).all())
+        self.assertEqual(game.board.zobrist_hash, expected.board.zobrist_hash)
+        self.assertEqual(game.board.num_empty(), expected.board.num_empty())
+        self.assertEqual((game.num_black_captured, game.num_white_captured),
+                         (expected.num_black_captured, expected.num_white_captured))
+        self.assertEqual((game.ko, game.turn, game.count_pass), (expected.ko, expected.turn, expected.count_pass))
+        for y in range(self.board_size):
+            for x in range(self.board_size):
+                group, expected_group = game.get_group(y, x), expected.get_group(y, x)
+                if expected_group is None:
+                    self.assertIsNone(group)
+                else:
+                    self.assertEqual(group.coords, expected_group.coords)
+                    self.assertEqual(group.liberties, expected_group.liberties)
+        for stone in (Stone.BLACK, Stone.WHITE):
+            for liberties in (1, 2, 3):
+                self.assertEqual(sorted(sorted(g.coords) for g in game.get_groups_by_liberties(stone, liberties)),
+                                 sorted(sorted(g.coords) for g in expected.get_groups_by_liberties(stone, liberties)))
+
+    def test__trusted(self):
+        for backend in ('groups', 'flat'):
+            for enable_self_destruct in (False, True):
+                configs = dict(self.configs, engine_backend=backend, enable_self_destruct=enable_self_destruct)
+                for seed in range(3):
+                    moves, expected = self._record(configs, seed)
+                    game = Game(configs)
+                    game.apply_moves(encode_moves(moves, self.board_size))
+                    self.assertSameGame(game, expected)
+
+                    # play goes on from the applied position
+                    more, _ = self._record(configs, seed + 10, num_moves=10)
+                    for move in [m for m in more if m != 'pass' and game.board[m] == Stone.EMPTY]:
+                        for g in (game, expected):
+                            try:
+                                g._place_stone(g.turn, *move)
+                            except (SelfDestructException, KoException):
+                                pass
+                    self.assertSameGame(game, expected)
+
+    def test__stride(self):
+        moves, _ = self._record(self.configs, 0, num_moves=23)
+        encoded = encode_moves(moves, self.board_size)
+        for trusted in (True, False):
+            game = Game(self.configs)
+            positions = []
+            for n, board in game.apply_moves(encoded, trusted=trusted, stride=5):
+                self.assertIs(board, game.board)
+                positions.append((n, np.array(board), board.zobrist_hash))
+            self.assertEqual([n for n, _, _ in positions], [5, 10, 15, 20, 23])
+            for n, board, zobrist_hash in positions:
+                expected = Game(self.configs)
+                expected.apply_moves(encoded[:n], trusted=False)
+                self.assertTrue((board == expected.board).all())
+                self.assertEqual(zobrist_hash, expected.board.zobrist_hash)
+
+        # stopping early leaves the game at the last position yielded
+        game = Game(self.configs)
+        for n, _ in game.apply_moves(encoded, stride=10):
+            break
+        expected = Game(self.configs)
+        expected.apply_moves(encoded[:10], trusted=False)
+        self.assertSameGame(game, expected)
+
+    def test__untrusted(self):
+        moves = [(0, 1), (0, 2), (1, 0), (1, 3), (2, 1), (2, 2), (5, 5), (1, 1), (1, 2), (1, 1)]
+        game = Game(self.configs)
+        with self.assertRaises(KoException):
+            game.apply_moves(encode_moves(moves, self.board_size), trusted=False)
+        self.assertEqual(game.board[1, 1], Stone.EMPTY)
+        self.assertEqual(game.ko, (1, 2))
+
+
+class TestFromArray(unittest.TestCase):
+    '''
+    Test case for creating games from board arrays
+    '''
+    def setUp(self):
+        self.black_stone = 'b'
+        self.white_Stone = 'w'
+        self.board_size = 7
+
+        self.configs = {'black_stone': self.black_stone,
+                        'white_stone': self.white_Stone,
+                        'board_size': self.board_size,
+                        'enable_self_destruct': False
+        }
+
+    def test__random_positions(self):
+        rng = random.Random(0)
+        for num_moves in (0, 1, 10, 30, 60, 120):
+            expected = Game(self.configs)
+            random_playout(expected, rng, max_moves=num_moves, use_benson=False, copy_game=False)
+            game = Game.from_array(np.array(expected.board), expected.turn, expected.ko,
+                                   (expected.num_black_captured, expected.num_white_captured), self.configs)
+            game.count_pass = expected.count_pass
+            TestApplyMoves.assertSameGame(self, game, expected)
+            self.assertEqual(game.get_scores(), expected.get_scores())
+
+    def test__ko(self):
+        board = np.zeros((self.board_size, self.board_size), dtype=np.int8)
+        for y, x in [(0, 1), (1, 0), (2, 1), (1, 2)]:
+            board[y, x] = Stone.BLACK
+        for y, x in [(0, 2), (1, 3), (2, 2)]:
+            board[y, x] = Stone.WHITE
+        game = Game.from_array(board, Stone.WHITE, ko=(1, 2), captures=(0, 1))
+        self.assertEqual(game.board_size, self.board_size)
+        self.assertEqual(game.num_white_captured, 1)
+        with self.assertRaises(KoException):
+            game.place_white(1, 1)
+        self.assertEqual(game.get_groups_by_liberties(Stone.BLACK, 1), [game.get_group(1, 2)])
+
+    def test__invalid(self):
+        board = np.zeros((self.board_size, self.board_size), dtype=np.int8)
+        board[0, 0] = Stone.BLACK
+        board[0, 1] = board[1, 0] = Stone.WHITE
+        with self.assertRaises(ValueError):
+            Game.from_array(board, Stone.BLACK)
+        with self.assertRaises(ValueError):
+            Game.from_array(np.zeros((7, 5)), Stone.BLACK)
+        with self.assertRaises(ValueError):
+            Game.from_array(np.zeros((5, 5)), Stone.BLACK, config=self.configs)
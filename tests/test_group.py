@@ -1,6 +1,10 @@
+import random
 import unittest
 from src.game import Game, Group
 from src.utils import Stone
+from src.playout import random_playout
+from src.journal import take_snapshot, restore_snapshot
+from src.exceptions import SelfDestructException, KoException
 from tests.utils import capture1, capture2, capture3
 
 class TestGameGroups(unittest.TestCase):
@@ -218,3 +222,64 @@ class TestGameGroups(unittest.TestCase):
         self.assertTrue(white_group2.has_liberty((6, 5)))
         self.assertTrue(white_group2.has_liberty((5, 6)))
         self.assertTrue(white_group2.has_liberty((4, 6)))
+
+
+class TestLibertyIndex(unittest.TestCase):
+    '''
+    Test case for the index of groups by number of liberties
+    '''
+    def setUp(self):
+        self.configs = {'black_stone': 'b',
+                        'white_stone': 'w',
+                        'board_size': 7,
+                        'enable_self_destruct': False
+        }
+
+    def _check_index(self, game):
+        # the index holds exactly the live groups, each under its number of liberties
+        groups = {id(group): group for row in range(7) for group in
+                  (game.gm._get_group(row, x) for x in range(7)) if group is not None}
+        for stone in (Stone.BLACK, Stone.WHITE):
+            for liberties in (1, 2, 3):
+                expected = {id(g) for g in groups.values()
+                            if g.stone == stone and min(g.num_liberties, 3) == liberties}
+                indexed = {id(g) for g in game.get_groups_by_liberties(stone, liberties)}
+                self.assertEqual(indexed, expected)
+
+    def test__atari(self):
+        game = Game(self.configs)
+        game.place_black(0, 0)
+        game.place_white(0, 1)
+        self.assertEqual(game.get_groups_by_liberties(Stone.BLACK, 1), [game.gm._get_group(0, 0)])
+        self.assertEqual(game.get_groups_by_liberties(Stone.WHITE, 2), [game.gm._get_group(0, 1)])
+        game.place_white(1, 0)
+        self.assertEqual(game.get_groups_by_liberties(Stone.BLACK, 1), [])
+        self.assertEqual(game.num_black_captured, 1)
+        self._check_index(game)
+
+    def test__random_games(self):
+        rng = random.Random(0)
+        for enable_self_destruct in (False, True):
+            configs = dict(self.configs, enable_self_destruct=enable_self_destruct)
+            for _ in range(30):
+                game = Game(configs)
+                for _ in range(80):
+                    y, x = rng.randrange(7), rng.randrange(7)
+                    if game.board[y, x] != Stone.EMPTY:
+                        continue
+                    try:
+                        game._place_stone(game.turn, y, x)
+                    except (SelfDestructException, KoException):
+                        pass
+                    self._check_index(game)
+                self._check_index(restore_snapshot(configs, take_snapshot(game)))
+
+    def test__capture_first(self):
+        game = Game(self.configs)
+        game.place_black(0, 0)
+        game.place_white(0, 1)
+        game.turn = Stone.WHITE
+        result = random_playout(game, random.Random(0), max_moves=1, use_benson=False,
+                                capture_first=True)
+        self.assertEqual(result.num_moves, 1)
+        self.assertEqual(result.scores[Stone.BLACK], -1)
@@ -0,0 +1,198 @@
+import os
+import random
+import unittest
+import numpy as np
+from src.game import Game
+from src.utils import Stone
+from src.history import MoveHistory
+from src.player import is_own_eye
+from src.exceptions import SelfDestructException, KoException
+from tests.utils import capture1
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import pygame
+
+
+def play_random_game(game, history, num_moves, rng):
+    '''
+    Play random moves on `game`, recording them in `history`, and return the
+    state after every move
+    '''
+    states = [get_state(game)]
+    while len(history) < num_moves:
+        for y, x in game.board.iter_random_empty(rng):
+            if is_own_eye(game.board, game.turn, y, x):
+                continue
+            try:
+                game._place_stone(game.turn, y, x)
+            except (SelfDestructException, KoException):
+                continue
+            history.record(game, (y, x))
+            break
+        else:
+            game.pass_turn()
+            history.record(game, 'pass')
+        states.append(get_state(game))
+    return states
+
+
+def get_state(game):
+    return (np.asarray(game.board).tolist(), game.ko, game.turn, game.count_pass,
+            game.num_black_captured, game.num_white_captured)
+
+
+class TestMoveHistory(unittest.TestCase):
+    '''
+    Test case for the checkpointed move history
+    '''
+    def setUp(self):
+        self.configs = {'black_stone': 'b',
+                        'white_stone': 'w',
+                        'board_size': 7,
+                        'enable_self_destruct': False
+        }
+        self.game = Game(self.configs)
+
+    def test__seek(self):
+        history = MoveHistory(self.configs, interval=5)
+        states = play_random_game(self.game, history, 60, random.Random(0))
+        self.assertEqual(sorted(history.checkpoints), list(range(0, 61, 5)))
+        for n, state in enumerate(states):
+            self.assertEqual(get_state(history.seek(n)), state)
+        with self.assertRaises(IndexError):
+            history.seek(61)
+
+    def test__captures_and_ko(self):
+        history = MoveHistory(self.configs, interval=3)
+        for stone, move in ((Stone.BLACK, (4, 4)), (Stone.WHITE, (4, 5)), (Stone.BLACK, (0, 0)),
+                            (Stone.WHITE, (4, 3)), (Stone.BLACK, (0, 1)), (Stone.WHITE, (3, 4)),
+                            (Stone.BLACK, (0, 2)), (Stone.WHITE, (5, 4))):
+            self.game._place_stone(stone, *move)
+            history.record(self.game, move)
+        game = history.seek(8)
+        self.assertEqual(game.board[4, 4], Stone.EMPTY)
+        self.assertEqual(game.num_black_captured, 1)
+        self.assertEqual(get_state(game), get_state(self.game))
+
+    def test__bounded_checkpoints(self):
+        history = MoveHistory(self.configs, interval=2, max_checkpoints=4)
+        states = play_random_game(self.game, history, 40, random.Random(1))
+        self.assertLessEqual(len(history.checkpoints), 4)
+        self.assertEqual(history.interval, 16)
+        self.assertEqual(sorted(history.checkpoints), [0, 16, 32])
+        self.assertLess(history.nbytes, 4 * sum(field.nbytes for field in history.checkpoints[0].values())
+                        + 2 * len(history))
+        for n in (0, 15, 17, 31, 40):
+            self.assertEqual(get_state(history.seek(n)), states[n])
+
+    def test__truncate(self):
+        history = MoveHistory(self.configs, interval=4)
+        states = play_random_game(self.game, history, 20, random.Random(2))
+        history.truncate(9)
+        self.assertEqual(len(history), 9)
+        self.assertEqual(sorted(history.checkpoints), [0, 4, 8])
+
+        # continue the game from move 9
+        game = history.seek(9)
+        game.pass_turn()
+        history.record(game, 'pass')
+        self.assertEqual(get_state(history.seek(10)), get_state(game))
+        self.assertEqual(get_state(history.seek(9)), states[9])
+
+    def test__initial_position(self):
+        capture1(self.game)
+        history = MoveHistory.from_config(dict(self.configs, history_checkpoint_interval=3), self.game)
+        self.assertEqual(history.interval, 3)
+        self.assertEqual(get_state(history.seek(0)), get_state(self.game))
+
+
+class TestGameUIHistory(unittest.TestCase):
+    '''
+    Test case for reviewing earlier positions in the user interface
+    '''
+    def setUp(self):
+        from src.game_ui import GameUI
+        self.configs = {'black_stone': 'b',
+                        'white_stone': 'w',
+                        'board_size': 7,
+                        'screen_size': 160,
+                        'enable_self_destruct': False,
+                        'history_checkpoint_interval': 2
+        }
+        self.game_ui = GameUI(self.configs)
+
+    def tearDown(self):
+        pygame.quit()
+
+    def press(self, key):
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key))
+        return self.game_ui.handle_user_input(timeout=10)
+
+    def test__keys(self):
+        game_ui = self.game_ui
+        for move in ([3, 3], [2, 2], [4, 4]):
+            game_ui._place_stone(move)
+            game_ui.history.record(game_ui.game, move)
+            game_ui._switch_turns()
+
+        self.press(pygame.K_COMMA)
+        self.assertEqual(game_ui.viewed[0], 2)
+        self.assertEqual(game_ui.viewed[1].board[4, 4], Stone.EMPTY)
+        self.press(pygame.K_HOME)
+        self.assertEqual(game_ui.viewed[0], 0)
+        self.press(pygame.K_PERIOD)
+        self.assertEqual(game_ui.viewed[0], 1)
+        self.assertEqual(game_ui.viewed[1].board[3, 3], Stone.BLACK)
+
+        # moves are only played at the current position
+        game_ui.hover_pos = [0, 0]
+        self.assertIsNone(self.press(pygame.K_RETURN))
+        self.assertIsNone(self.press(pygame.K_p))
+        self.press(pygame.K_END)
+        self.assertIsNone(game_ui.viewed)
+        self.assertEqual(self.press(pygame.K_RETURN), [0, 0])
+        # the live game was never changed by reviewing
+        self.assertEqual(game_ui.game.board[4, 4], Stone.BLACK)
+
+    def test__jump_to_move(self):
+        game_ui = self.game_ui
+        for move in ([3, 3], [2, 2], [4, 4]):
+            game_ui._place_stone(move)
+            game_ui.history.record(game_ui.game, move)
+            game_ui._switch_turns()
+
+        # the move number is typed in the window, the game keeps running meanwhile
+        self.press(pygame.K_g)
+        self.assertEqual(game_ui.move_entry, "")
+        for key in (pygame.K_1, pygame.K_2, pygame.K_BACKSPACE, pygame.K_p):
+            self.assertIsNone(self.press(key))
+        self.assertEqual(game_ui.move_entry, "1")
+        self.press(pygame.K_RETURN)
+        self.assertIsNone(game_ui.move_entry)
+        self.assertEqual(game_ui.viewed[0], 1)
+
+        # escape gives up typing without quitting, and numbers past the end go to the game
+        self.press(pygame.K_g)
+        self.press(pygame.K_0)
+        self.assertNotEqual(self.press(pygame.K_ESCAPE), -1)
+        self.assertIsNone(game_ui.move_entry)
+        self.assertEqual(game_ui.viewed[0], 1)
+        self.press(pygame.K_g)
+        self.press(pygame.K_9)
+        self.press(pygame.K_RETURN)
+        self.assertIsNone(game_ui.viewed)
+
+    def test__refused_engine_move(self):
+        # an engine insisting on a suicide passes rather than stalling the game
+        from src.player import EnginePlayer
+        self.game_ui.game.place_black(0, 1)
+        self.game_ui.game.place_black(1, 0)
+        self.game_ui.game.turn = Stone.BLACK
+        self.game_ui.players = {
+            Stone.BLACK: EnginePlayer(lambda game, stone, report_progress: "pass"),
+            Stone.WHITE: EnginePlayer(lambda game, stone, report_progress: [0, 0]),
+        }
+        self.game_ui.play()
+        self.assertTrue(self.game_ui.game.is_over())
+        self.assertEqual(self.game_ui.game.board[0, 0], Stone.EMPTY)
+        self.assertEqual(len(self.game_ui.history), 2)
@@ -0,0 +1,22 @@
+import sys
+import unittest
+import subprocess
+
+class TestHeadlessImport(unittest.TestCase):
+    '''
+    Test case for importing the engine without the pygame user interface
+    '''
+    def imports_pygame(self, statement):
+        code = f'import sys; {statement}; print("pygame" in sys.modules)'
+        out = subprocess.run([sys.executable, '-c', code],
+                             check=True, capture_output=True, text=True).stdout
+        return out.splitlines()[-1] == 'True'
+
+    def test__engine_modules(self):
+        self.assertFalse(self.imports_pygame('import src.board, src.group, src.game'))
+
+    def test__player(self):
+        self.assertFalse(self.imports_pygame('import src.player'))
+
+    def test__lazy_game_ui(self):
+        self.assertTrue(self.imports_pygame('from src.game import GameUI'))
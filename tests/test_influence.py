@@ -0,0 +1,87 @@
+import random
+import unittest
+import numpy as np
+from src.game import Game
+from src.utils import Stone
+from src.playout import random_playout
+from src.influence import influence, ownership, estimate_scores
+from tests.utils import capture1
+
+
+class TestInfluence(unittest.TestCase):
+    '''
+    Test case for the influence territory estimate
+    '''
+    def setUp(self):
+        self.configs = {'black_stone': 'b',
+                        'white_stone': 'w',
+                        'board_size': 7,
+                        'enable_self_destruct': False
+        }
+        self.game = Game(self.configs)
+
+    def test__walls(self):
+        # black and white walls split the board, as get_scores counts it
+        for y in range(7):
+            self.game.place_black(y, 3)
+            self.game.place_white(y, 4)
+        owners = ownership(self.game.board)
+        self.assertTrue((owners[:, :4] == Stone.BLACK).all())
+        self.assertTrue((owners[:, 4:] == Stone.WHITE).all())
+        self.assertEqual(self.game.estimate_scores(), self.game.get_scores())
+        self.assertEqual(self.game.estimate_scores(), {Stone.BLACK: 21, Stone.WHITE: 14})
+
+    def test__open_position(self):
+        # no region is closed yet, but each corner stone controls its corner
+        self.game.place_black(1, 1)
+        self.game.place_white(5, 5)
+        self.assertEqual(self.game.get_scores(), {Stone.BLACK: 0, Stone.WHITE: 0})
+        owners = ownership(self.game.board)
+        self.assertEqual(owners[0, 0], Stone.BLACK)
+        self.assertEqual(owners[6, 6], Stone.WHITE)
+        self.assertEqual(owners[0, 6], Stone.EMPTY)
+        scores = self.game.estimate_scores()
+        self.assertGreater(scores[Stone.BLACK], 0)
+        self.assertEqual(scores[Stone.BLACK], scores[Stone.WHITE])
+
+        # swapping the colours negates the influence
+        board = np.asarray(self.game.board)
+        swapped = np.where(board == Stone.EMPTY, Stone.EMPTY, Stone.BLACK + Stone.WHITE - board)
+        self.assertTrue((influence(swapped) == -influence(board)).all())
+
+    def test__captures(self):
+        capture1(self.game)
+        scores = self.game.estimate_scores()
+        self.assertEqual(scores[Stone.BLACK],
+                         np.count_nonzero(ownership(self.game.board) == Stone.BLACK) - 1)
+
+    def test__batch(self):
+        rng = random.Random(0)
+        boards, captured = [], []
+        for num_moves in (0, 5, 20, 60):
+            game = Game(self.configs)
+            random_playout(game, rng, max_moves=num_moves, use_benson=False, copy_game=False)
+            boards.append(np.asarray(game.board).copy())
+            captured.append((game.num_black_captured, game.num_white_captured))
+
+        scores = estimate_scores(np.stack(boards), captured)
+        self.assertEqual(scores.shape, (4, 2))
+        for board, pair, score in zip(boards, captured, scores):
+            self.assertEqual(score.tolist(), estimate_scores(board, pair).tolist())
+        self.assertTrue((ownership(np.stack(boards))[2] == ownership(boards[2])).all())
+
+    def test__finished_playouts(self):
+        # once a playout has filled every region, the estimate is the exact score
+        rng = random.Random(0)
+        for _ in range(5):
+            game = Game(self.configs)
+            random_playout(game, rng, use_benson=False, copy_game=False)
+            self.assertEqual(game.estimate_scores(), game.get_scores())
+
+    def test__playout_cutoff(self):
+        rng = random.Random(0)
+        result = random_playout(self.game, rng, use_benson=False, cutoff=10)
+        self.assertEqual(result.num_moves, 10)
+        self.assertTrue(result.stopped_early)
+        self.assertIn(result.winner, (Stone.EMPTY, Stone.BLACK, Stone.WHITE))
+        self.assertFalse(np.any(self.game.board != Stone.EMPTY))
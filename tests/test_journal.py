@@ -0,0 +1,136 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from src.game import Game
+from src.utils import Stone
+from src.exceptions import KoException
+from src.journal import MoveJournal, recover, take_snapshot, restore_snapshot
+
+# black and white build a ko on the left, white takes it, then black plays elsewhere
+KO_MOVES = [(Stone.BLACK, [3, 1]), (Stone.WHITE, [3, 2]),
+            (Stone.BLACK, [2, 2]), (Stone.WHITE, [2, 3]),
+            (Stone.BLACK, [4, 2]), (Stone.WHITE, [4, 3]),
+            (Stone.BLACK, 'pass'), (Stone.WHITE, [3, 4]),
+            (Stone.BLACK, [3, 3]), (Stone.WHITE, [6, 6])]
+
+class TestJournal(unittest.TestCase):
+    '''
+    Test case for move journals, snapshots and recovery
+    '''
+    def setUp(self):
+        self.black_stone = 'b'
+        self.white_Stone = 'w'
+        self.board_size = 7
+
+        self.configs = {'black_stone': self.black_stone,
+                        'white_stone': self.white_Stone,
+                        'board_size': self.board_size,
+                        'enable_self_destruct': False
+        }
+
+        self.game = Game(self.configs)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def play(self, moves, journal=None):
+        for stone, move in moves:
+            if move == 'pass':
+                self.game.pass_turn()
+            else:
+                self.game._place_stone(stone, *move)
+            if journal is not None and journal.record(self.game, stone, move):
+                journal.flush()
+
+    def assertSameGame(self, game):
+        self.assertTrue((game.board == self.game.board).all())
+        self.assertEqual(game.num_black_captured, self.game.num_black_captured)
+        self.assertEqual(game.num_white_captured, self.game.num_white_captured)
+        self.assertEqual(game.gm._ko, self.game.gm._ko)
+        self.assertEqual(game.turn, self.game.turn)
+        self.assertEqual(game.count_pass, self.game.count_pass)
+        for y in range(self.board_size):
+            for x in range(self.board_size):
+                expected = self.game.gm._get_group(y, x)
+                group = game.gm._get_group(y, x)
+                if expected is None:
+                    self.assertIsNone(group)
+                    continue
+                self.assertEqual(group.coords, expected.coords)
+                self.assertEqual(group.liberties, expected.liberties)
+
+    def test__snapshot_roundtrip(self):
+        self.play(KO_MOVES[:9])
+        game = restore_snapshot(self.configs, take_snapshot(self.game))
+        self.assertSameGame(game)
+        self.assertEqual(game.num_white_captured, 1)
+
+        # the restored ko still forbids the immediate recapture
+        with self.assertRaises(KoException):
+            game.place_white(3, 2)
+
+    def test__recover_from_snapshot_and_tail(self):
+        journal = MoveJournal(self.directory, 'g', self.configs, snapshot_interval=4)
+        self.play(KO_MOVES, journal)
+        journal.close()
+
+        game, num_moves, closed = recover(self.directory, 'g', self.configs)
+        self.assertEqual(num_moves, len(KO_MOVES))
+        self.assertFalse(closed)
+        self.assertSameGame(game)
+
+    def test__no_snapshots(self):
+        for snapshot_interval in (0, None):
+            journal = MoveJournal(self.directory, 'g', self.configs, snapshot_interval=snapshot_interval)
+            self.play(KO_MOVES, journal)
+            journal.close()
+            self.assertFalse(os.path.exists(MoveJournal.snapshot_path(self.directory, 'g')))
+            game, num_moves, closed = recover(self.directory, 'g', self.configs)
+            self.assertEqual(num_moves, len(KO_MOVES))
+            self.assertSameGame(game)
+            os.remove(MoveJournal.log_path(self.directory, 'g'))
+            self.game = Game(self.configs)
+
+        with self.assertRaises(ValueError):
+            MoveJournal(self.directory, 'g', self.configs, snapshot_interval=-1)
+
+    def test__recover_from_log_only(self):
+        journal = MoveJournal(self.directory, 'g', self.configs, fsync_policy='always')
+        self.play(KO_MOVES[:5], journal)
+        game, num_moves, closed = recover(self.directory, 'g', self.configs)
+        self.assertEqual(num_moves, 5)
+        self.assertSameGame(game)
+
+    def test__partial_line(self):
+        journal = MoveJournal(self.directory, 'g', self.configs, fsync_policy='always')
+        self.play(KO_MOVES[:3], journal)
+        journal.close()
+        with open(MoveJournal.log_path(self.directory, 'g'), 'ab') as f:
+            f.write(b'{"n": 4, "s"')
+
+        game, num_moves, closed = recover(self.directory, 'g', self.configs)
+        self.assertEqual(num_moves, 3)
+        self.assertSameGame(game)
+
+        # resuming the journal continues on a fresh line
+        journal = MoveJournal(self.directory, 'g', self.configs, num_moves=num_moves)
+        self.play(KO_MOVES[3:5], journal)
+        journal.close(finished=True)
+        game, num_moves, closed = recover(self.directory, 'g', self.configs)
+        self.assertEqual(num_moves, 5)
+        self.assertTrue(closed)
+        self.assertSameGame(game)
+
+    def test__batching(self):
+        journal = MoveJournal(self.directory, 'g', self.configs,
+                              batch_size=4, flush_interval=60)
+        path = MoveJournal.log_path(self.directory, 'g')
+        header_size = os.path.getsize(path)
+        self.play(KO_MOVES[:3], journal)
+        self.assertEqual(os.path.getsize(path), header_size)
+        self.play(KO_MOVES[3:4], journal)
+        self.assertGreater(os.path.getsize(path), header_size)
+        journal.close()
@@ -0,0 +1,122 @@
+import unittest
+from src.game import Game
+from src.utils import Stone
+from src.tactics import TacticalState
+from src.ladder import read_ladder
+
+# a black stone in atari at (2, 2), chased towards the lower right corner
+LADDER_BLACK = [(2, 2), (3, 2)]
+LADDER_WHITE = [(1, 2), (2, 1), (2, 3), (3, 1), (4, 2)]
+
+
+class TestTacticalState(unittest.TestCase):
+    '''
+    Test case for the undoable tactical position
+    '''
+    def setUp(self):
+        self.black_stone = 'b'
+        self.white_Stone = 'w'
+        self.board_size = 7
+
+        self.configs = {'black_stone': self.black_stone,
+                        'white_stone': self.white_Stone,
+                        'board_size': self.board_size,
+                        'enable_self_destruct': False
+        }
+
+        self.game = Game(self.configs)
+
+    def test__from_game(self):
+        self.game.place_black(1, 1)
+        self.game.place_white(1, 2)
+        state = TacticalState.from_game(self.game)
+        self.assertTrue((state.to_array() == self.game.board).all())
+        self.assertEqual(state.zobrist_hash, self.game.board.zobrist_hash)
+
+    def test__play_undo(self):
+        state = TacticalState.from_game(self.game)
+        for y, x in [(0, 1), (1, 0)]:
+            self.assertTrue(state.play(Stone.WHITE, state.point(y, x)))
+        before, zobrist_hash = state.to_array(), state.zobrist_hash
+
+        self.assertTrue(state.play(Stone.BLACK, state.point(3, 3)))
+        self.assertTrue(state.play(Stone.WHITE, state.point(4, 4)))
+        state.undo()
+        state.undo()
+        self.assertTrue((state.to_array() == before).all())
+        self.assertEqual(state.zobrist_hash, zobrist_hash)
+
+        # suicide and occupied points are rejected without changes
+        self.assertFalse(state.play(Stone.BLACK, state.point(0, 0)))
+        self.assertFalse(state.play(Stone.BLACK, state.point(0, 1)))
+        self.assertTrue((state.to_array() == before).all())
+
+    def test__ko(self):
+        for y, x in [(0, 1), (1, 0), (2, 1)]:
+            self.game.place_black(y, x)
+        for y, x in [(0, 2), (1, 3), (2, 2), (1, 1)]:
+            self.game.place_white(y, x)
+
+        # black captures at (1, 2); white may not take back at (1, 1) right away
+        state = TacticalState.from_game(self.game)
+        self.assertTrue(state.play(Stone.BLACK, state.point(1, 2)))
+        self.assertEqual(state.ko, state.point(1, 1))
+        self.assertFalse(state.play(Stone.WHITE, state.point(1, 1)))
+
+        # the same ko is found when built from the game after the capture
+        self.game.place_black(1, 2)
+        state = TacticalState.from_game(self.game)
+        self.assertEqual(state.ko, state.point(1, 1))
+        self.assertEqual(state.zobrist_hash, self.game.board.zobrist_hash)
+
+
+class TestLadder(unittest.TestCase):
+    '''
+    Test case for the ladder reader
+    '''
+    def setUp(self):
+        self.configs = {'black_stone': 'b',
+                        'white_stone': 'w',
+                        'board_size': 9,
+                        'enable_self_destruct': False
+        }
+
+        self.game = Game(self.configs)
+        for y, x in LADDER_BLACK:
+            self.game.place_black(y, x)
+        for y, x in LADDER_WHITE:
+            self.game.place_white(y, x)
+
+    def test__captured(self):
+        result = read_ladder(self.game, 2, 2)
+        self.assertFalse(result.escapes)
+        self.assertFalse(result.depth_exceeded)
+        self.assertGreater(result.nodes, 0)
+
+    def test__breaker(self):
+        self.game.place_black(6, 7)
+        self.assertTrue(read_ladder(self.game, 2, 2).escapes)
+
+    def test__counter_capture(self):
+        # the white stone at (2, 3) is in atari, so black escapes by capturing it
+        for y, x in [(1, 3), (2, 4)]:
+            self.game.place_black(y, x)
+        self.assertTrue(read_ladder(self.game, 2, 2).escapes)
+
+    def test__not_in_atari(self):
+        self.game.place_black(5, 5)
+        result = read_ladder(self.game, 5, 5)
+        self.assertTrue(result.escapes)
+        self.assertEqual(result.nodes, 0)
+        with self.assertRaises(ValueError):
+            read_ladder(self.game, 0, 0)
+
+    def test__depth_limit(self):
+        state = TacticalState.from_game(self.game)
+        result = read_ladder(state, 2, 2, max_depth=4)
+        self.assertTrue(result.escapes)
+        self.assertTrue(result.depth_exceeded)
+
+        # the state is left unchanged by reading
+        self.assertTrue((state.to_array() == self.game.board).all())
+        self.assertEqual(state.zobrist_hash, self.game.board.zobrist_hash)
@@ -0,0 +1,61 @@
+import random
+import unittest
+import numpy as np
+from src.game import Game
+from src.playout import random_playout
+from src.liberties import count_empty_neighbors, label_chains, chain_liberties, liberty_maps
+
+
+class TestLiberties(unittest.TestCase):
+    '''
+    Test case for the vectorized liberty maps
+    '''
+    def setUp(self):
+        self.black_stone = 'b'
+        self.white_Stone = 'w'
+        self.board_size = 7
+
+        self.configs = {'black_stone': self.black_stone,
+                        'white_stone': self.white_Stone,
+                        'board_size': self.board_size,
+                        'enable_self_destruct': False
+        }
+
+        self.game = Game(self.configs)
+
+    def test__empty_neighbors(self):
+        self.game.place_black(0, 1)
+        counts = count_empty_neighbors(self.game.board)
+        self.assertEqual(counts[0, 0], 1)
+        self.assertEqual(counts[1, 1], 3)
+        self.assertEqual(counts[3, 3], 4)
+        self.assertEqual(counts[0, 1], 3)
+
+    def test__labels(self):
+        for y, x in [(0, 0), (0, 1), (1, 1), (3, 3)]:
+            self.game.place_black(y, x)
+        self.game.place_white(1, 0)
+        labels = label_chains(self.game.board)
+        self.assertEqual(labels[0, 0], labels[1, 1])
+        self.assertEqual(len({labels[0, 0], labels[3, 3], labels[1, 0]}), 3)
+        self.assertEqual(labels[2, 2], 0)
+
+    def test__matches_groups(self):
+        rng = random.Random(0)
+        boards = []
+        for _ in range(5):
+            game = Game(self.configs)
+            random_playout(game, rng, max_moves=rng.randint(5, 60), use_benson=False,
+                           copy_game=False)
+            liberties = chain_liberties(game.board)
+            for y in range(self.board_size):
+                for x in range(self.board_size):
+                    expected = game.gm._get_group(y, x).num_liberties if game.board[y, x] else 0
+                    self.assertEqual(liberties[y, x], expected)
+            boards.append(np.asarray(game.board))
+
+        # batched maps equal the maps of each board
+        empty_neighbors, liberties = liberty_maps(np.stack(boards))
+        for i, board in enumerate(boards):
+            self.assertTrue((empty_neighbors[i] == count_empty_neighbors(board)).all())
+            self.assertTrue((liberties[i] == chain_liberties(board)).all())
@@ -0,0 +1,130 @@
+import copy
+import random
+import unittest
+import numpy as np
+from src.game import Game
+from src.utils import Stone
+from src.life import find_unconditional_life, find_settled, get_settled_scores
+from src.player import random_move
+from src.exceptions import SelfDestructException, KoException
+from src.playout import random_playout, _play_random_move
+
+# white to move, with a ko at (1, 1) that black just took, a suicide at (0, 0) and eyes elsewhere
+KO_OR_SUICIDE = ['.BWWWWW',
+                 'BWBWWWW',
+                 'BBWWW.W',
+                 'WWWWWWW',
+                 'WWW.WWW',
+                 'WWWWWWW',
+                 'W.WWWW.']
+
+# a black wall along the left edge with eyes at (1, 0) and (4, 0)
+TWO_EYES = [(0, 0), (0, 1), (1, 1), (2, 0), (2, 1), (3, 0), (3, 1),
+            (4, 1), (5, 0), (5, 1), (6, 0), (6, 1)]
+
+class TestUnconditionalLife(unittest.TestCase):
+    '''
+    Test case for Benson's algorithm
+    '''
+    def setUp(self):
+        self.black_stone = 'b'
+        self.white_Stone = 'w'
+        self.board_size = 7
+
+        self.configs = {'black_stone': self.black_stone,
+                        'white_stone': self.white_Stone,
+                        'board_size': self.board_size,
+                        'enable_self_destruct': False
+        }
+
+        self.game = Game(self.configs)
+
+    def test__two_eyes(self):
+        for y, x in TWO_EYES:
+            self.game.place_black(y, x)
+        alive_groups, vital_regions = find_unconditional_life(self.game, Stone.BLACK)
+        self.assertEqual(len(alive_groups), 1)
+        self.assertEqual(alive_groups[0].coords, set(TWO_EYES))
+        self.assertEqual(sorted(vital_regions), [[(1, 0)], [(4, 0)]])
+
+        life, settled = find_settled(self.game)
+        self.assertEqual(settled.sum(), len(TWO_EYES) + 2)
+        self.assertFalse(settled[3, 3])
+
+    def test__one_eye(self):
+        for y, x in TWO_EYES + [(4, 0)]:
+            self.game.place_black(y, x)
+        alive_groups, vital_regions = find_unconditional_life(self.game, Stone.BLACK)
+        self.assertEqual(alive_groups, [])
+        self.assertEqual(vital_regions, [])
+
+    def test__big_eye_is_not_vital(self):
+        # the enclosed area has empty points that are not liberties of the wall
+        for y in range(self.board_size):
+            self.game.place_black(y, 3)
+        alive_groups, vital_regions = find_unconditional_life(self.game, Stone.BLACK)
+        self.assertEqual(alive_groups, [])
+
+    def test__white_inside_eye(self):
+        for y, x in TWO_EYES:
+            self.game.place_black(y, x)
+        self.game.place_white(3, 3)
+        alive_groups, vital_regions = find_unconditional_life(self.game, Stone.WHITE)
+        self.assertEqual(alive_groups, [])
+
+    def test__settled_scores(self):
+        eyes = {(1, 1), (5, 5)}
+        for y in range(self.board_size):
+            for x in range(self.board_size):
+                if (y, x) not in eyes:
+                    self.game.place_black(y, x)
+        life, settled = find_settled(self.game)
+        self.assertTrue(settled.all())
+        self.assertEqual(get_settled_scores(self.game, life), self.game.get_scores())
+
+
+class TestPlayout(unittest.TestCase):
+    '''
+    Test case for random playouts
+    '''
+    def setUp(self):
+        self.configs = {'black_stone': 'b',
+                        'white_stone': 'w',
+                        'board_size': 5,
+                        'enable_self_destruct': False
+        }
+
+        self.game = Game(self.configs)
+
+    def test__playout(self):
+        rng = random.Random(0)
+        for use_benson in (False, True):
+            for _ in range(5):
+                result = random_playout(self.game, rng, use_benson=use_benson)
+                self.assertGreater(result.num_moves, 0)
+                self.assertIn(result.winner, (Stone.EMPTY, Stone.BLACK, Stone.WHITE))
+        self.assertFalse(np.any(self.game.board != Stone.EMPTY))
+
+    def test__no_ko_after_suicide(self):
+        # a refused suicide leaves the ko in place, however often the points are drawn
+        for backend in ('groups', 'flat'):
+            game = Game(dict(self.configs, board_size=7, engine_backend=backend))
+            for stone in (Stone.WHITE, Stone.BLACK):
+                for y, row in enumerate(KO_OR_SUICIDE):
+                    for x, point in enumerate(row):
+                        if point == 'BW'[stone == Stone.WHITE] and (y, x) != (1, 2):
+                            game._place_stone(stone, y, x)
+            game._place_stone(Stone.BLACK, 1, 2)
+            self.assertEqual((game.turn, game.ko), (Stone.WHITE, (1, 2)))
+            refused = copy.deepcopy(game)
+            self.assertRaises(SelfDestructException, refused._place_stone, Stone.WHITE, 0, 0)
+            self.assertEqual(refused.ko, (1, 2))
+            self.assertRaises(KoException, refused._place_stone, Stone.WHITE, 1, 1)
+
+            settled = np.zeros((7, 7), dtype=bool)
+            for seed in range(20):
+                played = copy.deepcopy(game)
+                self.assertFalse(_play_random_move(played, Stone.WHITE, settled, random.Random(seed)))
+                self.assertEqual(played.board[1, 1], Stone.EMPTY)
+                random.seed(seed)
+                self.assertEqual(random_move(copy.deepcopy(game), Stone.WHITE, lambda fraction: None), 'pass')
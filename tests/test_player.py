@@ -0,0 +1,61 @@
+import time
+import pickle
+import unittest
+from src.game import Game
+from src.utils import Stone
+from src.player import EnginePlayer
+from tests.utils import capture1
+
+class TestEnginePlayer(unittest.TestCase):
+    '''
+    Test case for engine players thinking in the background
+    '''
+    def setUp(self):
+        self.black_stone = 'b'
+        self.white_Stone = 'w'
+        self.board_size = 7
+
+        configs = {'black_stone': self.black_stone,
+                   'white_stone': self.white_Stone,
+                   'board_size': self.board_size,
+                   'enable_self_destruct': False
+        }
+
+        self.game = Game(configs)
+
+    def wait_for_move(self, player):
+        deadline = time.time() + 10
+        move = player.poll()
+        while move is None and time.time() < deadline:
+            time.sleep(0.01)
+            move = player.poll()
+        return move
+
+    def check_move(self, player):
+        capture1(self.game)
+        player.start(self.game, Stone.BLACK)
+        move = self.wait_for_move(player)
+        self.assertIsNotNone(move)
+        self.assertEqual(player.progress, 1.0)
+
+        # the engine works on a copy, so the game itself is untouched
+        self.assertEqual((self.game.board != Stone.EMPTY).sum(), 4)
+
+        # the suicide point inside the white stones is never chosen
+        self.assertNotEqual(move, [4, 4])
+        y, x = move
+        self.game.place_black(y, x)
+
+    def test__thread(self):
+        self.check_move(EnginePlayer())
+
+    def test__process(self):
+        self.check_move(EnginePlayer(use_process=True))
+
+    def test__pickle_board(self):
+        capture1(self.game)
+        game = pickle.loads(pickle.dumps(self.game))
+        self.assertEqual(game.board.board_size, self.board_size)
+        self.assertTrue((game.board == self.game.board).all())
+        game.place_black(0, 0)
+        self.assertEqual(game.board[0, 0], Stone.BLACK)
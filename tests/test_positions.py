@@ -0,0 +1,73 @@
+import pickle
+import random
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from src.game import Game
+from src.utils import Stone
+from src.playout import random_playout
+from src.journal import take_snapshot, restore_snapshot
+from src.positions import SharedPositions
+
+
+def _count_stones(positions, i):
+    # runs in a worker process, on the block attached by unpickling `positions`
+    return int(np.count_nonzero(positions[i]['board']))
+
+
+class TestSharedPositions(unittest.TestCase):
+    '''
+    Test case for positions in shared memory
+    '''
+    def setUp(self):
+        self.black_stone = 'b'
+        self.white_Stone = 'w'
+        self.board_size = 7
+
+        self.configs = {'black_stone': self.black_stone,
+                        'white_stone': self.white_Stone,
+                        'board_size': self.board_size,
+                        'enable_self_destruct': False
+        }
+
+        rng = random.Random(0)
+        self.games = []
+        for num_moves in (0, 10, 30):
+            game = Game(self.configs)
+            random_playout(game, rng, max_moves=num_moves, use_benson=False, copy_game=False)
+            self.games.append(game)
+        self.snapshots = [take_snapshot(game) for game in self.games]
+
+    def test__restore(self):
+        with SharedPositions.from_snapshots(self.snapshots, self.board_size) as positions:
+            self.assertEqual(len(positions), 3)
+            for i, game in enumerate(self.games):
+                position = positions[i]
+                self.assertEqual(int(position['hash']), game.board.zobrist_hash)
+                for y in range(self.board_size):
+                    for x in range(self.board_size):
+                        group = game.get_group(y, x)
+                        self.assertEqual(int(position['liberties'][y, x]),
+                                         group.num_liberties if group else 0)
+
+                restored = restore_snapshot(self.configs, position)
+                self.assertTrue((restored.board == game.board).all())
+                self.assertEqual(restored.board.zobrist_hash, game.board.zobrist_hash)
+                self.assertEqual(restored.ko, game.ko)
+                self.assertEqual(restored.turn, game.turn)
+                self.assertEqual(restored.num_black_captured, game.num_black_captured)
+                # records are views into the block, which cannot be closed while they exist
+                del position
+
+    def test__attach(self):
+        with SharedPositions.from_snapshots(self.snapshots, self.board_size) as positions:
+            # unpickling attaches to the same memory rather than copying the positions
+            attached = pickle.loads(pickle.dumps(positions))
+            self.assertLess(len(pickle.dumps(positions)), 200)
+            positions[1]['board'][0, 0] = Stone.BLACK
+            self.assertEqual(attached[1]['board'][0, 0], Stone.BLACK)
+            attached.close()
+
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                counts = list(executor.map(_count_stones, [positions] * 3, range(3)))
+            self.assertEqual(counts, [int(np.count_nonzero(positions[i]['board'])) for i in range(3)])
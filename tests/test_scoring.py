@@ -0,0 +1,62 @@
+import random
+import unittest
+import numpy as np
+from src.game import Game
+from src.utils import Stone
+from src.playout import random_playout
+from src.scoring import label_regions, count_territory, score_boards
+from tests.utils import capture1
+
+
+class TestScoring(unittest.TestCase):
+    '''
+    Test case for scoring batches of boards
+    '''
+    def setUp(self):
+        self.configs = {'black_stone': 'b',
+                        'white_stone': 'w',
+                        'board_size': 7,
+                        'enable_self_destruct': False
+        }
+        self.game = Game(self.configs)
+
+    def scores_of(self, game):
+        scores = game.get_scores()
+        return [scores[Stone.BLACK], scores[Stone.WHITE]]
+
+    def test__label_regions(self):
+        for y in range(7):
+            self.game.place_black(y, 3)
+        labels = label_regions(self.game.board)
+        self.assertTrue((labels[:, 3] == 0).all())
+        self.assertEqual(len(np.unique(labels[:, :3])), 1)
+        self.assertEqual(len(np.unique(labels[:, 4:])), 1)
+        self.assertNotEqual(labels[0, 0], labels[0, 4])
+
+    def test__single_board(self):
+        # an empty board, and a region bordered by both players, are nobody's
+        self.assertEqual(score_boards(self.game.board).tolist(), [0, 0])
+        for y in range(7):
+            self.game.place_black(y, 2)
+            self.game.place_white(y, 4)
+        self.assertEqual(count_territory(self.game.board).tolist(), [14, 14])
+        capture1(self.game)
+        self.assertEqual(score_boards(self.game.board, (self.game.num_black_captured,
+                                                        self.game.num_white_captured)).tolist(),
+                         self.scores_of(self.game))
+
+    def test__batch(self):
+        rng = random.Random(0)
+        games = []
+        for max_moves in (1, 5, 20, None, None, None):
+            game = Game(self.configs)
+            random_playout(game, rng, max_moves=max_moves, use_benson=False, copy_game=False)
+            games.append(game)
+        boards = np.stack([np.asarray(game.board) for game in games])
+        captured = [(game.num_black_captured, game.num_white_captured) for game in games]
+
+        scores = score_boards(boards, captured)
+        self.assertEqual(scores.shape, (6, 2))
+        self.assertEqual(scores.tolist(), [self.scores_of(game) for game in games])
+        self.assertEqual(count_territory(boards[3:5]).tolist(),
+                         [count_territory(board).tolist() for board in boards[3:5]])
@@ -0,0 +1,145 @@
+import gc
+import random
+import unittest
+import threading
+import time
+import numpy as np
+from src.game import Game
+from src.utils import Stone
+from src.playout import random_playout
+from src.tactics import TacticalState
+from src.fastboard import FastBoard
+from src.search import AnytimeSearch, NODES, TIME
+
+
+class TestFastBoard(unittest.TestCase):
+    '''
+    Test case for the playout board
+    '''
+    def test__random_games(self):
+        # the playout board agrees with TacticalState on every move of random games
+        rng = random.Random(0)
+        for _ in range(5):
+            state = TacticalState(7)
+            board = FastBoard.from_state(state)
+            stone = Stone.BLACK
+            for _ in range(150):
+                empty = board.empty_points()
+                legal = [p for p in empty if board.is_legal(stone, p)]
+                self.assertEqual(legal, [p for p in empty if state.is_legal(stone, p)])
+                if not legal:
+                    break
+                p = rng.choice(legal)
+                captured = board.play(stone, p)
+                self.assertTrue(state.play(stone, p))
+                self.assertEqual(sorted(captured), sorted(state._history[-1][1]))
+                self.assertEqual(board.points, state.points)
+                self.assertEqual(board.ko, state.ko)
+                stone = Stone.WHITE if stone == Stone.BLACK else Stone.BLACK
+
+
+class TestAnytimeSearch(unittest.TestCase):
+    '''
+    Test case for the anytime search
+    '''
+    def setUp(self):
+        self.black_stone = 'b'
+        self.white_Stone = 'w'
+        self.board_size = 7
+
+        self.configs = {'black_stone': self.black_stone,
+                        'white_stone': self.white_Stone,
+                        'board_size': self.board_size,
+                        'enable_self_destruct': False
+        }
+
+    def _game(self, board_size):
+        configs = dict(self.configs, board_size=board_size)
+        game = Game(configs)
+        random_playout(game, random.Random(0), max_moves=board_size * board_size // 3,
+                       use_benson=False, copy_game=False)
+        return game
+
+    def _check_latency(self, board_size, time_budget, searches=20):
+        game = self._game(board_size)
+        search = AnytimeSearch(time_budget=time_budget, seed=0)
+        latencies = []
+        for _ in range(searches):
+            result = search.search(game)
+            latencies.append(result.elapsed)
+            self.assertEqual(result.stop_reason, TIME)
+            y, x = result.move
+            self.assertEqual(game.board[y, x], Stone.EMPTY)
+        self.assertLess(np.percentile(latencies, 99), time_budget)
+
+    def test__latency_9x9(self):
+        self._check_latency(9, 0.05)
+
+    def test__latency_19x19(self):
+        self._check_latency(19, 0.05)
+        self._check_latency(19, 0.2, searches=5)
+
+    def test__node_budget(self):
+        game = self._game(self.board_size)
+        result = AnytimeSearch(time_budget=10, node_budget=30, seed=0).search(game)
+        self.assertEqual(result.stop_reason, NODES)
+        self.assertEqual(result.nodes, 30)
+        self.assertEqual(sum(n for _, n, _ in result.candidates), 30)
+        self.assertEqual(result.move, result.candidates[0][0])
+        self.assertGreater(result.deadline_checks, 30)
+        self.assertGreater(result.check_cost, 0)
+        self.assertAlmostEqual(result.check_overhead, result.deadline_checks * result.check_cost)
+
+    def test__engine(self):
+        game = self._game(self.board_size)
+        progress = []
+        move = AnytimeSearch(time_budget=0.05, seed=0)(game, game.turn, progress.append)
+        self.assertEqual(game.board[move[0], move[1]], Stone.EMPTY)
+        self.assertTrue(progress)
+        self.assertEqual(progress, sorted(progress))
+        self.assertTrue(0 <= progress[-1] <= 1)
+
+    def test__overlapping_searches(self):
+        # the collector stays paused until the last of two overlapping searches finishes,
+        # even when the first one to start finishes first
+        game = self._game(self.board_size)
+        states = []
+
+        def first():
+            AnytimeSearch(time_budget=0.2, seed=0).search(game)
+
+        def progress(_):
+            if not first_search.is_alive():
+                states.append(gc.isenabled())
+
+        first_search = threading.Thread(target=first)
+        first_search.start()
+        time.sleep(0.05)
+        AnytimeSearch(time_budget=0.5, seed=1)(game, game.turn, progress)
+        first_search.join()
+        self.assertTrue(states)
+        self.assertNotIn(True, states)
+        self.assertTrue(gc.isenabled())
+
+    def test__full_board(self):
+        # no legal move other than filling one's own eyes: pass
+        game = Game(self.configs)
+        for y in range(self.board_size):
+            for x in range(self.board_size):
+                if (y, x) not in ((0, 0), (3, 3)):
+                    game.board[y, x] = Stone.BLACK
+        result = AnytimeSearch(time_budget=1, seed=0).search(game, Stone.BLACK)
+        self.assertEqual(result.move, 'pass')
+        self.assertEqual(result.nodes, 0)
+
+    def test__game_ko_rule(self):
+        # white may not take back at (0, 0): the Game's ko rule refuses capturing the
+        # single stone next to the ko point, although two stones would be captured
+        game = Game(self.configs)
+        for stone, y, x in ((Stone.BLACK, 1, 0), (Stone.BLACK, 0, 2), (Stone.WHITE, 0, 0),
+                            (Stone.WHITE, 1, 1), (Stone.WHITE, 1, 2), (Stone.WHITE, 0, 3),
+                            (Stone.BLACK, 0, 1)):
+            game._place_stone(stone, y, x)
+        result = AnytimeSearch(time_budget=10, node_budget=200, seed=0).search(game, Stone.WHITE)
+        self.assertNotIn([0, 0], [move for move, _, _ in result.candidates])
+        game._place_stone(Stone.WHITE, *result.move)
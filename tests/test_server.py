@@ -0,0 +1,190 @@
+import json
+import time
+import asyncio
+import tempfile
+import unittest
+from src.server import GameServer
+from src.journal import read_log
+from src.loadgen import run_load
+from src.utils import Stone
+
+class TestGameServer(unittest.IsolatedAsyncioTestCase):
+    '''
+    Test case for the line-delimited JSON game server
+    '''
+    async def asyncSetUp(self):
+        self.black_stone = 'b'
+        self.white_Stone = 'w'
+        self.board_size = 7
+
+        configs = {'black_stone': self.black_stone,
+                   'white_stone': self.white_Stone,
+                   'board_size': self.board_size,
+                   'enable_self_destruct': False
+        }
+
+        self.game_server = GameServer(configs)
+        self.server = await self.game_server.serve()
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.reader, self.writer = await asyncio.open_connection('127.0.0.1', self.port)
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        # the handlers end once they see their clients disconnect
+        await asyncio.gather(*self.game_server.connections)
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def request(self, **request):
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        return json.loads(await self.reader.readline())
+
+    async def test__capture_and_score(self):
+        game = (await self.request(op='new'))['game']
+        for y, x in [(4, 4), (4, 5), (0, 0), (4, 3), (0, 1), (3, 4), (0, 2)]:
+            response = await self.request(op='move', game=game, y=y, x=x)
+            self.assertTrue(response['ok'])
+            self.assertEqual(response['removed'], [])
+
+        response = await self.request(op='move', game=game, y=5, x=4)
+        self.assertEqual(response['removed'], [[4, 4]])
+        self.assertEqual(response['turn'], Stone.BLACK)
+
+        state = await self.request(op='state', game=game)
+        self.assertEqual(state['board'][4][4], Stone.EMPTY)
+        self.assertEqual(state['black_captured'], 1)
+
+        await self.request(op='pass', game=game)
+        response = await self.request(op='pass', game=game)
+        self.assertTrue(response['over'])
+
+        # a finished game takes no more moves
+        for op in ('move', 'pass', 'bot'):
+            response = await self.request(op=op, game=game, y=6, x=6)
+            self.assertEqual((response['ok'], response.get('message')), (False, 'The game is over'))
+        self.assertTrue((await self.request(op='state', game=game))['over'])
+
+        response = await self.request(op='score', game=game, id=7)
+        self.assertEqual(response['id'], 7)
+        self.assertEqual(response['black'], -1)
+        self.assertEqual(response['white'], 1)
+
+    async def test__errors(self):
+        game = (await self.request(op='new'))['game']
+        await self.request(op='move', game=game, y=1, x=1)
+
+        response = await self.request(op='move', game=game, y=1, x=1)
+        self.assertFalse(response['ok'])
+        self.assertEqual(response['error'], 'InvalidInputException')
+
+        response = await self.request(op='move', game='nope', y=1, x=1)
+        self.assertEqual(response['error'], 'ProtocolError')
+
+        self.writer.write(b'not json\n')
+        response = json.loads(await self.reader.readline())
+        self.assertFalse(response['ok'])
+
+        for board_size in ('abc', '9', 0, -3, 4, 26, 10 ** 6, 9.0, True, None):
+            response = await self.request(op='new', board_size=board_size)
+            self.assertEqual(response['error'], 'ProtocolError')
+        for y, x in ((1.9, True), ('3', 2), (2, None), (True, False)):
+            response = await self.request(op='move', game=game, y=y, x=x)
+            self.assertEqual(response['error'], 'ProtocolError')
+        response = await self.request(op='move', game=game, x=2)
+        self.assertEqual(response['error'], 'ProtocolError')
+        self.assertEqual((await self.request(op='state', game=game))['turn'], Stone.WHITE)
+
+        for enable_self_destruct in ('no', 0, 1, None):
+            response = await self.request(op='new', enable_self_destruct=enable_self_destruct)
+            self.assertEqual(response['error'], 'ProtocolError')
+        self.assertEqual(len(self.game_server.sessions), 1)
+        self.assertTrue((await self.request(op='new', board_size=25))['ok'])
+        self.assertTrue((await self.request(op='new', enable_self_destruct=True))['ok'])
+
+    async def test__bot(self):
+        game = (await self.request(op='new', board_size=5))['game']
+        response = await self.request(op='bot', game=game)
+        self.assertTrue(response['ok'])
+        y, x = response['move']
+        state = await self.request(op='state', game=game)
+        self.assertEqual(state['board'][y][x], Stone.BLACK)
+        self.assertEqual(state['turn'], Stone.WHITE)
+
+    async def test__load(self):
+        connect = lambda: asyncio.open_connection('127.0.0.1', self.port)
+        moves, latencies, elapsed = await run_load(connect, clients=4, games=2, board_size=5,
+                                                   max_moves=20, bot_fraction=0.2)
+        self.assertGreater(moves, 0)
+        self.assertEqual(self.game_server.sessions, {})
+
+    async def test__recover(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.game_server.journal_dir = directory
+            game = (await self.request(op='new'))['game']
+            finished = (await self.request(op='new'))['game']
+            for y, x in [(4, 4), (4, 5), (0, 0), (4, 3)]:
+                await self.request(op='move', game=game, y=y, x=x)
+            await self.request(op='pass', game=game)
+            await self.request(op='close', game=finished)
+            for session in self.game_server.sessions.values():
+                session.journal.flush()
+
+            restarted = GameServer(self.game_server.config, journal_dir=directory)
+            self.assertEqual(restarted.recover_games(), 1)
+            recovered = restarted.sessions[game].game
+            self.assertTrue((recovered.board == self.game_server.sessions[game].game.board).all())
+            self.assertEqual(recovered.turn, Stone.WHITE)
+            self.assertEqual(recovered.count_pass, 1)
+            self.assertEqual((await restarted.handle_request({'op': 'new'}))['game'], '3')
+
+    async def test__flush_journals(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.game_server.journal_dir = directory
+            self.game_server.config['journal_flush_interval'] = 0.01
+            game = (await self.request(op='new'))['game']
+            flusher = asyncio.create_task(self.game_server.flush_journals_forever())
+            try:
+                # one pending move is written without waiting for another one
+                await self.request(op='move', game=game, y=1, x=1)
+                await asyncio.sleep(0.1)
+                self.assertEqual(len(read_log(directory, game)[1]), 1)
+            finally:
+                flusher.cancel()
+
+            await self.request(op='move', game=game, y=2, x=2)
+            self.game_server.close_journals()
+            _, moves, closed = read_log(directory, game)
+            self.assertEqual(len(moves), 2)
+            self.assertFalse(closed)
+
+    async def test__slow_journal(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.game_server.journal_dir = directory
+            self.game_server.config['journal_fsync'] = 'always'
+            slow = (await self.request(op='new'))['game']
+            fast = (await self.request(op='new'))['game']
+            journal = self.game_server.sessions[slow].journal
+            flush = journal.flush
+
+            def slow_flush():
+                time.sleep(0.5)
+                flush()
+            journal.flush = slow_flush
+
+            # while one game waits for its disk, another game's requests are served
+            reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+            try:
+                slow_pass = asyncio.create_task(self.request(op='pass', game=slow))
+                await asyncio.sleep(0.05)
+                start = time.perf_counter()
+                writer.write(json.dumps({'op': 'pass', 'game': fast}).encode() + b'\n')
+                self.assertTrue(json.loads(await reader.readline())['ok'])
+                self.assertLess(time.perf_counter() - start, 0.25)
+                self.assertFalse(slow_pass.done())
+                self.assertTrue((await slow_pass)['ok'])
+            finally:
+                writer.close()
+                await writer.wait_closed()
+            self.game_server.close_journals()
+            self.assertEqual(len(read_log(directory, slow)[1]), 1)
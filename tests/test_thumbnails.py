@@ -0,0 +1,106 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+import numpy as np
+from src.game import Game
+from src.ui import UI
+from src.utils import Stone, Color, get_color
+from src.journal import MoveJournal
+from src.thumbnails import get_ui, render_board, render_boards, render_games
+from tests.utils import capture1
+
+import pygame
+
+
+class TestThumbnails(unittest.TestCase):
+    '''
+    Test case for rendering positions to images without a display
+    '''
+    def setUp(self):
+        self.configs = {'black_stone': 'b',
+                        'white_stone': 'w',
+                        'board_size': 7,
+                        'enable_self_destruct': False
+        }
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def load(self, path):
+        return pygame.surfarray.array3d(pygame.image.load(path)).transpose(1, 0, 2)
+
+    def color_at(self, image, y, x, cell_size):
+        return tuple(image[(y + 1) * cell_size, (x + 1) * cell_size])
+
+    def test__render_board(self):
+        game = Game(self.configs)
+        game.place_black(1, 2)
+        game.place_white(4, 5)
+        path = render_board(game.board, os.path.join(self.directory, 'a.png'), 160)
+
+        image = self.load(path)
+        cell_size = get_ui(7, 160).cell_size
+        self.assertEqual(image.shape, (160, 160, 3))
+        self.assertEqual(self.color_at(image, 1, 2, cell_size), Color.BLACK)
+        self.assertEqual(self.color_at(image, 4, 5, cell_size), Color.WHITE)
+        # an empty point shows the grid, and the margin the board
+        self.assertEqual(self.color_at(image, 3, 3, cell_size), Color.BLACK)
+        self.assertEqual(tuple(image[2, 2]), tuple(Color.BROWN))
+
+    def test__same_as_drawn_stones(self):
+        # blitted sprites on the palette surface give the pixels of stones drawn one by one
+        game = Game(self.configs)
+        capture1(game)
+        path = render_board(game.board, os.path.join(self.directory, 'a.png'), 240)
+
+        ui = UI({'board_size': 7, 'screen_size': 240}, screen=pygame.Surface((240, 240)))
+        ui.draw(np.zeros((7, 7), dtype=np.int8))
+        for y, x in np.argwhere(np.asarray(game.board) != Stone.EMPTY):
+            pygame.draw.circle(ui.screen, get_color(game.board[y, x]),
+                               ((x + 1) * ui.cell_size, (y + 1) * ui.cell_size), ui.stone_radius)
+        expected = pygame.surfarray.array3d(ui.screen).transpose(1, 0, 2)
+        self.assertTrue((self.load(path) == expected).all())
+
+    def test__render_boards(self):
+        boards = [np.zeros((7, 7), dtype=np.int8) for _ in range(3)]
+        boards[1][0, 0] = Stone.BLACK
+        paths = [os.path.join(self.directory, f'{i}.png') for i in range(3)]
+        self.assertEqual(render_boards(boards, paths, 80, workers=2), paths)
+        images = [self.load(path) for path in paths]
+        self.assertTrue((images[0] == images[2]).all())
+        self.assertFalse((images[0] == images[1]).all())
+        self.assertEqual(render_boards(boards, paths, 80, workers=0), paths)
+        self.assertTrue((self.load(paths[1]) == images[1]).all())
+
+    def test__render_games(self):
+        journal_directory = os.path.join(self.directory, 'games')
+        for game_id, num_moves in (('a', 2), ('b', 5)):
+            game = Game(self.configs)
+            journal = MoveJournal(journal_directory, game_id, self.configs)
+            for n, (y, x) in enumerate([(4, 4), (4, 5), (0, 0), (4, 3), (0, 1)][:num_moves]):
+                stone = Stone.BLACK if n % 2 == 0 else Stone.WHITE
+                game._place_stone(stone, y, x)
+                journal.record(game, stone, (y, x))
+            journal.close(finished=True)
+
+        output = os.path.join(self.directory, 'thumbnails')
+        paths = render_games(journal_directory, output, 80, workers=1)
+        self.assertEqual(paths, [os.path.join(output, 'a.png'), os.path.join(output, 'b.png')])
+        cell_size = get_ui(7, 80).cell_size
+        self.assertEqual(self.color_at(self.load(paths[0]), 4, 5, cell_size), Color.WHITE)
+        self.assertEqual(self.color_at(self.load(paths[1]), 0, 1, cell_size), Color.BLACK)
+
+    def test__no_display(self):
+        code = ('import os\n'
+                'os.environ.pop("DISPLAY", None)\n'
+                'import numpy as np, pygame\n'
+                'from src.thumbnails import render_board\n'
+                f'render_board(np.ones((7, 7), dtype=np.int8), {os.path.join(self.directory, "a.png")!r})\n'
+                'print(os.environ["SDL_VIDEODRIVER"], pygame.display.get_init())\n')
+        out = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+        self.assertEqual(out.split(), ['dummy', 'False'])
@@ -0,0 +1,83 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+from src import trace
+from src.game import Game
+from src.search import AnytimeSearch
+from tests.utils import capture1
+
+
+class TestTrace(unittest.TestCase):
+    '''
+    Test case for the Chrome trace-event tracer
+    '''
+    def setUp(self):
+        self.configs = {'black_stone': 'b',
+                        'white_stone': 'w',
+                        'board_size': 7,
+                        'enable_self_destruct': False
+        }
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'trace.json')
+
+    def tearDown(self):
+        trace.stop()
+        shutil.rmtree(self.directory)
+
+    def read_events(self, path=None):
+        with open(path or self.path) as f:
+            return json.load(f)['traceEvents']
+
+    def test__off(self):
+        self.assertFalse(trace.is_enabled())
+        with trace.span('nothing') as span:
+            self.assertIs(span, trace._NULL_SPAN)
+        capture1(Game(self.configs))
+        self.assertIsNone(trace.stop())
+        self.assertFalse(os.path.exists(self.path))
+
+    def test__spans(self):
+        trace.configure(dict(self.configs, trace_file=self.path))
+        self.assertTrue(trace.is_enabled())
+        game = Game(self.configs)
+        capture1(game)
+        game.get_scores()
+        AnytimeSearch(time_budget=0.01, seed=0).search(game)
+        with trace.span('custom', 'test', note='x'):
+            pass
+        trace.stop()
+        self.assertFalse(trace.is_enabled())
+
+        events = self.read_events()
+        names = [event['name'] for event in events]
+        self.assertEqual(names.count('place_stone'), 5)
+        self.assertIn('get_scores', names)
+        self.assertIn('search', names)
+        self.assertEqual(events[-1]['args'], {'note': 'x'})
+        for event in events:
+            self.assertEqual(event['ph'], 'X')
+            self.assertGreaterEqual(event['dur'], 0)
+        search = names.index('search')
+        self.assertGreaterEqual(events[search]['dur'], 5000)
+
+    def test__environment(self):
+        # the trace is written by the main process at exit, not by its workers
+        code = ('from concurrent.futures import ProcessPoolExecutor\n'
+                'from src.game import Game\n'
+                'from tests.utils import capture1\n'
+                'config = {"black_stone": "b", "white_stone": "w", "board_size": 7, '
+                '"enable_self_destruct": False}\n'
+                'if __name__ == "__main__":\n'
+                '    with ProcessPoolExecutor(1) as executor:\n'
+                '        executor.submit(capture1, Game(config)).result()\n'
+                '    capture1(Game(config))\n')
+        env = dict(os.environ, GO_TRACE_FILE=self.path)
+        subprocess.run([sys.executable, '-c', code], check=True, env=env,
+                       cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        events = self.read_events()
+        self.assertEqual([event['name'] for event in events], ['place_stone'] * 5)
+        self.assertEqual({event['pid'] for event in events}, {events[0]['pid']})
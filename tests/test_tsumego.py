@@ -0,0 +1,62 @@
+import unittest
+from src.game import Game
+from src.utils import Stone
+from src.tactics import TacticalState
+from src.tsumego import (KILL, LIVE, UNKNOWN, solve_region, find_dead_stones,
+                         get_scores_with_dead_stones)
+
+# black with a straight three eye space at (0, 0), (0, 1) and (0, 2), walled in by white
+BLACK = [(0, 3), (1, 0), (1, 1), (1, 2), (1, 3)]
+WHITE = [(0, 4), (1, 4), (2, 0), (2, 1), (2, 2), (2, 3), (2, 4)]
+REGION = [(0, 0), (0, 1), (0, 2)] + BLACK
+
+
+class TestTsumego(unittest.TestCase):
+    '''
+    Test case for the life and death solver
+    '''
+    def setUp(self):
+        self.black_stone = 'b'
+        self.white_Stone = 'w'
+        self.board_size = 7
+
+        self.configs = {'black_stone': self.black_stone,
+                        'white_stone': self.white_Stone,
+                        'board_size': self.board_size,
+                        'enable_self_destruct': False
+        }
+
+        self.game = Game(self.configs)
+        for y, x in BLACK:
+            self.game.place_black(y, x)
+        for y, x in WHITE:
+            self.game.place_white(y, x)
+
+    def test__straight_three(self):
+        result = solve_region(self.game, REGION, (1, 1), to_move=Stone.BLACK)
+        self.assertEqual(result.status, LIVE)
+        self.assertEqual(result.move, (0, 1))
+
+        result = solve_region(self.game, REGION, (1, 1), to_move=Stone.WHITE)
+        self.assertEqual(result.status, KILL)
+        self.assertEqual(result.move, (0, 1))
+
+    def test__budget(self):
+        state = TacticalState.from_game(self.game)
+        result = solve_region(state, REGION, (1, 1), to_move=Stone.WHITE, max_nodes=2)
+        self.assertEqual(result.status, UNKNOWN)
+
+        # the abandoned line is taken back
+        self.assertTrue((state.to_array() == self.game.board).all())
+        self.assertEqual(state.zobrist_hash, self.game.board.zobrist_hash)
+
+    def test__dead_stones(self):
+        self.assertEqual(find_dead_stones(self.game), set())
+
+        # white takes the vital point, so black is dead even with black to move
+        self.game.place_white(0, 1)
+        self.assertEqual(find_dead_stones(self.game), set(BLACK))
+
+        scores = get_scores_with_dead_stones(self.game)
+        self.assertEqual(scores[Stone.BLACK], -len(BLACK))
+        self.assertEqual(scores[Stone.WHITE], self.board_size ** 2 - len(WHITE) - 1)